@@ -0,0 +1,8 @@
+"""Micro-benchmarks for AutistBoar hot paths.
+
+Each module is runnable on its own and prints a JSON report:
+
+    python3 -m benchmarks.bench_connections
+    python3 -m benchmarks.bench_edge_index
+    python3 -m benchmarks.bench_scoring
+"""
@@ -0,0 +1,180 @@
+"""Connection reuse benchmark — handshakes saved by the pooled BaseClient.
+
+Starts a local TLS stand-in server (self-signed cert via the `openssl` CLI)
+and issues the same burst of concurrent GETs three ways:
+
+    per_call_client   new BaseClient per request (pre-pool behaviour)
+    default_limits    one BaseClient, httpx default limits
+    tuned             one BaseClient with the provider's firehose.yaml
+                      `connections` settings (HTTP/2 if h2 is installed)
+
+The server only speaks HTTP/1.1, so HTTP/2 falls back via ALPN here; the
+report still shows how many TCP/TLS handshakes each mode paid for.
+
+Usage:
+    python3 -m benchmarks.bench_connections [--requests 60] [--concurrency 6] [--provider birdeye]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from lib.clients.base import BaseClient, ConnectionSettings, http2_available
+
+
+class TLSStandInServer:
+    """Minimal keep-alive HTTP/1.1 server over TLS that counts handshakes."""
+
+    def __init__(self, cert_dir: Path):
+        self.cert = cert_dir / "cert.pem"
+        self.key = cert_dir / "key.pem"
+        subprocess.run(
+            [
+                "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+                "-keyout", str(self.key), "-out", str(self.cert),
+            ],
+            check=True,
+            capture_output=True,
+        )
+        self.handshakes = 0
+        self.port = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(self.cert, self.key)
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, ssl=context)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.handshakes += 1  # Connection callback runs after the TLS handshake
+        body = b'{"data": {"price": 1.0}}'
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                await asyncio.sleep(0.005)  # Simulated upstream work
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _burst(make_client, requests: int, concurrency: int) -> dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    clients: list[BaseClient] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            client = make_client()
+            if client not in clients:
+                clients.append(client)
+            await client.get("/defi/price", params={"address": f"MINT_{i}"})
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - start
+
+    connections = [c.connection_stats.to_dict() for c in clients]
+    for client in clients:
+        await client.close()
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "client_tls_handshakes": sum(c["tls_handshakes"] for c in connections),
+        "reused": sum(c["reused"] for c in connections),
+    }
+
+
+async def run_benchmark(requests: int, concurrency: int, provider: str) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as cert_dir:
+        server = TLSStandInServer(Path(cert_dir))
+        await server.start()
+        base_url = f"https://localhost:{server.port}"
+        verify = ssl.create_default_context(cafile=str(server.cert))
+
+        def build(connections: ConnectionSettings) -> BaseClient:
+            return BaseClient(
+                base_url=base_url, rate_limit=1e6, connections=connections, verify=verify
+            )
+
+        shared: dict[str, BaseClient] = {}
+
+        def pooled(name: str, connections: ConnectionSettings):
+            def make() -> BaseClient:
+                if name not in shared:
+                    shared[name] = build(connections)
+                return shared[name]
+            return make
+
+        default_limits = ConnectionSettings(
+            max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0
+        )
+        tuned = ConnectionSettings.for_provider(provider)
+        modes = {
+            "per_call_client": lambda: build(default_limits),
+            "default_limits": pooled("default", default_limits),
+            "tuned": pooled("tuned", tuned),
+        }
+
+        results: dict[str, Any] = {}
+        for name, make_client in modes.items():
+            before = server.handshakes
+            results[name] = await _burst(make_client, requests, concurrency)
+            results[name]["server_handshakes"] = server.handshakes - before
+        await server.stop()
+
+    baseline = results["per_call_client"]["server_handshakes"]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "provider": provider,
+        "tuned_settings": vars(tuned),
+        "http2_available": http2_available(),
+        "modes": results,
+        "handshakes_saved": {
+            name: baseline - r["server_handshakes"]
+            for name, r in results.items()
+            if name != "per_call_client"
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Connection reuse benchmark against a local TLS server"
+    )
+    parser.add_argument("--requests", type=int, default=60, help="GETs per mode (default: 60)")
+    parser.add_argument("--concurrency", type=int, default=6, help="Concurrent GETs (default: 6)")
+    parser.add_argument(
+        "--provider", default="birdeye", help="firehose.yaml section for tuned limits"
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args.requests, args.concurrency, args.provider))
+    print(json.dumps(result, indent=2))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Edge Bank recall benchmark — IVF index vs brute-force cosine scan.
+
+Builds an IVFIndex over N synthetic clustered embeddings (MiniLM's 384
+dimensions) and times top-k queries three ways:
+
+    row_loop    per-row np.dot loop (the pre-index query_similar)
+    matrix      one matrix-vector product over every vector (exact=True)
+    ivf         IVFIndex.search, unfiltered and with outcome="win"
+
+and reports recall@k of the index against the exact ranking, plus the
+cost of one write_bead-style add once the matrix is bound to its .npy
+sidecar (an append, not a rewrite). The target is a p99 IVF query under
+10 ms at 100k beads.
+
+Usage:
+    python3 -m benchmarks.bench_edge_index [--beads 100000] [--queries 200] [--top-k 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from lib.edge.index import IVFIndex
+
+DIM = 384
+TARGET_MS = 10.0
+
+
+def synthetic_embeddings(n: int, seed: int, clusters: int = 500) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, DIM)).astype(np.float32)
+    noise = 0.5 * rng.normal(size=(n, DIM)).astype(np.float32)
+    return centers[rng.integers(clusters, size=n)] + noise
+
+
+def percentile_ms(samples: list[float], pct: float) -> float:
+    return round(float(np.percentile(samples, pct)) * 1000, 3)
+
+
+def run(beads: int, queries: int, top_k: int, seed: int = 0) -> dict[str, Any]:
+    vectors = synthetic_embeddings(beads, seed)
+    outcomes = np.where(np.random.default_rng(seed).random(beads) < 0.3, "win", "loss")
+    ids = [f"bead_{i}" for i in range(beads)]
+    query_vectors = synthetic_embeddings(queries, seed + 1)
+
+    start = time.perf_counter()
+    index = IVFIndex(DIM)
+    index.add_many(ids, vectors, list(outcomes))
+    build_seconds = time.perf_counter() - start
+
+    matrix_times, ivf_times, filtered_times = [], [], []
+    found = 0
+    for q in query_vectors:
+        start = time.perf_counter()
+        exact = index.search(q, top_k, exact=True)
+        matrix_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        hits = index.search(q, top_k)
+        ivf_times.append(time.perf_counter() - start)
+        found += len({bead_id for _, bead_id in exact} & {bead_id for _, bead_id in hits})
+
+        start = time.perf_counter()
+        index.search(q, top_k, outcome="win")
+        filtered_times.append(time.perf_counter() - start)
+
+    # The old loop is ~1000x slower; a handful of queries is enough
+    loop_times = []
+    for q in query_vectors[:3]:
+        start = time.perf_counter()
+        scored = [
+            float(np.dot(q, v) / (np.linalg.norm(q) * np.linalg.norm(v) + 1e-8)) for v in vectors
+        ]
+        sorted(range(beads), key=scored.__getitem__, reverse=True)[:top_k]
+        loop_times.append(time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index.save(Path(tmp) / "edge.db.ivf.npz", Path(tmp) / "edge.db.vectors.npy")
+        start = time.perf_counter()
+        index.add("bead_new", query_vectors[0], "pending")
+        append_seconds = time.perf_counter() - start
+
+    return {
+        "beads": beads,
+        "queries": queries,
+        "top_k": top_k,
+        "nlist": index.nlist,
+        "nprobe": index.nprobe,
+        "build_seconds": round(build_seconds, 2),
+        "row_loop_p50_ms": percentile_ms(loop_times, 50),
+        "matrix_p50_ms": percentile_ms(matrix_times, 50),
+        "ivf_p50_ms": percentile_ms(ivf_times, 50),
+        "ivf_p99_ms": percentile_ms(ivf_times, 99),
+        "ivf_filtered_p99_ms": percentile_ms(filtered_times, 99),
+        "recall_at_k": round(found / (queries * top_k), 3),
+        "bound_append_ms": round(append_seconds * 1000, 3),
+        "target_ms": TARGET_MS,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Edge Bank IVF index vs brute force")
+    parser.add_argument("--beads", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = run(args.beads, args.queries, args.top_k, args.seed)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ivf_p99_ms"] <= TARGET_MS else 1)
+
+
+if __name__ == "__main__":
+    main()
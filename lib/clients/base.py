@@ -1,11 +1,14 @@
 """Base HTTP client for AutistBoar API layer.
 
 Provides:
-- Rate limiting (per-endpoint token bucket)
-- Automatic retry with exponential backoff
+- Rate limiting (async token bucket shared per provider, honours Retry-After)
+- Automatic retry with exponential backoff (single, deadline-aware layer)
 - Timeout handling
-- Response caching (TTL-based)
-- RPC fallback chain rotation
+- Response caching (TTL-based, bounded LRU) + optional persistent tier
+- Per-provider connection limits, optional HTTP/2, connection-reuse stats
+- In-flight GET coalescing (single-flight)
+- Health-scored RPC endpoint selection (circuit breaker, optional hedging),
+  JSON-RPC request batching
 - Structured error handling
 
 All API clients inherit from this base.
@@ -14,38 +17,29 @@ All API clients inherit from this base.
 from __future__ import annotations
 
 import asyncio
+import json
+import os
+import ssl
+import sys
 import time
-from dataclasses import dataclass, field
-from typing import Any
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from string import Template
+from typing import TYPE_CHECKING, Any
 
 import httpx
 
+from lib.clients.disk_cache import DiskCache
+from lib.config import WORKSPACE, load_firehose_config
+from lib.utils.deadline import bounded_timeout, check_deadline, time_left
+from lib.utils.rate_limiter import TokenBucket, get_provider_limiter
+from lib.utils.retry import RetryPolicy, RetryStats, retry_call
 
-@dataclass
-class RateLimiter:
-    """Simple token-bucket rate limiter."""
-
-    max_per_second: float
-    _tokens: float = field(init=False)
-    _last_refill: float = field(init=False)
-
-    def __post_init__(self) -> None:
-        self._tokens = self.max_per_second
-        self._last_refill = time.monotonic()
-
-    def acquire(self) -> float:
-        """Acquire a token. Returns wait time in seconds (0 if immediate)."""
-        now = time.monotonic()
-        elapsed = now - self._last_refill
-        self._tokens = min(self.max_per_second, self._tokens + elapsed * self.max_per_second)
-        self._last_refill = now
-
-        if self._tokens >= 1.0:
-            self._tokens -= 1.0
-            return 0.0
-
-        wait = (1.0 - self._tokens) / self.max_per_second
-        return wait
+if TYPE_CHECKING:
+    from lib.clients.pool import ClientPool
 
 
 @dataclass
@@ -54,28 +48,239 @@ class CacheEntry:
 
     data: Any
     expires_at: float
+    size: int = 0
+
+
+def make_cache_key(method: str, path: str, params: dict[str, Any] | None = None) -> str:
+    """Canonical cache key: params are sorted so dict ordering does not matter."""
+    if not params:
+        return f"{method}:{path}"
+    return f"{method}:{path}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+def _approx_size(data: Any) -> int:
+    """Approximate payload size in bytes (serialised JSON length)."""
+    try:
+        return len(json.dumps(data, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(data)
 
 
 class ResponseCache:
-    """Simple in-memory TTL cache for API responses."""
+    """Bounded in-memory TTL cache with LRU eviction.
 
-    def __init__(self) -> None:
-        self._store: dict[str, CacheEntry] = {}
+    Capped on both entry count and approximate byte size. Expired entries are
+    swept periodically (on writes, at most every `sweep_interval` seconds)
+    rather than only when the same key is read again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 8 * 1024 * 1024,
+        sweep_interval: float = 60.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._store: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._store)
 
     def get(self, key: str) -> Any | None:
         entry = self._store.get(key)
         if entry is None:
+            self.misses += 1
             return None
         if time.monotonic() > entry.expires_at:
-            del self._store[key]
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
             return None
+        self._store.move_to_end(key)
+        self.hits += 1
         return entry.data
 
     def set(self, key: str, data: Any, ttl_seconds: float) -> None:
-        self._store[key] = CacheEntry(data=data, expires_at=time.monotonic() + ttl_seconds)
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+        size = _approx_size(data)
+        if size > self.max_bytes:
+            return  # Would evict everything else — don't cache it
+
+        if key in self._store:
+            self._remove(key)
+        self._store[key] = CacheEntry(data=data, expires_at=now + ttl_seconds, size=size)
+        self._bytes += size
+
+        while len(self._store) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._store))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def sweep(self, now: float | None = None) -> int:
+        """Drop all expired entries. Returns the number removed."""
+        now = time.monotonic() if now is None else now
+        expired = [key for key, entry in self._store.items() if now > entry.expires_at]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        self._last_sweep = now
+        return len(expired)
+
+    def _remove(self, key: str) -> None:
+        entry = self._store.pop(key)
+        self._bytes -= entry.size
 
     def clear(self) -> None:
         self._store.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._store),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+@dataclass
+class RequestStats:
+    """Per-client GET counters: cache hits, upstream misses, coalesced waiters."""
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    disk_hits: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "disk_hits": self.disk_hits,
+        }
+
+
+@dataclass
+class ConnectionSettings:
+    """Transport tuning for one provider (firehose.yaml <provider>.connections).
+
+    http2 multiplexes concurrent requests over a single TLS connection; it is
+    used only when the optional `h2` package is installed (httpx[http2]),
+    otherwise the client stays on HTTP/1.1 keep-alive.
+    """
+
+    http2: bool = False
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry: float = 30.0
+
+    @classmethod
+    def for_provider(cls, provider: str) -> ConnectionSettings:
+        settings = load_firehose_config().get(provider, {}).get("connections", {}) or {}
+        return cls(
+            http2=bool(settings.get("http2", cls.http2)),
+            max_connections=int(settings.get("max_connections", cls.max_connections)),
+            max_keepalive_connections=int(
+                settings.get("max_keepalive_connections", cls.max_keepalive_connections)
+            ),
+            keepalive_expiry=float(settings.get("keepalive_expiry_seconds", cls.keepalive_expiry)),
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass
+class ConnectionStats:
+    """Per-client transport counters, collected from httpcore trace events.
+
+    A request that neither opened a TCP connection nor ran a TLS handshake
+    was served on a kept-alive (or multiplexed HTTP/2) connection.
+    """
+
+    requests: int = 0
+    new_connections: int = 0
+    tls_handshakes: int = 0
+    http2_requests: int = 0
+
+    async def trace(self, event: str, info: dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            self.new_connections += 1
+        elif event == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def record_response(self, response: httpx.Response) -> None:
+        self.requests += 1
+        if response.http_version == "HTTP/2":
+            self.http2_requests += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        reused = max(0, self.requests - self.new_connections)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reused": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "http2_requests": self.http2_requests,
+        }
+
+
+def shared_rate_limit_path(provider: str) -> Path | None:
+    """Cross-process token store for a provider, or None to keep its bucket in-process.
+
+    Configured in firehose.yaml:
+
+        rate_limit_store:
+          enabled: true
+          path: state/rate_limits.json
+          providers: [birdeye, nansen]
+    """
+    settings = load_firehose_config().get("rate_limit_store", {}) or {}
+    if not settings.get("enabled", False) or provider not in (settings.get("providers") or []):
+        return None
+    return WORKSPACE / settings.get("path", "state/rate_limits.json")
+
+
+def _parse_retry_after(value: str | None, default: float) -> float:
+    """Retry-After header in seconds (numeric or HTTP-date form)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, retry_at.timestamp() - time.time())
 
 
 class APIError(Exception):
@@ -112,25 +317,54 @@ class BaseClient:
         backoff_max: float = 60.0,
         backoff_multiplier: float = 2.0,
         provider_name: str = "",
+        cache_max_entries: int = 1024,
+        cache_max_bytes: int = 8 * 1024 * 1024,
+        disk_cache: DiskCache | None = None,
+        persistent_ttls: dict[str, float] | None = None,
+        connections: ConnectionSettings | None = None,
+        verify: ssl.SSLContext | str | bool = True,
     ):
         self.base_url = base_url.rstrip("/")
         self.provider_name = provider_name
         self.timeout = timeout
-        self.max_retries = max_retries
-        self.backoff_base = backoff_base
-        self.backoff_max = backoff_max
-        self.backoff_multiplier = backoff_multiplier
-        self._rate_limiter = RateLimiter(max_per_second=rate_limit)
-        self._cache = ResponseCache()
+        self.retry_policy = RetryPolicy(
+            max_attempts=max_retries + 1,
+            base_delay=backoff_base,
+            max_delay=backoff_max,
+            multiplier=backoff_multiplier,
+        )
+        self.retry_stats = RetryStats()
+        # Shared by every client of the same provider (one budget per provider),
+        # and across processes for providers listed under rate_limit_store
+        self._rate_limiter = (
+            get_provider_limiter(
+                provider_name, rate_limit, shared_path=shared_rate_limit_path(provider_name)
+            )
+            if provider_name
+            else TokenBucket(rate_limit)
+        )
+        self._cache = ResponseCache(max_entries=cache_max_entries, max_bytes=cache_max_bytes)
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self._disk_cache = disk_cache
+        self._persistent_ttls = persistent_ttls or {}
+        self.stats = RequestStats()
+        self.connections = connections or ConnectionSettings.for_provider(provider_name)
+        self.connection_stats = ConnectionStats()
         self._client = httpx.AsyncClient(
             base_url=self.base_url,
             headers=headers or {},
             timeout=httpx.Timeout(timeout),
+            limits=self.connections.limits(),
+            http2=self.connections.http2 and http2_available(),
+            verify=verify,
         )
 
     async def close(self) -> None:
         await self._client.aclose()
 
+    def cache_stats(self) -> dict[str, int]:
+        return self._cache.stats()
+
     async def get(
         self,
         path: str,
@@ -138,46 +372,135 @@ class BaseClient:
         cache_ttl: float = 0,
         headers: dict[str, str] | None = None,
     ) -> Any:
-        """GET request with rate limiting, retry, and optional caching."""
-        cache_key = f"GET:{path}:{params}" if cache_ttl > 0 else ""
-        if cache_key:
-            cached = self._cache.get(cache_key)
+        """GET request with rate limiting, retry, and optional caching.
+
+        Identical concurrent GETs are coalesced: the first caller starts the
+        request, later callers await the same in-flight result. A caller being
+        cancelled does not cancel the shared request.
+        """
+        key = self._request_key(path, params, headers)
+        if cache_ttl > 0:
+            cached = self._cache.get(key)
             if cached is not None:
+                self.stats.hits += 1
                 return cached
 
-        data = await self._request("GET", path, params=params, headers=headers)
+        disk_ttl = self._persistent_ttl(path)
+        if disk_ttl > 0:
+            stored = self._disk_cache.get(self._disk_key("GET", path, params))
+            if stored is not None:
+                self.stats.disk_hits += 1
+                if cache_ttl > 0:
+                    self._cache.set(key, stored, cache_ttl)
+                return stored
 
-        if cache_key and cache_ttl > 0:
-            self._cache.set(cache_key, data, cache_ttl)
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats.misses += 1
+            task = asyncio.ensure_future(
+                self._fetch_and_cache(key, path, params, headers, cache_ttl, disk_ttl)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finish_inflight(key, t))
+        else:
+            self.stats.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _request_key(
+        path: str,
+        params: dict[str, Any] | None,
+        headers: dict[str, str] | None = None,
+    ) -> str:
+        key = make_cache_key("GET", path, params)
+        if headers:
+            key += f":{json.dumps(headers, sort_keys=True)}"
+        return key
 
+    async def _fetch_and_cache(
+        self,
+        key: str,
+        path: str,
+        params: dict[str, Any] | None,
+        headers: dict[str, str] | None,
+        cache_ttl: float,
+        disk_ttl: float = 0,
+    ) -> Any:
+        data = await self._request("GET", path, params=params, headers=headers)
+        if cache_ttl > 0:
+            self._cache.set(key, data, cache_ttl)
+        if disk_ttl > 0:
+            self._store_persistent("GET", path, params, data, disk_ttl)
         return data
 
+    def _persistent_ttl(self, path: str) -> float:
+        """Persistent-tier TTL for an endpoint (0 = not persisted)."""
+        if self._disk_cache is None:
+            return 0.0
+        return self._persistent_ttls.get(path.split("?", 1)[0], 0.0)
+
+    def _disk_key(self, method: str, path: str, payload: Any) -> str:
+        # Query strings are dropped so API keys embedded in paths never reach disk
+        return f"{self.provider_name}|{make_cache_key(method, path.split('?', 1)[0], payload)}"
+
+    def _store_persistent(
+        self, method: str, path: str, payload: Any, data: Any, ttl: float
+    ) -> None:
+        self._disk_cache.set(
+            self._disk_key(method, path, payload),
+            data,
+            ttl,
+            provider=self.provider_name,
+            endpoint=path.split("?", 1)[0],
+        )
+
+    def _finish_inflight(self, key: str, task: asyncio.Future[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
     async def post(
         self,
         path: str,
-        json_data: dict[str, Any] | None = None,
+        json_data: dict[str, Any] | list[Any] | None = None,
         headers: dict[str, str] | None = None,
     ) -> Any:
-        """POST request with rate limiting and retry."""
-        return await self._request("POST", path, json_data=json_data, headers=headers)
+        """POST request with rate limiting and retry.
+
+        Read-only POST endpoints listed in persistent_ttls are served from
+        the persistent tier when possible.
+        """
+        disk_ttl = self._persistent_ttl(path)
+        if disk_ttl > 0:
+            stored = self._disk_cache.get(self._disk_key("POST", path, json_data))
+            if stored is not None:
+                self.stats.disk_hits += 1
+                return stored
+
+        data = await self._request("POST", path, json_data=json_data, headers=headers)
+        if disk_ttl > 0:
+            self._store_persistent("POST", path, json_data, data, disk_ttl)
+        return data
 
     async def _request(
         self,
         method: str,
         path: str,
         params: dict[str, Any] | None = None,
-        json_data: dict[str, Any] | None = None,
+        json_data: dict[str, Any] | list[Any] | None = None,
         headers: dict[str, str] | None = None,
     ) -> Any:
-        """Execute request with retry and backoff."""
-        last_error: Exception | None = None
-        delay = self.backoff_base
+        """Execute request through the retry engine (the only retry layer; deadline-aware)."""
+        label = f"{method} {path.split('?', 1)[0]}"
 
-        for attempt in range(self.max_retries + 1):
-            # Rate limit
-            wait = self._rate_limiter.acquire()
-            if wait > 0:
-                await asyncio.sleep(wait)
+        async def attempt() -> Any:
+            # Rate limit (FIFO slot in the provider's shared bucket); fail fast
+            # if the slot lies beyond the context deadline
+            check_deadline(f"{self.provider_name} {label}")
+            await self._rate_limiter.acquire(max_wait=time_left())
 
             try:
                 response = await self._client.request(
@@ -186,100 +509,532 @@ class BaseClient:
                     params=params,
                     json=json_data,
                     headers=headers,
+                    # Per-request timeout shrinks to the remaining budget
+                    timeout=bounded_timeout(self.timeout, f"{self.provider_name} {label}"),
+                    extensions={"trace": self.connection_stats.trace},
                 )
+            except (httpx.TimeoutException, httpx.ConnectError) as e:
+                raise APIError(
+                    f"Connection error to {self.provider_name}: {e}",
+                    provider=self.provider_name,
+                    retryable=True,
+                ) from e
+            self.connection_stats.record_response(response)
 
-                if response.status_code == 429:
-                    retry_after = float(response.headers.get("retry-after", delay))
-                    raise APIError(
-                        f"Rate limited by {self.provider_name}",
-                        status_code=429,
-                        provider=self.provider_name,
-                        retryable=True,
-                    )
-
-                if response.status_code >= 500:
-                    raise APIError(
-                        f"Server error from {self.provider_name}: {response.status_code}",
-                        status_code=response.status_code,
-                        provider=self.provider_name,
-                        retryable=True,
-                    )
-
-                if response.status_code >= 400:
-                    raise APIError(
-                        f"Client error from {self.provider_name}: {response.status_code} — {response.text[:200]}",
-                        status_code=response.status_code,
-                        provider=self.provider_name,
-                        retryable=False,
+            if response.status_code == 429:
+                # Pause the whole provider; every queued caller waits it out
+                self._rate_limiter.pause(
+                    _parse_retry_after(
+                        response.headers.get("retry-after"), self.retry_policy.base_delay
                     )
+                )
+                raise APIError(
+                    f"Rate limited by {self.provider_name}",
+                    status_code=429,
+                    provider=self.provider_name,
+                    retryable=True,
+                )
 
-                return response.json()
-
-            except (httpx.TimeoutException, httpx.ConnectError) as e:
-                last_error = APIError(
-                    f"Connection error to {self.provider_name}: {e}",
+            if response.status_code >= 500:
+                raise APIError(
+                    f"Server error from {self.provider_name}: {response.status_code}",
+                    status_code=response.status_code,
                     provider=self.provider_name,
                     retryable=True,
                 )
-            except APIError as e:
-                last_error = e
-                if not e.retryable:
-                    raise
 
-            # Backoff before retry
-            if attempt < self.max_retries:
-                await asyncio.sleep(min(delay, self.backoff_max))
-                delay *= self.backoff_multiplier
+            if response.status_code >= 400:
+                raise APIError(
+                    f"Client error from {self.provider_name}: {response.status_code} — "
+                    f"{response.text[:200]}",
+                    status_code=response.status_code,
+                    provider=self.provider_name,
+                    retryable=False,
+                )
+
+            return response.json()
+
+        return await retry_call(
+            attempt,
+            self.retry_policy,
+            label=label,
+            stats=self.retry_stats,
+            delay_hint=self._retry_delay_hint,
+        )
+
+    def _retry_delay_hint(self, exc: BaseException) -> float | None:
+        # After a 429 the wait is the provider pause, not the exponential backoff
+        if isinstance(exc, APIError) and exc.status_code == 429:
+            return self._rate_limiter.paused_for()
+        return None
+
+
+# Per-item JSON-RPC errors worth re-sending to the next endpoint
+# (-32005: node behind / request limit, -32603: internal error)
+RETRYABLE_RPC_ERROR_CODES = frozenset({-32005, -32603})
+
+# Read-only JSON-RPC methods safe to send to two endpoints at once (hedging).
+# Anything else (sendTransaction, sendBundle, ...) is never hedged.
+HEDGEABLE_RPC_METHODS = frozenset({
+    "getAccountInfo", "getBalance", "getBlockHeight", "getBundleStatuses", "getHealth",
+    "getLatestBlockhash", "getMultipleAccounts", "getProgramAccounts",
+    "getRecentPrioritizationFees", "getSignatureStatuses", "getSignaturesForAddress",
+    "getSlot", "getTipAccounts", "getTokenAccountBalance", "getTokenAccountsByOwner",
+    "getTokenLargestAccounts", "getTokenSupply", "getTransaction", "simulateTransaction",
+})
+
+
+def rpc_hedgeable(payload: Any) -> bool:
+    """True if a JSON-RPC object or array only calls methods in HEDGEABLE_RPC_METHODS."""
+    calls = payload if isinstance(payload, list) else [payload]
+    return bool(calls) and all(
+        isinstance(call, dict) and call.get("method") in HEDGEABLE_RPC_METHODS for call in calls
+    )
+
+
+def _rpc_item_retryable(item: dict[str, Any]) -> bool:
+    error = item.get("error")
+    return isinstance(error, dict) and error.get("code") in RETRYABLE_RPC_ERROR_CODES
+
+
+class EndpointHealth:
+    """Rolling latency/error statistics and circuit breaker for one RPC endpoint.
+
+    Samples older than `window_seconds` are dropped, so a demoted endpoint
+    falls back to its prior score and gets traffic again once it has been
+    left alone for a while. The circuit opens after `failure_threshold`
+    consecutive failures and stays open for a cool-down that grows
+    (`multiplier`, up to `max_cooldown`) while the endpoint keeps failing
+    its half-open trial request.
+    """
 
-        raise last_error or APIError(f"Request failed after {self.max_retries} retries")
+    def __init__(
+        self,
+        prior_latency: float = 1.0,
+        window: int = 50,
+        window_seconds: float = 300.0,
+        failure_threshold: int = 3,
+        cooldown: float = 1.0,
+        max_cooldown: float = 60.0,
+        multiplier: float = 2.0,
+    ):
+        self.prior_latency = prior_latency
+        self.window_seconds = window_seconds
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.multiplier = multiplier
+        self._latencies: deque[tuple[float, float]] = deque(maxlen=window)
+        self._outcomes: deque[tuple[float, bool]] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._cooldown = cooldown
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.window_seconds
+        for samples in (self._latencies, self._outcomes):
+            while samples and samples[0][0] < cutoff:
+                samples.popleft()
+
+    def record_success(self, latency: float) -> None:
+        now = time.monotonic()
+        self._latencies.append((now, latency))
+        self._outcomes.append((now, True))
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._cooldown = self.base_cooldown
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, False))
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.open_until = now + self._cooldown
+            self._cooldown = min(self._cooldown * self.multiplier, self.max_cooldown)
+
+    def available(self) -> bool:
+        """False while the circuit is open (cool-down not yet elapsed)."""
+        return time.monotonic() >= self.open_until
+
+    def samples(self) -> int:
+        self._prune()
+        return len(self._latencies)
+
+    def error_rate(self) -> float:
+        self._prune()
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def percentile(self, q: float) -> float | None:
+        self._prune()
+        if not self._latencies:
+            return None
+        ordered = sorted(latency for _, latency in self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def score(self) -> float:
+        """Expected cost of sending here (lower is better): median latency, inflated by errors."""
+        median = self.percentile(0.5)
+        return (median if median is not None else self.prior_latency) * (1 + 4 * self.error_rate())
+
+    def to_dict(self) -> dict[str, Any]:
+        p50, p90 = self.percentile(0.5), self.percentile(0.9)
+        return {
+            "samples": len(self._outcomes),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p90_ms": round(p90 * 1000, 1) if p90 is not None else None,
+            "error_rate": round(self.error_rate(), 3),
+            "score": round(self.score(), 4),
+            "circuit_open": not self.available(),
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+# Health survives across RPCFallbackClient instances (one per HeliusClient), keyed by
+# endpoint URL: tiers pointing at the same server share its latency and circuit breaker
+_endpoint_health: dict[str, EndpointHealth] = {}
+
+
+def rpc_endpoints_from_config(
+    rpc_config: dict[str, Any],
+    env: dict[str, str] | None = None,
+) -> list[dict[str, Any]]:
+    """Endpoint chain from firehose.yaml `rpc:` (primary, fallback_1, ... in file order).
+
+    ${VAR} placeholders in URLs are filled from `env` (default: os.environ);
+    endpoints whose placeholders stay unresolved (or resolve empty) are skipped.
+    """
+    values = dict(os.environ) if env is None else env
+    endpoints = []
+    for tier, ep in rpc_config.items():
+        if not isinstance(ep, dict) or "url" not in ep:
+            continue  # backoff / circuit_breaker / hedge settings
+        url = Template(str(ep["url"])).safe_substitute(values)
+        if "${" in url or url.endswith("="):
+            continue
+        endpoints.append({**ep, "url": url, "tier": tier})
+    return endpoints
 
 
 class RPCFallbackClient:
-    """RPC client with automatic fallback chain rotation.
+    """RPC client with health-scored endpoint selection.
 
-    Tries primary RPC first, falls back to secondary/tertiary on failure.
-    Exponential backoff on each provider before moving to the next.
+    Endpoints are tried in order of health score (rolling median latency,
+    inflated by error rate), so a degraded primary stops costing every call
+    its full timeout. A circuit breaker skips an endpoint for a cool-down
+    after repeated failures. With hedge=True, a request still running past
+    its endpoint's p90 latency is also sent to the next endpoint and the
+    first success wins. Only GETs and JSON-RPC payloads whose methods are
+    all in HEDGEABLE_RPC_METHODS are hedged.
+    Pass a ClientPool to share endpoint clients (keyed "rpc:<provider>").
+    Health is tracked per endpoint URL.
+
+    call() batches transparently: concurrent calls issued within
+    `batch_window` seconds are sent as one JSON-RPC array, and each
+    response object is routed back to its own caller.
     """
 
-    def __init__(self, endpoints: list[dict[str, Any]]):
+    def __init__(
+        self,
+        endpoints: list[dict[str, Any]],
+        pool: ClientPool | None = None,
+        max_batch_size: int = 100,
+        batch_window: float = 0.002,
+        hedge: bool = False,
+        min_hedge_samples: int = 10,
+        circuit_breaker: dict[str, Any] | None = None,
+        health: dict[str, EndpointHealth] | None = None,
+    ):
         self._endpoints = endpoints
+        self._pool = pool
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.hedge = hedge
+        self.min_hedge_samples = min_hedge_samples
+        self.hedges_sent = 0
+        self._pending: list[tuple[dict[str, Any], asyncio.Future[Any]]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._dispatches: set[asyncio.Task[None]] = set()
+        self.batches_sent = 0
+        self.calls_batched = 0
         self._clients: list[BaseClient] = []
+        self._health: list[EndpointHealth] = []
+        registry = _endpoint_health if health is None else health
+        breaker = circuit_breaker or {}
         for ep in endpoints:
-            self._clients.append(
-                BaseClient(
+            def factory(ep: dict[str, Any] = ep) -> BaseClient:
+                return BaseClient(
                     base_url=ep["url"],
                     rate_limit=ep.get("rate_limit", 10.0),
                     timeout=ep.get("timeout_seconds", 10.0),
                     provider_name=ep.get("provider", "unknown"),
                     max_retries=1,  # Quick fail per-provider, fallback handles retry
                 )
-            )
+
+            if pool is not None:
+                key = f"rpc:{ep.get('provider', 'unknown')}"
+                self._clients.append(pool.get(key, factory, config={"url": ep["url"]}))
+            else:
+                self._clients.append(factory())
+            if ep["url"] not in registry:
+                registry[ep["url"]] = EndpointHealth(
+                    # Unmeasured endpoints rank by their configured timeout, preserving file order
+                    prior_latency=float(ep.get("timeout_seconds", 10.0)) / 2,
+                    failure_threshold=int(breaker.get("failure_threshold", 3)),
+                    cooldown=float(breaker.get("initial_seconds", 1.0)),
+                    max_cooldown=float(breaker.get("max_seconds", 60.0)),
+                    multiplier=float(breaker.get("multiplier", 2.0)),
+                )
+            self._health.append(registry[ep["url"]])
+
+    @classmethod
+    def from_config(
+        cls,
+        rpc_config: dict[str, Any],
+        env: dict[str, str] | None = None,
+        pool: ClientPool | None = None,
+    ) -> RPCFallbackClient:
+        """Build from firehose.yaml `rpc:` (endpoint tiers, backoff, hedge)."""
+        return cls(
+            rpc_endpoints_from_config(rpc_config, env),
+            pool=pool,
+            hedge=bool(rpc_config.get("hedge", False)),
+            circuit_breaker=rpc_config.get("backoff"),
+        )
+
+    def _ordered(self) -> list[int]:
+        """Endpoint indices, healthiest first; open circuits last (never zero candidates)."""
+        return sorted(
+            range(len(self._clients)),
+            key=lambda i: (not self._health[i].available(), self._health[i].score()),
+        )
+
+    def endpoint_health(self) -> dict[str, dict[str, Any]]:
+        """Health per provider name (URLs are not shown: they may carry API keys)."""
+        return {
+            client.provider_name: health.to_dict()
+            for client, health in zip(self._clients, self._health)
+        }
+
+    async def _timed(self, index: int, send: Callable[[BaseClient], Awaitable[Any]]) -> Any:
+        start = time.monotonic()
+        try:
+            result = await send(self._clients[index])
+        except APIError:
+            self._health[index].record_failure()
+            raise
+        except httpx.HTTPError as e:
+            self._health[index].record_failure()
+            raise APIError(
+                f"Transport error from {self._clients[index].provider_name}: {e}",
+                provider=self._clients[index].provider_name,
+                retryable=True,
+            ) from e
+        self._health[index].record_success(time.monotonic() - start)
+        return result
+
+    def _hedge_delay(self, index: int, hedge: bool) -> float | None:
+        health = self._health[index]
+        if not (self.hedge and hedge) or health.samples() < self.min_hedge_samples:
+            return None
+        return health.percentile(0.9)
+
+    async def _first_success(
+        self,
+        candidates: list[int],
+        send: Callable[[BaseClient], Awaitable[Any]],
+        errors: list[str],
+        hedge: bool = False,
+    ) -> tuple[int, Any]:
+        """Send to candidates (consumed from the front) until one succeeds.
+
+        `hedge` allows (if enabled on the client) sending to the next
+        candidate while a slow one is still running; pass it for reads only.
+        """
+        running: dict[asyncio.Task[Any], int] = {}
+        launch_next = True
+        try:
+            while candidates or running:
+                if launch_next and candidates:
+                    if not running:
+                        check_deadline("rpc request")  # No point starting the next endpoint
+                    index = candidates.pop(0)
+                    running[asyncio.ensure_future(self._timed(index, send))] = index
+                    if len(running) > 1:
+                        self.hedges_sent += 1
+                    hedge_after = self._hedge_delay(index, hedge) if candidates else None
+                elif launch_next:
+                    hedge_after = None
+                launch_next = False
+                done, _ = await asyncio.wait(
+                    running, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    launch_next = True  # Slower than its p90: hedge to the next endpoint
+                    hedge_after = None
+                    continue
+                for task in done:
+                    index = running.pop(task)
+                    try:
+                        return index, task.result()
+                    except APIError as e:
+                        errors.append(f"{self._clients[index].provider_name}: {e}")
+                if not running:
+                    launch_next = True
+        finally:
+            for task in running:
+                task.cancel()  # Losing hedge (or caller cancelled)
+        raise APIError(
+            f"All RPC endpoints failed: {'; '.join(errors)}",
+            provider="rpc_fallback",
+            retryable=False,
+        )
 
     async def request(
         self,
         method: str,
         path: str = "",
-        json_data: dict[str, Any] | None = None,
+        json_data: dict[str, Any] | list[Any] | None = None,
         params: dict[str, Any] | None = None,
+        hedge: bool | None = None,
     ) -> Any:
-        """Try each RPC endpoint in order. Return first success."""
+        """Try endpoints healthiest-first. Return first success.
+
+        `hedge` defaults to True for GETs and for POSTs of read-only JSON-RPC
+        methods (rpc_hedgeable), False otherwise.
+        """
+        async def send(client: BaseClient) -> Any:
+            if method == "POST":
+                return await client.post(path, json_data=json_data)
+            return await client.get(path, params=params)
+
+        if hedge is None:
+            hedge = method != "POST" or rpc_hedgeable(json_data)
+        _, result = await self._first_success(self._ordered(), send, [], hedge)
+        return result
+
+    async def call(self, method: str, params: list[Any] | None = None) -> dict[str, Any]:
+        """JSON-RPC call, batched with concurrent calls.
+
+        Returns the response object ({"result": ...} or {"error": ...}), the
+        same shape a single request() POST returns.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        self._pending.append(({"method": method, "params": params or []}, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._dispatch(pending))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, pending: list[tuple[dict[str, Any], asyncio.Future[Any]]]) -> None:
+        try:
+            responses = await self.request_batch([call for call, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), response in zip(pending, responses):
+            if not future.done():  # Caller may have been cancelled
+                future.set_result(response)
+
+    async def request_batch(self, calls: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Send {"method", "params"} calls as JSON-RPC arrays; one response per call, in order.
+
+        A batch that fails as a whole (HTTP error, timeout) moves to the next
+        endpoint. Items missing from the response or failing with a retryable
+        error code are re-sent to the next endpoint as a smaller batch; other
+        per-item errors are returned to their caller unchanged.
+
+        Raises:
+            APIError: if no endpoint answered any part of the batch
+        """
+        if len(calls) > self.max_batch_size:
+            chunks = await asyncio.gather(*[
+                self.request_batch(calls[i:i + self.max_batch_size])
+                for i in range(0, len(calls), self.max_batch_size)
+            ])
+            return [response for chunk in chunks for response in chunk]
+
+        results: list[dict[str, Any] | None] = [None] * len(calls)
+        remaining = list(range(len(calls)))
         errors: list[str] = []
-        for i, client in enumerate(self._clients):
+        candidates = self._ordered()
+        hedge = rpc_hedgeable(calls)
+        while remaining and candidates:
+            payload = [
+                {
+                    "jsonrpc": "2.0",
+                    "id": i,
+                    "method": calls[i]["method"],
+                    "params": calls[i].get("params", []),
+                }
+                for i in remaining
+            ]
+
+            async def send(client: BaseClient, payload: list[dict[str, Any]] = payload) -> Any:
+                return await client.post("", json_data=payload)
+
             try:
-                if method == "POST":
-                    return await client.post(path, json_data=json_data)
-                else:
-                    return await client.get(path, params=params)
-            except APIError as e:
-                errors.append(f"{client.provider_name}: {e}")
-                continue
+                index, response = await self._first_success(candidates, send, errors, hedge)
+            except APIError:
+                break
+            self.batches_sent += 1
+            self.calls_batched += len(payload)
 
-        raise APIError(
-            f"All RPC endpoints failed: {'; '.join(errors)}",
-            provider="rpc_fallback",
-            retryable=False,
-        )
+            # Non-array replies (endpoint rejected batching) count as all-missing
+            by_id = {
+                item.get("id"): item
+                for item in (response if isinstance(response, list) else [])
+                if isinstance(item, dict)
+            }
+            retry: list[int] = []
+            for i in remaining:
+                item = by_id.get(i)
+                if item is not None:
+                    results[i] = item  # Kept even if retryable, in case no endpoint does better
+                if item is None or _rpc_item_retryable(item):
+                    retry.append(i)
+            if retry:
+                provider = self._clients[index].provider_name
+                errors.append(
+                    f"{provider}: {len(retry)}/{len(payload)} batch items unanswered or retryable"
+                )
+            remaining = retry
+
+        if all(item is None for item in results):
+            raise APIError(
+                f"All RPC endpoints failed: {'; '.join(errors)}",
+                provider="rpc_fallback",
+                retryable=False,
+            )
+        return [
+            item if item is not None else {
+                "jsonrpc": "2.0",
+                "id": i,
+                "error": {
+                    "code": -32603,
+                    "message": f"No RPC endpoint answered: {'; '.join(errors)}",
+                },
+            }
+            for i, item in enumerate(results)
+        ]
 
     async def close(self) -> None:
+        if self._pool is not None:
+            return  # Pooled endpoint clients are closed by ClientPool.close_all()
         for client in self._clients:
             await client.close()
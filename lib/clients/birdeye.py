@@ -7,11 +7,16 @@ Used by:
 
 from __future__ import annotations
 
+import asyncio
 import os
 from typing import Any
 
 from lib.clients.base import BaseClient
-from lib.utils.retry import with_retry
+from lib.clients.disk_cache import get_disk_cache, persistent_cache_ttls
+from lib.clients.pool import get_client_pool
+
+# Birdeye /defi/multi_price accepts at most 100 addresses per call
+MULTI_PRICE_MAX_BATCH = 100
 
 
 class BirdeyeClient:
@@ -19,18 +24,23 @@ class BirdeyeClient:
 
     def __init__(self, api_key: str | None = None):
         self.api_key = api_key or os.environ.get("BIRDEYE_API_KEY", "")
-        self._client = BaseClient(
-            base_url="https://public-api.birdeye.so",
-            headers={
-                "X-API-KEY": self.api_key,
-                "x-chain": "solana",
-            },
-            rate_limit=5.0,
-            timeout=10.0,
-            provider_name="birdeye",
+        self._client = get_client_pool().get(
+            "birdeye",
+            lambda: BaseClient(
+                base_url="https://public-api.birdeye.so",
+                headers={
+                    "X-API-KEY": self.api_key,
+                    "x-chain": "solana",
+                },
+                rate_limit=5.0,
+                timeout=10.0,
+                provider_name="birdeye",
+                disk_cache=get_disk_cache(),
+                persistent_ttls=persistent_cache_ttls("birdeye"),
+            ),
+            config={"api_key": self.api_key},
         )
 
-    @with_retry
     async def get_token_overview(self, mint: str) -> dict[str, Any]:
         """Get token overview: price, liquidity, volume, mc, holders."""
         return await self._client.get(
@@ -39,7 +49,6 @@ class BirdeyeClient:
             cache_ttl=30,
         )
 
-    @with_retry
     async def get_token_security(self, mint: str) -> dict[str, Any]:
         """Get token security info: top holders, mutable authority, etc."""
         return await self._client.get(
@@ -48,7 +57,6 @@ class BirdeyeClient:
             cache_ttl=60,
         )
 
-    @with_retry
     async def get_price(self, mint: str) -> dict[str, Any]:
         """Get current price."""
         return await self._client.get(
@@ -57,7 +65,47 @@ class BirdeyeClient:
             cache_ttl=15,
         )
 
-    @with_retry
+    async def get_multi_price(
+        self,
+        mints: list[str],
+        include_liquidity: bool = True,
+    ) -> dict[str, dict[str, Any]]:
+        """Get price (and liquidity) for many mints in ceil(N / 100) requests.
+
+        Returns mint -> Birdeye price item ({"value", "liquidity", "updateUnixTime", ...}).
+        Mints missing from the response, or in a chunk that failed, are absent
+        from the result so callers can fall back to per-mint requests.
+        """
+        unique = list(dict.fromkeys(m for m in mints if m))
+        chunks = [
+            unique[i:i + MULTI_PRICE_MAX_BATCH]
+            for i in range(0, len(unique), MULTI_PRICE_MAX_BATCH)
+        ]
+        responses = await asyncio.gather(
+            *[self._get_multi_price_chunk(chunk, include_liquidity) for chunk in chunks],
+            return_exceptions=True,
+        )
+
+        prices: dict[str, dict[str, Any]] = {}
+        for response in responses:
+            if not isinstance(response, dict):
+                continue  # Failed chunk
+            data = response.get("data") or {}
+            if not isinstance(data, dict):
+                continue
+            for mint, item in data.items():
+                if isinstance(item, dict) and item.get("value") is not None:
+                    prices[mint] = item
+        return prices
+
+    async def _get_multi_price_chunk(
+        self, mints: list[str], include_liquidity: bool
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {"list_address": ",".join(mints)}
+        if include_liquidity:
+            params["include_liquidity"] = "true"
+        return await self._client.get("/defi/multi_price", params=params, cache_ttl=15)
+
     async def get_price_volume(self, mint: str, timeframe: str = "1h") -> dict[str, Any]:
         """Get price and volume for a timeframe (1h, 4h, 24h)."""
         type_map = {"1h": "1H", "4h": "4H", "24h": "24H"}
@@ -67,7 +115,6 @@ class BirdeyeClient:
             cache_ttl=30,
         )
 
-    @with_retry
     async def get_token_list_trending(self, limit: int = 20) -> dict[str, Any]:
         """Get trending tokens by volume."""
         return await self._client.get(
@@ -76,7 +123,6 @@ class BirdeyeClient:
             cache_ttl=60,
         )
 
-    @with_retry
     async def get_holder_count(self, mint: str) -> dict[str, Any]:
         """Get holder count and recent change."""
         return await self._client.get(
@@ -85,7 +131,6 @@ class BirdeyeClient:
             cache_ttl=60,
         )
     
-    @with_retry
     async def get_trades(self, mint: str, limit: int = 100, offset: int = 0) -> dict[str, Any]:
         """Get recent trades for volume concentration analysis."""
         return await self._client.get(
@@ -95,4 +140,4 @@ class BirdeyeClient:
         )
 
     async def close(self) -> None:
-        await self._client.close()
+        """No-op: the pooled transport stays warm until close_client_pool()."""
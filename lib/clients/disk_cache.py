@@ -0,0 +1,218 @@
+"""Persistent response cache — SQLite tier behind BaseClient.
+
+Each heartbeat runs as a fresh process, so the in-memory ResponseCache is
+empty at the start of every cycle. Slow-changing endpoints (token security,
+holder data, Helius metadata) are also cached here, in state/response_cache.db,
+with per-endpoint TTLs from config/firehose.yaml:
+
+    response_cache:
+      enabled: true
+      path: state/response_cache.db
+    birdeye:
+      persistent_cache_ttls:
+        /defi/token_security: 21600
+
+SQLite in WAL mode with a busy timeout makes the file safe to share between
+the heartbeat and skill CLIs running at the same time. Expired rows are
+deleted on the first write of each process and every 64 writes after that.
+
+Usage:
+    python3 -m lib.clients.disk_cache --stats
+    python3 -m lib.clients.disk_cache --list [--provider birdeye]
+    python3 -m lib.clients.disk_cache --purge [--provider birdeye] [--expired]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from lib.config import WORKSPACE, load_firehose_config
+
+DEFAULT_PATH = WORKSPACE / "state" / "response_cache.db"
+
+
+class DiskCache:
+    """Cross-process TTL cache stored in SQLite.
+
+    The connection is opened lazily, so constructing a DiskCache never
+    touches the filesystem until the first read or write.
+    """
+
+    def __init__(self, path: Path | None = None, busy_timeout: float = 5.0):
+        self.path = path or DEFAULT_PATH
+        self.busy_timeout = busy_timeout
+        self._conn: sqlite3.Connection | None = None
+        self._sets = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_expiry ON responses (expires_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached payload, or None if missing/expired/unreadable."""
+        try:
+            row = self._connect().execute(
+                "SELECT data, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or row[1] < time.time():
+            return None
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    def set(
+        self, key: str, data: Any, ttl_seconds: float, provider: str = "", endpoint: str = ""
+    ) -> None:
+        """Store a payload (pruning expired rows now and then).
+
+        Failures (locked/readonly db) are swallowed — it's only a cache.
+        """
+        now = time.time()
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, provider, endpoint, data, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, endpoint, json.dumps(data, default=str), now, now + ttl_seconds),
+            )
+            self._sets += 1
+            if self._sets % 64 == 1:
+                self.purge(expired_only=True)
+        except (sqlite3.Error, TypeError, ValueError):
+            pass
+
+    def purge(self, provider: str | None = None, expired_only: bool = False) -> int:
+        """Delete entries. Returns the number removed."""
+        clauses, args = [], []
+        if provider:
+            clauses.append("provider = ?")
+            args.append(provider)
+        if expired_only:
+            clauses.append("expires_at < ?")
+            args.append(time.time())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self._connect().execute(f"DELETE FROM responses{where}", args)
+        return cursor.rowcount
+
+    def entries(self, provider: str | None = None, limit: int = 100) -> list[dict[str, Any]]:
+        """List entries (most recent first) without their payloads."""
+        query = (
+            "SELECT provider, endpoint, key, length(data), created_at, expires_at FROM responses"
+        )
+        args: list[Any] = []
+        if provider:
+            query += " WHERE provider = ?"
+            args.append(provider)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        now = time.time()
+        return [
+            {
+                "provider": r[0],
+                "endpoint": r[1],
+                "key": r[2],
+                "bytes": r[3],
+                "age_seconds": round(now - r[4], 1),
+                "ttl_remaining_seconds": round(r[5] - now, 1),
+            }
+            for r in self._connect().execute(query, args).fetchall()
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        now = time.time()
+        rows = self._connect().execute(
+            "SELECT provider, COUNT(*), SUM(length(data)), SUM(expires_at < ?) "
+            "FROM responses GROUP BY provider",
+            (now,),
+        ).fetchall()
+        return {
+            "path": str(self.path),
+            "providers": {
+                r[0]: {"entries": r[1], "bytes": r[2] or 0, "expired": r[3] or 0}
+                for r in rows
+            },
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_disk_cache: DiskCache | None = None
+
+
+def get_disk_cache() -> DiskCache | None:
+    """Global DiskCache, or None if disabled via response_cache.enabled in firehose.yaml."""
+    global _disk_cache
+    settings = load_firehose_config().get("response_cache", {})
+    if not settings.get("enabled", False):
+        return None
+    if _disk_cache is None:
+        path = settings.get("path")
+        _disk_cache = DiskCache(WORKSPACE / path if path else None)
+    return _disk_cache
+
+
+def persistent_cache_ttls(provider: str) -> dict[str, float]:
+    """Per-endpoint persistent TTLs for a provider (<provider>.persistent_cache_ttls)."""
+    ttls = load_firehose_config().get(provider, {}).get("persistent_cache_ttls", {}) or {}
+    return {str(endpoint): float(ttl) for endpoint, ttl in ttls.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Persistent response cache — inspect and purge")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--stats", action="store_true", help="Entry counts and sizes per provider")
+    action.add_argument("--list", action="store_true", help="List cached entries")
+    action.add_argument("--purge", action="store_true", help="Delete cached entries")
+    parser.add_argument("--provider", help="Restrict to one provider (e.g. birdeye)")
+    parser.add_argument("--expired", action="store_true", help="With --purge: only expired entries")
+    parser.add_argument(
+        "--limit", type=int, default=100, help="With --list: max entries (default: 100)"
+    )
+    args = parser.parse_args()
+
+    cache = get_disk_cache() or DiskCache()
+    if args.stats:
+        result: dict[str, Any] = {"status": "OK", **cache.stats()}
+    elif args.list:
+        entries = cache.entries(args.provider, args.limit)
+        result = {"status": "OK", "entries": entries, "count": len(entries)}
+    else:
+        removed = cache.purge(args.provider, expired_only=args.expired)
+        result = {"status": "OK", "removed": removed}
+    cache.close()
+
+    print(json.dumps(result, indent=2))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 """Helius API client — Solana RPC + Enhanced APIs.
 
 Provides:
-- Solana RPC calls (with fallback chain)
+- Solana RPC calls (with fallback chain, JSON-RPC batching)
 - Token metadata
 - Transaction simulation (honeypot detection)
 - Recent pool detection (Pump.fun/Raydium)
@@ -13,6 +13,25 @@ import os
 from typing import Any
 
 from lib.clients.base import BaseClient, RPCFallbackClient
+from lib.clients.disk_cache import get_disk_cache, persistent_cache_ttls
+from lib.clients.pool import get_client_pool
+from lib.config import load_firehose_config
+
+# Used when config/firehose.yaml has no rpc: section
+DEFAULT_RPC_CONFIG: dict[str, Any] = {
+    "primary": {
+        "provider": "helius",
+        "url": "https://mainnet.helius-rpc.com/?api-key=${HELIUS_API_KEY}",
+        "rate_limit": 10.0,
+        "timeout_seconds": 10,
+    },
+    "fallback_1": {
+        "provider": "public",
+        "url": "https://api.mainnet-beta.solana.com",
+        "rate_limit": 5.0,
+        "timeout_seconds": 20,
+    },
+}
 
 
 class HeliusClient:
@@ -20,26 +39,24 @@ class HeliusClient:
 
     def __init__(self, api_key: str | None = None):
         self.api_key = api_key or os.environ.get("HELIUS_API_KEY", "")
-        self._api = BaseClient(
-            base_url="https://api.helius.xyz/v0",
-            rate_limit=10.0,
-            timeout=10.0,
-            provider_name="helius",
+        pool = get_client_pool()
+        self._api = pool.get(
+            "helius",
+            lambda: BaseClient(
+                base_url="https://api.helius.xyz/v0",
+                rate_limit=10.0,
+                timeout=10.0,
+                provider_name="helius",
+                disk_cache=get_disk_cache(),
+                persistent_ttls=persistent_cache_ttls("helius"),
+            ),
+        )
+        rpc_config = load_firehose_config().get("rpc") or DEFAULT_RPC_CONFIG
+        self._rpc = RPCFallbackClient.from_config(
+            rpc_config,
+            env={**os.environ, "HELIUS_API_KEY": self.api_key},
+            pool=pool,
         )
-        self._rpc = RPCFallbackClient([
-            {
-                "provider": "helius",
-                "url": f"https://mainnet.helius-rpc.com/?api-key={self.api_key}",
-                "rate_limit": 10.0,
-                "timeout_seconds": 10,
-            },
-            {
-                "provider": "public",
-                "url": "https://api.mainnet-beta.solana.com",
-                "rate_limit": 5.0,
-                "timeout_seconds": 20,
-            },
-        ])
 
     async def get_token_metadata(self, mint: str) -> dict[str, Any]:
         """Get token metadata (name, symbol, decimals, authority)."""
@@ -57,15 +74,7 @@ class HeliusClient:
 
     async def simulate_transaction(self, tx_base64: str) -> dict[str, Any]:
         """Simulate a transaction (for honeypot detection)."""
-        return await self._rpc.request(
-            "POST",
-            json_data={
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "simulateTransaction",
-                "params": [tx_base64, {"encoding": "base64"}],
-            },
-        )
+        return await self._rpc.call("simulateTransaction", [tx_base64, {"encoding": "base64"}])
 
     async def get_recent_transactions(
         self, address: str, limit: int = 10
@@ -78,29 +87,12 @@ class HeliusClient:
         return result if isinstance(result, list) else []
 
     async def get_account_info(self, address: str) -> dict[str, Any]:
-        """RPC getAccountInfo with fallback chain."""
-        return await self._rpc.request(
-            "POST",
-            json_data={
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getAccountInfo",
-                "params": [address, {"encoding": "jsonParsed"}],
-            },
-        )
+        """RPC getAccountInfo with fallback chain (batched with concurrent RPC calls)."""
+        return await self._rpc.call("getAccountInfo", [address, {"encoding": "jsonParsed"}])
 
     async def get_recent_slot_fees(self) -> dict[str, Any]:
         """Get recent priority fees for dynamic tip calculation."""
-        return await self._rpc.request(
-            "POST",
-            json_data={
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getRecentPrioritizationFees",
-                "params": [],
-            },
-        )
+        return await self._rpc.call("getRecentPrioritizationFees", [])
 
     async def close(self) -> None:
-        await self._api.close()
-        await self._rpc.close()
+        """No-op: the pooled transports stay warm until close_client_pool()."""
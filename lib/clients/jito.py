@@ -10,17 +10,21 @@ import os
 from typing import Any
 
 from lib.clients.base import BaseClient
+from lib.clients.pool import get_client_pool
 
 
 class JitoClient:
     """Jito Block Engine: MEV-protected bundle submission."""
 
     def __init__(self):
-        self._client = BaseClient(
-            base_url="https://mainnet.block-engine.jito.wtf",
-            rate_limit=5.0,
-            timeout=15.0,
-            provider_name="jito",
+        self._client = get_client_pool().get(
+            "jito",
+            lambda: BaseClient(
+                base_url="https://mainnet.block-engine.jito.wtf",
+                rate_limit=5.0,
+                timeout=15.0,
+                provider_name="jito",
+            ),
         )
 
     async def send_bundle(self, signed_transactions: list[str]) -> dict[str, Any]:
@@ -67,4 +71,4 @@ class JitoClient:
         )
 
     async def close(self) -> None:
-        await self._client.close()
+        """No-op: the pooled transport stays warm until close_client_pool()."""
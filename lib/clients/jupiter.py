@@ -10,6 +10,7 @@ import os
 from typing import Any
 
 from lib.clients.base import BaseClient
+from lib.clients.pool import get_client_pool
 
 # SOL mint address
 SOL_MINT = "So11111111111111111111111111111111111111112"
@@ -19,11 +20,14 @@ class JupiterClient:
     """Jupiter v6 API: quotes, swap transactions."""
 
     def __init__(self):
-        self._client = BaseClient(
-            base_url="https://quote-api.jup.ag/v6",
-            rate_limit=10.0,
-            timeout=10.0,
-            provider_name="jupiter",
+        self._client = get_client_pool().get(
+            "jupiter",
+            lambda: BaseClient(
+                base_url="https://quote-api.jup.ag/v6",
+                rate_limit=10.0,
+                timeout=10.0,
+                provider_name="jupiter",
+            ),
         )
 
     async def get_quote(
@@ -101,4 +105,4 @@ class JupiterClient:
         )
 
     async def close(self) -> None:
-        await self._client.close()
+        """No-op: the pooled transport stays warm until close_client_pool()."""
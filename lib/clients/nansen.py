@@ -9,7 +9,7 @@ import os
 from typing import Any
 
 from lib.clients.base import BaseClient
-from lib.utils.retry import with_retry
+from lib.clients.pool import get_client_pool
 
 
 class NansenClient:
@@ -17,27 +17,31 @@ class NansenClient:
 
     def __init__(self, api_key: str | None = None):
         self.api_key = api_key or os.environ.get("NANSEN_API_KEY", "")
-        self._client = BaseClient(
-            base_url="https://api.nansen.ai/api/v1",
-            headers={
-                "apiKey": self.api_key,
-                "Content-Type": "application/json",
-            },
-            rate_limit=2.0,
-            timeout=15.0,
-            provider_name="nansen",
+        self._client = get_client_pool().get(
+            "nansen",
+            lambda: BaseClient(
+                base_url="https://api.nansen.ai/api/v1",
+                headers={
+                    "apiKey": self.api_key,
+                    "Content-Type": "application/json",
+                },
+                rate_limit=2.0,
+                timeout=15.0,
+                provider_name="nansen",
+            ),
+            config={"api_key": self.api_key},
         )
 
-    @with_retry
     async def get_smart_money_transactions(
         self,
         chain: str = "solana",
         limit: int = 50,
+        page: int = 1,
     ) -> dict[str, Any]:
-        """Get recent smart money DEX trades on Solana."""
+        """Get smart money DEX trades on Solana, newest first (page 1 = latest)."""
         body = {
             "chains": [chain],
-            "pagination": {"page": 1, "per_page": limit},
+            "pagination": {"page": page, "per_page": limit},
             "order_by": [{"field": "block_timestamp", "direction": "DESC"}],
         }
         return await self._client.post(
@@ -45,7 +49,6 @@ class NansenClient:
             json_data=body,
         )
 
-    @with_retry
     async def get_token_smart_money(self, mint: str) -> dict[str, Any]:
         """Get smart money netflow for a specific token."""
         body = {
@@ -60,7 +63,6 @@ class NansenClient:
             json_data=body,
         )
 
-    @with_retry
     async def get_wallet_profile(self, address: str) -> dict[str, Any]:
         """Get wallet labels (Nansen Profiler API)."""
         body = {"chains": ["solana"], "address": address}
@@ -77,7 +79,6 @@ class NansenClient:
             json_data=body,
         )
     
-    @with_retry
     async def get_wallet_transaction_history(
         self, 
         address: str, 
@@ -97,4 +98,4 @@ class NansenClient:
         )
 
     async def close(self) -> None:
-        await self._client.close()
+        """No-op: the pooled transport stays warm until close_client_pool()."""
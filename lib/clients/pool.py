@@ -0,0 +1,169 @@
+"""Process-wide client pool — one warm BaseClient per provider.
+
+Provider wrappers (BirdeyeClient, NansenClient, ...) are cheap. The expensive
+part is the BaseClient underneath: its httpx keep-alive connections and its
+ResponseCache. The pool hands out a single BaseClient per provider so those
+survive across heartbeat steps and cycles, and closes everything in one place
+on shutdown.
+
+Clients are keyed by provider plus a fingerprint of the settings the factory
+builds them from (base URL, credentials, headers), so a caller with a
+different API key never receives another caller's client.
+
+Usage:
+    client = get_client_pool().get("birdeye", lambda: BaseClient(...), config={"api_key": key})
+    ...
+    await close_client_pool()  # once, on shutdown
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from lib.clients.base import BaseClient
+
+T = TypeVar("T")
+
+
+def config_fingerprint(config: Any) -> str:
+    """Short digest of a client's settings ("" for None); secrets never appear in stats."""
+    if config is None:
+        return ""
+    encoded = json.dumps(config, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:12]
+
+
+class ClientPool:
+    """Registry of shared BaseClient instances keyed by provider and settings."""
+
+    def __init__(self) -> None:
+        self._clients: dict[tuple[str, str], BaseClient] = {}
+        self._created_at: dict[tuple[str, str], float] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._janitor: asyncio.Task[None] | None = None
+        self._orphans: list[BaseClient] = []  # Left behind by a loop that ended unclosed
+
+    def get(
+        self, provider: str, factory: Callable[[], BaseClient], config: Any = None
+    ) -> BaseClient:
+        """Return the pooled client for a provider, building it on first use.
+
+        `config` is whatever distinguishes the clients `factory` may build
+        (base URL, API key, headers); callers passing different configs get
+        different clients.
+
+        Connections are bound to the event loop that opened them. Clients
+        still open when that loop shuts down are closed on it; if the pool is
+        reached from a new loop (e.g. a second asyncio.run()), they are
+        rebuilt.
+        """
+        self._check_loop()
+        key = (provider, config_fingerprint(config))
+        client = self._clients.get(key)
+        if client is None:
+            client = factory()
+            self._clients[key] = client
+            self._created_at[key] = time.monotonic()
+        return client
+
+    def _check_loop(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._loop is not loop:
+            if self._loop is not None:
+                # Sockets belong to the old loop (which did not run the janitor)
+                self._orphans.extend(self._clients.values())
+                self._clients.clear()
+                self._created_at.clear()
+            self._loop = loop
+            self._janitor = loop.create_task(self._close_at_loop_exit(loop))
+            if self._orphans:
+                loop.create_task(self._close_orphans())
+
+    async def _close_at_loop_exit(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Wait until the loop cancels this task on shutdown, then close its clients on it."""
+        try:
+            await asyncio.Event().wait()
+        finally:
+            if self._loop is loop:
+                await self._close_clients()
+                self._loop = None
+
+    async def _close_orphans(self) -> None:
+        orphans, self._orphans = self._orphans, []
+        for client in orphans:
+            try:
+                await client.close()
+            except Exception:
+                pass  # Connections tied to a closed loop; the transport drops them when collected
+
+    def _label(self, key: tuple[str, str]) -> str:
+        provider, fingerprint = key
+        if sum(1 for p, _ in self._clients if p == provider) == 1:
+            return provider
+        return f"{provider}:{fingerprint}" if fingerprint else provider
+
+    def providers(self) -> list[str]:
+        return sorted({provider for provider, _ in self._clients})
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per-provider pool stats: GET hit/miss/coalesced counts, cache and connection reuse."""
+        now = time.monotonic()
+        return {
+            self._label(key): {
+                "base_url": client.base_url,
+                "age_seconds": round(now - self._created_at[key], 1),
+                **client.stats.to_dict(),
+                "cache": client.cache_stats(),
+                "connections": client.connection_stats.to_dict(),
+                "retries": client.retry_stats.to_dict(),
+            }
+            for key, client in self._clients.items()
+        }
+
+    async def _close_clients(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._created_at.clear()
+        for client in clients:
+            try:
+                await client.close()
+            except Exception:
+                pass
+
+    async def close_all(self) -> None:
+        """Close every pooled client. Safe to call more than once."""
+        await self._close_clients()
+        await self._close_orphans()
+
+
+# Global pool instance
+_pool = ClientPool()
+
+
+def get_client_pool() -> ClientPool:
+    """Get the global client pool instance."""
+    return _pool
+
+
+async def close_client_pool() -> None:
+    """Close all pooled clients (call once on shutdown)."""
+    await _pool.close_all()
+
+
+async def with_client_pool(coro: Awaitable[T]) -> T:  # noqa: UP047
+    """Await a coroutine, then close the pool. For CLI entry points:
+
+        asyncio.run(with_client_pool(check_token(mint)))
+    """
+    try:
+        return await coro
+    finally:
+        await close_client_pool()
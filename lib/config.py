@@ -1,30 +1,264 @@
 """Configuration loader for AutistBoar.
 
 Loads YAML config files from config/ directory.
+
+ConfigService parses config/risk.yaml and config/firehose.yaml once,
+validates risk.yaml into frozen pydantic models and publishes both as an
+immutable ConfigSnapshot. Each access compares the files' mtime/size
+(at most every `min_check_interval` seconds) and, on change, builds and
+validates a new snapshot before swapping it in, so a half-edited or
+invalid file never replaces a good one. A heartbeat cycle pins one
+snapshot with config_scope(), so every guard and skill in that cycle sees
+the same thresholds even if the file changes mid-cycle.
+
+Usage:
+    risk = current_config().risk          # typed, frozen
+    risk.conviction.thresholds.auto_execute
+    with config_scope():                  # pin one snapshot for a cycle
+        ...
+    load_risk_config()                    # plain dict (copy), as before
 """
 
 from __future__ import annotations
 
+import contextvars
+import copy
+import sys
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import yaml
+from pydantic import BaseModel, ConfigDict, ValidationError
 
 WORKSPACE = Path(__file__).resolve().parent.parent
 CONFIG_DIR = WORKSPACE / "config"
 
 
-def load_risk_config() -> dict[str, Any]:
-    """Load config/risk.yaml."""
-    path = CONFIG_DIR / "risk.yaml"
+# Ints stay ints (messages print "24h", not "24.0h"); fractional edits still validate
+Number = int | float
+
+
+class _Section(BaseModel):
+    """Frozen config section; unknown keys are kept (the YAML is the source of truth)."""
+
+    model_config = ConfigDict(frozen=True, extra="allow")
+
+
+class PortfolioConfig(_Section):
+    starting_balance_sol: float = 0.0
+    max_concurrent_positions: int = 5
+    daily_exposure_pct: Number = 30
+    drawdown_halt_pct: Number = 50
+    drawdown_halt_hours: Number = 24
+
+
+class TradeConfig(_Section):
+    auto_max_usd: Number = 50
+    convergence_max_usd: Number = 100
+    human_gate_usd: Number = 100
+    slippage_max_pct: Number = 3
+    max_position_pct: Number = 5
+    stop_loss_pct: Number = 20
+    take_profit_pct: Number = 100
+
+
+class ConvictionWeights(_Section):
+    smart_money_oracle: int = 40
+    narrative_hunter: int = 30
+    rug_warden: int = 20
+    edge_bank: int = 10
+
+
+class ConvictionThresholds(_Section):
+    auto_execute: int = 85
+    watchlist: int = 60
+    discard: int = 60
+
+
+class ConvictionSizing(_Section):
+    base_multiplier: float = 0.01
+
+
+class ConvictionConfig(_Section):
+    weights: ConvictionWeights = ConvictionWeights()
+    thresholds: ConvictionThresholds = ConvictionThresholds()
+    sizing: ConvictionSizing = ConvictionSizing()
+
+
+class RugWardenConfig(_Section):
+    min_liquidity_usd: Number = 10000
+    max_holder_concentration_pct: Number = 80
+    min_token_age_seconds: Number = 300
+    reject_mutable_mint: bool = True
+    reject_unlocked_lp: bool = False
+
+
+class CircuitBreakerConfig(_Section):
+    consecutive_losses: int = 3
+    daily_loss_pct: Number = 10
+    rpc_failures: int = 5
+
+
+class RiskConfig(_Section):
+    """Typed view of config/risk.yaml (missing keys take the guards' defaults)."""
+
+    portfolio: PortfolioConfig = PortfolioConfig()
+    trade: TradeConfig = TradeConfig()
+    conviction: ConvictionConfig = ConvictionConfig()
+    rug_warden: RugWardenConfig = RugWardenConfig()
+    circuit_breakers: CircuitBreakerConfig = CircuitBreakerConfig()
+
+
+class ConfigError(ValueError):
+    """A config file could not be parsed or failed validation."""
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One consistent, validated view of every config file."""
+
+    risk: RiskConfig
+    risk_data: dict[str, Any]
+    firehose_data: dict[str, Any]
+    version: int
+    loaded_at: float
+    sources: dict[str, tuple[int, int]] = field(default_factory=dict)  # path → (mtime_ns, size)
+
+
+def _read_yaml(path: Path) -> dict[str, Any]:
     if not path.exists():
         return {}
-    return yaml.safe_load(path.read_text()) or {}
+    try:
+        data = yaml.safe_load(path.read_text()) or {}
+    except yaml.YAMLError as e:
+        raise ConfigError(f"{path.name}: {e}") from e
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path.name}: top level must be a mapping")
+    return data
+
+
+class ConfigService:
+    """Parses config files once and hot-reloads them when they change.
+
+    Args:
+        config_dir: Directory holding risk.yaml and firehose.yaml
+        min_check_interval: Seconds between mtime checks (0 = every access)
+    """
+
+    FILES = ("risk.yaml", "firehose.yaml")
+
+    def __init__(self, config_dir: Path = CONFIG_DIR, min_check_interval: float = 1.0):
+        self.config_dir = config_dir
+        self.min_check_interval = min_check_interval
+        self.last_error: str | None = None
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._snapshot: ConfigSnapshot | None = None
+        self._checked_at = 0.0
+
+    def _stat(self) -> dict[str, tuple[int, int]]:
+        sources = {}
+        for name in self.FILES:
+            try:
+                st = (self.config_dir / name).stat()
+                sources[name] = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                sources[name] = (0, 0)
+        return sources
+
+    def _build(self, sources: dict[str, tuple[int, int]], version: int) -> ConfigSnapshot:
+        risk_data = _read_yaml(self.config_dir / "risk.yaml")
+        firehose_data = _read_yaml(self.config_dir / "firehose.yaml")
+        try:
+            risk = RiskConfig.model_validate(risk_data)
+        except ValidationError as e:
+            raise ConfigError(f"risk.yaml: {e}") from e
+        return ConfigSnapshot(risk, risk_data, firehose_data, version, time.time(), sources)
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the snapshot if a file changed (or `force`). Returns True if swapped.
+
+        Raises:
+            ConfigError: only when there is no previous good snapshot to keep.
+        """
+        with self._lock:
+            sources = self._stat()
+            current = self._snapshot
+            if current is not None and not force and sources == current.sources:
+                return False
+            try:
+                snapshot = self._build(sources, (current.version + 1) if current else 1)
+            except ConfigError as e:
+                if current is None:
+                    raise
+                if self.last_error != str(e):
+                    print(
+                        f"config reload rejected, keeping version {current.version}: {e}",
+                        file=sys.stderr,
+                    )
+                self.last_error = str(e)
+                return False
+            self._snapshot = snapshot  # Atomic swap: readers hold the old one or the new one
+            self.last_error = None
+            self.reloads += current is not None
+            return True
+
+    def snapshot(self) -> ConfigSnapshot:
+        """Current snapshot, reloading first if the files changed."""
+        now = time.monotonic()
+        if self._snapshot is None or now - self._checked_at >= self.min_check_interval:
+            self._checked_at = now
+            self.reload()
+        assert self._snapshot is not None
+        return self._snapshot
+
+    def stats(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else 0,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+
+# Global config service
+_config_service = ConfigService()
+_pinned: contextvars.ContextVar[ConfigSnapshot | None] = contextvars.ContextVar(
+    "config_snapshot", default=None
+)
+
+
+def get_config_service() -> ConfigService:
+    """Get the global config service."""
+    return _config_service
+
+
+def current_config() -> ConfigSnapshot:
+    """The snapshot pinned by the enclosing config_scope(), else the latest one."""
+    return _pinned.get() or _config_service.snapshot()
+
+
+@contextmanager
+def config_scope(snapshot: ConfigSnapshot | None = None) -> Generator[ConfigSnapshot, None, None]:
+    """Pin one config snapshot for everything run inside (tasks inherit it)."""
+    pinned = snapshot or current_config()
+    token = _pinned.set(pinned)
+    try:
+        yield pinned
+    finally:
+        _pinned.reset(token)
+
+
+def load_risk_config() -> dict[str, Any]:
+    """Load config/risk.yaml (a copy of the current snapshot's data)."""
+    return copy.deepcopy(current_config().risk_data)
 
 
 def load_firehose_config() -> dict[str, Any]:
-    """Load config/firehose.yaml."""
-    path = CONFIG_DIR / "firehose.yaml"
-    if not path.exists():
-        return {}
-    return yaml.safe_load(path.read_text()) or {}
+    """Load config/firehose.yaml (a copy of the current snapshot's data)."""
+    return copy.deepcopy(current_config().firehose_data)
@@ -2,18 +2,49 @@
 
 Stores trade beads as markdown files in beads/ and embeddings in SQLite.
 Provides similarity search for pattern recognition across cycles.
+
+Embeddings are also kept unit-normalised in one float32 matrix
+(lib/edge/matrix.py), memory-mapped from edge.db.vectors.npy and appended
+to by write_bead, with an IVF index (lib/edge/index.py) over it; both are
+rebuilt from the database whenever edge.db changed without them. Writers
+hold an exclusive lock on the index file from syncing the index through
+the insert to saving it, so beads written by another process at the same
+time are not lost from the saved index. Exact
+recall (use_index=False or exact=True) is one matrix-vector product over
+that matrix; scanning the stored blobs in edge.db remains the fallback
+and the reference the index is tested against.
+
+Backfills go through write_beads (batched embedding, one transaction,
+bounded concurrent markdown writes) and model changes through reembed.
+
+Usage:
+    bank = EdgeBank()
+    bank.write_bead(bead)
+    bank.write_beads(beads, batch_size=64)
+    bank.reembed(progress=lambda done, total: ...)
+    bank.query_similar("whale accumulation, 5x volume", top_k=3, outcome="win")
 """
 
 from __future__ import annotations
 
 import json
 import sqlite3
-from datetime import datetime, timezone
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
 from pydantic import BaseModel, Field
 
+from lib.edge.embed_cache import CACHE_SUFFIX, EmbeddingCache, cache_settings
+from lib.edge.embed_server import MODEL_NAME, EmbedClient, load_model, server_settings
+from lib.edge.index import INDEX_SUFFIX, IVFIndex
+from lib.edge.matrix import VECTORS_SUFFIX, db_fingerprint, normalize
+from lib.edge.matrix import top_k as best_k
+from lib.utils.file_lock import exclusive_file_lock
+
 WORKSPACE = Path(__file__).resolve().parent.parent.parent
 BEADS_DIR = WORKSPACE / "beads"
 DB_PATH = WORKSPACE / "edge.db"
@@ -52,14 +83,124 @@ class Bead(BaseModel):
         return " | ".join(parts)
 
 
+BEAD_COLUMNS = (
+    "bead_id", "timestamp", "bead_type", "token_mint", "token_symbol", "direction",
+    "amount_sol", "price_usd", "thesis", "signals", "outcome", "pnl_pct",
+    "exit_reason", "market_conditions",
+)
+INSERT_BEAD = (
+    f"INSERT OR REPLACE INTO beads ({', '.join(BEAD_COLUMNS)}, embedding) "
+    f"VALUES ({', '.join('?' * (len(BEAD_COLUMNS) + 1))})"
+)
+Progress = Callable[[int, "int | None"], None]  # (done, total if known)
+
+MATCH_COLUMNS = "bead_id, timestamp, token_symbol, thesis, outcome, pnl_pct, exit_reason, signals"
+
+
+def _match(row: tuple, score: float) -> dict[str, Any]:
+    return {
+        "similarity": round(score, 3),
+        "bead_id": row[0],
+        "date": row[1][:10],
+        "token_symbol": row[2],
+        "thesis": row[3],
+        "outcome": row[4],
+        "pnl_pct": row[5],
+        "exit_reason": row[6],
+        "signals": json.loads(row[7]) if row[7] else [],
+    }
+
+
+def _bead_row(bead: Bead, embedding: bytes | None) -> tuple:
+    values = bead.model_dump()
+    values["signals"] = json.dumps(bead.signals)
+    return (*(values[c] for c in BEAD_COLUMNS), embedding)
+
+
+def _bead_from_row(row: tuple) -> Bead:
+    """Bead from a SELECT of BEAD_COLUMNS (NULLs take the model defaults)."""
+    values = {c: v for c, v in zip(BEAD_COLUMNS, row) if v is not None}
+    values["signals"] = json.loads(values.get("signals") or "[]")
+    return Bead(**values)
+
+
+def _bead_markdown(bead: Bead) -> str:
+    return f"""# Bead: {bead.bead_id}
+**Time:** {bead.timestamp}
+**Type:** {bead.bead_type} ({bead.direction})
+**Token:** {bead.token_symbol} (`{bead.token_mint}`)
+**Amount:** {bead.amount_sol:.4f} SOL @ ${bead.price_usd:.8f}
+
+## Thesis
+{bead.thesis}
+
+## Signals
+{chr(10).join(f'- {s}' for s in bead.signals) if bead.signals else 'None'}
+
+## Outcome
+- Result: {bead.outcome}
+- PnL: {bead.pnl_pct:+.1f}%
+- Exit reason: {bead.exit_reason or 'N/A'}
+
+## Market Conditions
+{bead.market_conditions}
+"""
+
+
+def _stamp(bead: Bead, taken: set[str]) -> None:
+    """Set bead_id (and timestamp, unless the bead carries one); ids in `taken` get a suffix."""
+    when = datetime.fromisoformat(bead.timestamp) if bead.timestamp else datetime.now(UTC)
+    bead.timestamp = when.isoformat()
+    base = when.strftime("%Y%m%d_%H%M%S") + f"_{bead.bead_type}_{bead.token_symbol}"
+    bead.bead_id, n = base, 1
+    while bead.bead_id in taken:
+        n += 1
+        bead.bead_id = f"{base}_{n}"
+    taken.add(bead.bead_id)
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 class EdgeBank:
-    """Bead storage with vector similarity search."""
+    """Bead storage with vector similarity search.
+
+    Args:
+        db_path: SQLite database (default: edge.db)
+        beads_dir: Markdown bead directory (default: beads/)
+        use_index: Search through the IVF index (False: exact matrix product)
+        embed_socket: Embedding server socket (default: firehose.yaml edge_bank.embed_server)
+    """
 
-    def __init__(self, db_path: Path | None = None, beads_dir: Path | None = None):
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        beads_dir: Path | None = None,
+        use_index: bool = True,
+        embed_socket: Path | None = None,
+    ):
         self.db_path = db_path or DB_PATH
         self.beads_dir = beads_dir or BEADS_DIR
         self.beads_dir.mkdir(parents=True, exist_ok=True)
+        self.use_index = use_index
+        self.index_path = self.db_path.with_name(self.db_path.name + INDEX_SUFFIX)
+        self.vectors_path = self.db_path.with_name(self.db_path.name + VECTORS_SUFFIX)
         self._embedder: Any = None
+        self._embed_client = EmbedClient(
+            embed_socket or server_settings()["socket_path"], MODEL_NAME
+        )
+        cache = cache_settings()
+        self.embed_cache = EmbeddingCache(
+            self.db_path.with_name(self.db_path.name + CACHE_SUFFIX),
+            MODEL_NAME,
+            memory_entries=int(cache.get("memory_entries", 256)),
+            disk_entries=int(cache.get("disk_entries", 20000)),
+        ) if cache.get("enabled", True) else None
+        self._index: IVFIndex | None = None
+        self._index_fingerprint: tuple[int, int] | None = None
         self._init_db()
 
     def _init_db(self) -> None:
@@ -90,92 +231,268 @@ class EdgeBank:
     def _get_embedder(self) -> Any:
         """Lazy-load sentence-transformers model."""
         if self._embedder is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                self._embedder = SentenceTransformer("all-MiniLM-L6-v2")
-            except ImportError:
-                return None
+            self._embedder = load_model(MODEL_NAME)
         return self._embedder
 
     def _embed(self, text: str) -> bytes | None:
-        """Generate embedding for text."""
+        """Embedding for text, from the cache when this text was embedded before."""
+        if self.embed_cache is not None:
+            cached = self.embed_cache.get(text)
+            if cached is not None:
+                return cached
+        embedding = self._encode(text)
+        if embedding is not None and self.embed_cache is not None:
+            self.embed_cache.put(text, embedding)
+        return embedding
+
+    def _encode(self, text: str) -> bytes | None:
+        """Generate embedding for text.
+
+        A model already loaded in this process is used directly; otherwise
+        the embedding server is asked first (no model load), then the model
+        is loaded in-process.
+        """
+        import numpy as np
+        if self._embedder is None:
+            vectors = self._embed_client.embed([text])
+            if vectors is not None:
+                return vectors[0].astype(np.float32).tobytes()
         embedder = self._get_embedder()
         if embedder is None:
             return None
-        import numpy as np
         embedding = embedder.encode(text, convert_to_numpy=True)
         return embedding.astype(np.float32).tobytes()
 
+    def _encode_many(self, texts: list[str]) -> list[bytes] | None:
+        """Batch _encode: one server request or model.encode call for all texts."""
+        import numpy as np
+        vectors = None
+        if self._embedder is None:
+            vectors = self._embed_client.embed(texts)
+        if vectors is None:
+            embedder = self._get_embedder()
+            if embedder is None:
+                return None
+            vectors = embedder.encode(texts, convert_to_numpy=True, batch_size=len(texts))
+        return [np.asarray(v, dtype=np.float32).tobytes() for v in vectors]
+
+    def _embed_many(self, texts: list[str], use_cache: bool = True) -> list[bytes | None]:
+        """Batch _embed: cached texts are looked up, the rest encoded together (and cached)."""
+        cache = self.embed_cache
+        results: list[bytes | None] = [None] * len(texts)
+        missing = list(range(len(texts)))
+        if cache is not None and use_cache:
+            results = [cache.get(text) for text in texts]
+            missing = [i for i, vector in enumerate(results) if vector is None]
+        encoded = self._encode_many([texts[i] for i in missing]) if missing else None
+        for i, vector in zip(missing, encoded or []):
+            results[i] = vector
+            if cache is not None:
+                cache.put(texts[i], vector)
+        return results
+
+    def _rebuild_index(self) -> IVFIndex | None:
+        """Build the index from every stored embedding (None if there are none)."""
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            "SELECT bead_id, outcome, embedding FROM beads WHERE embedding IS NOT NULL"
+        ).fetchall()
+        conn.close()
+        if not rows:
+            return None
+        import numpy as np
+        vectors = [np.frombuffer(r[2], dtype=np.float32) for r in rows]
+        dim = len(vectors[0])
+        keep = [i for i, v in enumerate(vectors) if len(v) == dim]  # Skip rows from another model
+        index = IVFIndex(dim)
+        index.add_many([rows[i][0] for i in keep], np.stack([vectors[i] for i in keep]),
+                       [rows[i][1] for i in keep])
+        return index
+
+    def _get_index(self) -> IVFIndex | None:
+        """The index matching edge.db as it is now: in memory, from disk, or rebuilt."""
+        if self._index_fingerprint == db_fingerprint(self.db_path):
+            return self._index
+        with exclusive_file_lock(self.index_path):
+            return self._sync_index()
+
+    def _sync_index(self) -> IVFIndex | None:
+        """_get_index for callers already holding the index lock."""
+        fingerprint = db_fingerprint(self.db_path)
+        if self._index_fingerprint == fingerprint:
+            return self._index
+        loaded = IVFIndex.load(self.index_path, self.vectors_path)
+        if loaded is not None and loaded[1] == fingerprint:
+            self._index = loaded[0]
+        else:
+            self._index = self._rebuild_index()
+            if self._index is not None:
+                self._index.save(self.index_path, self.vectors_path, fingerprint)
+        self._index_fingerprint = fingerprint
+        return self._index
+
+    def _index_beads(
+        self, bead_ids: list[str], embeddings: list[bytes], outcomes: list[str]
+    ) -> None:
+        """Add just-written beads to the index and persist it with edge.db's new fingerprint.
+
+        The caller holds the index lock from the _sync_index before its insert.
+        """
+        import numpy as np
+        vectors = np.stack([np.frombuffer(e, dtype=np.float32) for e in embeddings])
+        index = self._index
+        if index is None or index.dim != vectors.shape[1]:
+            index = self._index = self._rebuild_index()
+        else:
+            index.add_many(bead_ids, vectors, outcomes)
+        if index is not None:
+            fingerprint = db_fingerprint(self.db_path)
+            index.save(self.index_path, self.vectors_path, fingerprint)
+            self._index_fingerprint = fingerprint
+
     def write_bead(self, bead: Bead) -> str:
         """Write a bead to disk (markdown) and database (with embedding)."""
-        now = datetime.now(timezone.utc)
+        now = datetime.now(UTC)
         bead.timestamp = now.isoformat()
         bead.bead_id = now.strftime("%Y%m%d_%H%M%S") + f"_{bead.bead_type}_{bead.token_symbol}"
 
         # Write markdown file
-        md_path = self.beads_dir / f"{bead.bead_id}.md"
-        md_content = f"""# Bead: {bead.bead_id}
-**Time:** {bead.timestamp}
-**Type:** {bead.bead_type} ({bead.direction})
-**Token:** {bead.token_symbol} (`{bead.token_mint}`)
-**Amount:** {bead.amount_sol:.4f} SOL @ ${bead.price_usd:.8f}
+        (self.beads_dir / f"{bead.bead_id}.md").write_text(_bead_markdown(bead))
 
-## Thesis
-{bead.thesis}
+        # Generate embedding and store in DB
+        embedding = self._embed(bead.to_text())
+        with exclusive_file_lock(self.index_path):
+            if embedding is not None:
+                self._sync_index()  # Sync with edge.db before this write changes it
+            conn = sqlite3.connect(self.db_path)
+            conn.execute(INSERT_BEAD, _bead_row(bead, embedding))
+            conn.commit()
+            conn.close()
+            if embedding is not None:
+                self._index_beads([bead.bead_id], [embedding], [bead.outcome])
+        return bead.bead_id
 
-## Signals
-{chr(10).join(f'- {s}' for s in bead.signals) if bead.signals else 'None'}
+    def write_beads(
+        self,
+        beads: Iterable[Bead],
+        batch_size: int = 64,
+        io_workers: int = 8,
+        progress: Progress | None = None,
+    ) -> list[str]:
+        """Write many beads: batched embedding, one transaction, one index update.
 
-## Outcome
-- Result: {bead.outcome}
-- PnL: {bead.pnl_pct:+.1f}%
-- Exit reason: {bead.exit_reason or 'N/A'}
+        Beads are consumed lazily in `batch_size` chunks. Beads that carry a
+        timestamp (historical autopsies) keep it and get their bead_id from
+        it, so re-running a backfill replaces rows instead of duplicating
+        them; the rest are stamped now. ids repeated within the run get a
+        numeric suffix. Markdown files are written by `io_workers` threads
+        once the transaction has committed, so a failed run leaves neither
+        rows nor files behind.
 
-## Market Conditions
-{bead.market_conditions}
-"""
-        md_path.write_text(md_content)
+        Returns:
+            bead_ids in input order
+        """
+        written: list[Bead] = []
+        taken: set[str] = set()
+        indexed: tuple[list[str], list[bytes], list[str]] = ([], [], [])
+        with exclusive_file_lock(self.index_path):
+            self._sync_index()  # Sync with edge.db before these writes change it
+            conn = sqlite3.connect(self.db_path)
+            try:
+                for chunk in _chunks(beads, batch_size):
+                    for bead in chunk:
+                        _stamp(bead, taken)
+                    embeddings = self._embed_many([bead.to_text() for bead in chunk])
+                    conn.executemany(
+                        INSERT_BEAD, [_bead_row(b, e) for b, e in zip(chunk, embeddings)]
+                    )
+                    for bead, embedding in zip(chunk, embeddings):
+                        if embedding is not None:
+                            indexed[0].append(bead.bead_id)
+                            indexed[1].append(embedding)
+                            indexed[2].append(bead.outcome)
+                    written.extend(chunk)
+                    if progress is not None:
+                        progress(len(written), None)
+                conn.commit()
+            finally:
+                conn.close()
+            if indexed[0]:
+                self._index_beads(*indexed)
 
-        # Generate embedding and store in DB
-        embedding = self._embed(bead.to_text())
+        def write_markdown(bead: Bead) -> None:
+            (self.beads_dir / f"{bead.bead_id}.md").write_text(_bead_markdown(bead))
+
+        with ThreadPoolExecutor(max_workers=io_workers) as pool:
+            list(pool.map(write_markdown, written))
+        return [bead.bead_id for bead in written]
+
+    def reembed(self, batch_size: int = 64, progress: Progress | None = None) -> dict[str, Any]:
+        """Re-encode every bead's to_text() in place (e.g. after a model change).
+
+        Vectors are rewritten chunk by chunk (each chunk committed, so an
+        interrupted run keeps its progress), bypassing cached lookups. A
+        chunk that could not be fully embedded is left untouched and ends
+        the run. The index is rebuilt however the run ends.
+        """
         conn = sqlite3.connect(self.db_path)
-        conn.execute(
-            """INSERT OR REPLACE INTO beads
-            (bead_id, timestamp, bead_type, token_mint, token_symbol, direction,
-             amount_sol, price_usd, thesis, signals, outcome, pnl_pct,
-             exit_reason, market_conditions, embedding)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                bead.bead_id, bead.timestamp, bead.bead_type, bead.token_mint,
-                bead.token_symbol, bead.direction, bead.amount_sol, bead.price_usd,
-                bead.thesis, json.dumps(bead.signals), bead.outcome, bead.pnl_pct,
-                bead.exit_reason, bead.market_conditions, embedding,
-            ),
-        )
-        conn.commit()
-        conn.close()
-        return bead.bead_id
+        total = conn.execute("SELECT COUNT(*) FROM beads").fetchone()[0]
+        result: dict[str, Any] = {"status": "OK", "reembedded": 0, "total": total}
+        last_rowid = 0
+        try:
+            while True:
+                rows = conn.execute(
+                    f"SELECT rowid, {', '.join(BEAD_COLUMNS)} FROM beads "
+                    "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size),
+                ).fetchall()
+                if not rows:
+                    break
+                texts = [_bead_from_row(r[1:]).to_text() for r in rows]
+                embeddings = self._embed_many(texts, use_cache=False)
+                if any(e is None for e in embeddings):
+                    result.update(status="ERROR", error="embedding failed (no model available?)")
+                    break
+                conn.executemany(
+                    "UPDATE beads SET embedding = ? WHERE rowid = ?",
+                    [(e, r[0]) for r, e in zip(rows, embeddings)],
+                )
+                conn.commit()
+                last_rowid = rows[-1][0]
+                result["reembedded"] += len(rows)
+                if progress is not None:
+                    progress(result["reembedded"], total)
+        finally:
+            conn.close()
+            with exclusive_file_lock(self.index_path):
+                self._index = self._rebuild_index()
+                fingerprint = db_fingerprint(self.db_path)
+                if self._index is not None:
+                    self._index.save(self.index_path, self.vectors_path, fingerprint)
+                self._index_fingerprint = fingerprint
+        return result
 
-    def query_similar(self, context: str, top_k: int = 3) -> list[dict[str, Any]]:
+    def query_similar(
+        self, context: str, top_k: int = 3, outcome: str | None = None, exact: bool = False,
+    ) -> list[dict[str, Any]]:
         """Find beads most similar to the given context.
 
-        Uses cosine similarity on embeddings. Falls back to recent beads
-        if sentence-transformers is not available.
+        Uses cosine similarity on embeddings, through the IVF index unless
+        `exact` (or use_index=False) asks for the full matrix product.
+        `outcome` restricts matches to beads with that outcome (e.g. "win").
+        Falls back to recent beads if sentence-transformers is not available.
         """
         query_emb = self._embed(context)
 
-        conn = sqlite3.connect(self.db_path)
-        rows = conn.execute(
-            "SELECT bead_id, timestamp, token_symbol, thesis, outcome, pnl_pct, "
-            "exit_reason, signals, embedding FROM beads ORDER BY timestamp DESC"
-        ).fetchall()
-        conn.close()
-
-        if not rows:
-            return []
-
         # If no embeddings available, return most recent
         if query_emb is None:
+            conn = sqlite3.connect(self.db_path)
+            rows = conn.execute(
+                "SELECT bead_id, timestamp, token_symbol, thesis, outcome, pnl_pct, exit_reason "
+                "FROM beads WHERE (? IS NULL OR outcome = ?) ORDER BY timestamp DESC LIMIT ?",
+                (outcome, outcome, top_k),
+            ).fetchall()
+            conn.close()
             return [
                 {
                     "bead_id": r[0],
@@ -187,38 +504,47 @@ class EdgeBank:
                     "exit_reason": r[6],
                     "similarity": 0.0,
                 }
-                for r in rows[:top_k]
+                for r in rows
             ]
 
-        # Compute cosine similarities
         import numpy as np
         query_vec = np.frombuffer(query_emb, dtype=np.float32)
-        scored = []
-        for r in rows:
-            if r[8] is None:
-                continue
-            bead_vec = np.frombuffer(r[8], dtype=np.float32)
-            cos_sim = float(np.dot(query_vec, bead_vec) / (
-                np.linalg.norm(query_vec) * np.linalg.norm(bead_vec) + 1e-8
-            ))
-            scored.append((cos_sim, r))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-
-        return [
-            {
-                "similarity": round(score, 3),
-                "bead_id": r[0],
-                "date": r[1][:10],
-                "token_symbol": r[2],
-                "thesis": r[3],
-                "outcome": r[4],
-                "pnl_pct": r[5],
-                "exit_reason": r[6],
-                "signals": json.loads(r[7]) if r[7] else [],
-            }
-            for score, r in scored[:top_k]
-        ]
+        index = self._get_index()
+        if index is None or index.dim != len(query_vec):
+            return self._query_brute_force(query_vec, top_k, outcome)
+
+        hits = index.search(query_vec, top_k, outcome, exact=exact or not self.use_index)
+        if not hits:
+            return []
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            f"SELECT {MATCH_COLUMNS} FROM beads WHERE bead_id IN ({','.join('?' * len(hits))})",
+            [bead_id for _, bead_id in hits],
+        ).fetchall()
+        conn.close()
+        by_id = {r[0]: r for r in rows}
+        return [_match(by_id[bead_id], score) for score, bead_id in hits if bead_id in by_id]
+
+    def _query_brute_force(
+        self, query_vec: Any, top_k: int, outcome: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Exact cosine similarity against every embedding stored in edge.db."""
+        import numpy as np
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            f"SELECT {MATCH_COLUMNS}, embedding FROM beads "
+            "WHERE embedding IS NOT NULL AND (? IS NULL OR outcome = ?) ORDER BY timestamp DESC",
+            (outcome, outcome),
+        ).fetchall()
+        conn.close()
+
+        rows = [r for r in rows if len(r[8]) == 4 * len(query_vec)]  # Skip rows from another model
+        if not rows:
+            return []
+        stacked = np.frombuffer(b"".join(r[8] for r in rows), dtype=np.float32)
+        matrix = normalize(stacked.reshape(len(rows), -1))
+        scores = matrix @ normalize(query_vec)
+        return [_match(rows[i], float(scores[i])) for i in best_k(scores, top_k)]
 
     def get_stats(self) -> dict[str, Any]:
         """Get bead bank statistics."""
@@ -227,4 +553,5 @@ class EdgeBank:
         wins = conn.execute("SELECT COUNT(*) FROM beads WHERE outcome='win'").fetchone()[0]
         losses = conn.execute("SELECT COUNT(*) FROM beads WHERE outcome='loss'").fetchone()[0]
         conn.close()
-        return {"total_beads": total, "wins": wins, "losses": losses, "pending": total - wins - losses}
+        pending = total - wins - losses
+        return {"total_beads": total, "wins": wins, "losses": losses, "pending": pending}
@@ -0,0 +1,278 @@
+"""Edge Bank — content-addressed embedding cache.
+
+The heartbeat and the agent query Edge Bank with the same signal templates
+every cycle, and write_bead re-embeds a bead's to_text() when it is
+re-indexed. Vectors are cached under sha256(model name + normalised text)
+(Unicode NFKC, whitespace collapsed), so identical contexts are encoded
+once per model:
+
+- an in-process LRU of `memory_entries` vectors;
+- a persistent SQLite tier next to edge.db (edge.db.embed_cache.db), capped
+  at `disk_entries` rows and evicted least-recently-used.
+
+The persistent tier is a sidecar rather than a table in edge.db because the
+vector index fingerprints edge.db; a cache write there would force an index
+rebuild. Hits and misses are counted per process and in the sidecar, so
+`--stats` reports the lifetime hit rate across CLI invocations. Memory
+hits never touch SQLite; their counts and recency are written with the
+next persistent-tier access.
+
+Usage:
+    cache = EmbeddingCache(Path("edge.db.embed_cache.db"), "all-MiniLM-L6-v2")
+    cache.get(text) or cache.put(text, vector_bytes)
+    python3 -m lib.edge.embed_cache --stats
+    python3 -m lib.edge.embed_cache --purge
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from lib.config import load_firehose_config
+
+CACHE_SUFFIX = ".embed_cache.db"
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form for cache keys: NFKC, whitespace runs collapsed, trimmed."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def cache_key(text: str, model_name: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+def cache_settings() -> dict[str, Any]:
+    """firehose.yaml edge_bank.embed_cache section."""
+    return dict((load_firehose_config().get("edge_bank", {}) or {}).get("embed_cache", {}) or {})
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + SQLite) cache of float32 embedding bytes.
+
+    The connection is opened lazily; failures of the persistent tier
+    (locked/readonly file) are swallowed — it's only a cache.
+
+    Args:
+        path: SQLite file for the persistent tier
+        model_name: Model the vectors come from (part of every key)
+        memory_entries: In-process LRU capacity
+        disk_entries: Persistent rows kept (least recently used evicted)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        model_name: str,
+        memory_entries: int = 256,
+        disk_entries: int = 20000,
+        busy_timeout: float = 5.0,
+    ):
+        self.path = path
+        self.model_name = model_name
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.busy_timeout = busy_timeout
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._puts = 0
+        self._pending_hits: dict[str, int] = {}  # Memory hits not yet written to SQLite
+        self._pending_misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters "
+                "(name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _flush(self) -> None:
+        """Write pending hit/miss counts and recency to the persistent tier."""
+        if not self._pending_hits and not self._pending_misses:
+            return
+        try:
+            conn = self._connect()
+            now = time.time()
+            conn.executemany(
+                "UPDATE embeddings SET last_used = ?, hits = hits + ? WHERE key = ?",
+                [(now, n, key) for key, n in self._pending_hits.items()],
+            )
+            totals = (("hits", sum(self._pending_hits.values())), ("misses", self._pending_misses))
+            for name, n in totals:
+                if n:
+                    conn.execute(
+                        "INSERT INTO counters (name, value) VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                        (name, n),
+                    )
+        except sqlite3.Error:
+            return
+        self._pending_hits.clear()
+        self._pending_misses = 0
+
+    def _remember(self, key: str, vector: bytes) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str) -> bytes | None:
+        """Cached vector bytes for `text`, or None (counted as a miss)."""
+        key = cache_key(text, self.model_name)
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+            return vector
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self.misses += 1
+            self._pending_misses += 1
+        else:
+            self.disk_hits += 1
+            self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+            self._remember(key, row[0])
+        self._flush()
+        return row[0] if row is not None else None
+
+    def put(self, text: str, vector: bytes) -> None:
+        """Store a vector in both tiers (evicting past the caps)."""
+        key = cache_key(text, self.model_name)
+        self._remember(key, vector)
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, self.model_name, vector, now, now),
+            )
+            self._puts += 1
+            if self._puts % 64 == 1:
+                self.prune()
+        except sqlite3.Error:
+            pass
+
+    def prune(self) -> int:
+        """Evict least-recently-used persistent rows beyond `disk_entries`. Returns rows removed."""
+        cursor = self._connect().execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            "SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.disk_entries,),
+        )
+        return cursor.rowcount
+
+    def purge(self, model_name: str | None = None) -> int:
+        """Delete persistent rows (all, or one model's) and the memory tier.
+
+        Returns the number of persistent rows removed.
+        """
+        self._memory.clear()
+        if model_name:
+            cursor = self._connect().execute(
+                "DELETE FROM embeddings WHERE model = ?", (model_name,)
+            )
+        else:
+            cursor = self._connect().execute("DELETE FROM embeddings")
+            self._connect().execute("DELETE FROM counters")
+        return cursor.rowcount
+
+    def stats(self) -> dict[str, Any]:
+        self._flush()
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        result: dict[str, Any] = {
+            "path": str(self.path),
+            "model": self.model_name,
+            "memory_entries": len(self._memory),
+            "session": {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            },
+        }
+        try:
+            conn = self._connect()
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            models = conn.execute(
+                "SELECT model, COUNT(*), SUM(length(vector)) FROM embeddings GROUP BY model"
+            ).fetchall()
+            result["disk"] = {r[0]: {"entries": r[1], "bytes": r[2] or 0} for r in models}
+        except sqlite3.Error:
+            return result
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        result["lifetime"] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
+        return result
+
+    def close(self) -> None:
+        self._flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def main() -> None:
+    from lib.edge.bank import DB_PATH
+    from lib.edge.embed_server import MODEL_NAME
+
+    parser = argparse.ArgumentParser(description="Edge Bank embedding cache — inspect and purge")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--stats", action="store_true", help="Entries and lifetime hit rate")
+    action.add_argument("--purge", action="store_true", help="Delete cached vectors")
+    parser.add_argument("--model", help="With --purge: only this model's vectors")
+    args = parser.parse_args()
+
+    cache = EmbeddingCache(DB_PATH.with_name(DB_PATH.name + CACHE_SUFFIX), MODEL_NAME)
+    if args.stats:
+        result: dict[str, Any] = {"status": "OK", **cache.stats()}
+    else:
+        result = {"status": "OK", "removed": cache.purge(args.model)}
+    cache.close()
+
+    print(json.dumps(result, indent=2))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
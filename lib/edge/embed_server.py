@@ -0,0 +1,310 @@
+"""Edge Bank — long-lived embedding server on a Unix socket.
+
+Every bead_query / bead_write CLI call builds a fresh EdgeBank, and loading
+SentenceTransformer("all-MiniLM-L6-v2") costs seconds of imports and model
+load before the first vector. This server loads the model once and keeps it
+warm; EdgeBank._embed uses it whenever the socket exists and falls back to
+loading the model in-process otherwise.
+
+Requests that arrive within `batch_window_ms` of each other (up to
+`max_batch` texts) are encoded together in one model.encode call, so
+concurrent skills share a forward pass.
+
+Protocol (one request per line, connections may be reused):
+    → {"texts": ["...", ...], "model": "all-MiniLM-L6-v2"}\\n
+    ← {"status": "OK", "count": n, "dim": d, "model": "..."}\\n + n*d float32 (little-endian)
+    ← {"status": "ERROR", "error": "..."}\\n
+
+Usage:
+    python3 -m lib.edge.embed_server
+    python3 -m lib.edge.embed_server --socket state/embed.sock --max-seconds 3600
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from lib.config import WORKSPACE, load_firehose_config
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_SOCKET = WORKSPACE / "state" / "embed.sock"
+
+
+def server_settings() -> dict[str, Any]:
+    """firehose.yaml edge_bank.embed_server section, with the socket path resolved."""
+    edge_bank = load_firehose_config().get("edge_bank", {}) or {}
+    settings = dict(edge_bank.get("embed_server", {}) or {})
+    path = Path(settings.get("socket_path", DEFAULT_SOCKET))
+    settings["socket_path"] = path if path.is_absolute() else WORKSPACE / path
+    return settings
+
+
+def load_model(model_name: str = MODEL_NAME) -> Any:
+    """SentenceTransformer model, or None if sentence-transformers is not installed."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    return SentenceTransformer(model_name)
+
+
+class EmbedClient:
+    """Blocking client for EmbedServer; embed() returns None when no server answers.
+
+    Args:
+        socket_path: Server socket
+        model_name: Model the caller expects (a server running another model is ignored)
+        timeout: Seconds to wait for connect + reply
+    """
+
+    def __init__(
+        self,
+        socket_path: Path = DEFAULT_SOCKET,
+        model_name: str = MODEL_NAME,
+        timeout: float = 10.0,
+    ):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.timeout = timeout
+
+    def available(self) -> bool:
+        return self.socket_path.exists()
+
+    def embed(self, texts: list[str]) -> np.ndarray | None:
+        """(len(texts), dim) float32 vectors, or None if the server is absent or failed."""
+        if not texts or not self.available():
+            return None
+        request = json.dumps({"texts": texts, "model": self.model_name}).encode() + b"\n"
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(str(self.socket_path))
+                sock.sendall(request)
+                reader = sock.makefile("rb")
+                header = json.loads(reader.readline() or b"{}")
+                if header.get("status") != "OK" or header.get("count") != len(texts):
+                    return None
+                size = header["count"] * header["dim"] * 4
+                payload = reader.read(size)
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(payload) != size:
+            return None
+        return np.frombuffer(payload, dtype="<f4").reshape(header["count"], header["dim"])
+
+
+class EmbedServer:
+    """Keeps one embedding model warm and serves batched encode requests.
+
+    Args:
+        socket_path: Unix socket to listen on
+        model: Object with SentenceTransformer's encode(); loaded from `model_name` if None
+        model_name: Model reported to (and checked against) clients
+        max_batch: Texts per model.encode call
+        batch_window_ms: How long the first request waits for others to batch with
+    """
+
+    def __init__(
+        self,
+        socket_path: Path = DEFAULT_SOCKET,
+        model: Any = None,
+        model_name: str = MODEL_NAME,
+        max_batch: int = 64,
+        batch_window_ms: float = 5.0,
+    ):
+        self.socket_path = socket_path
+        self.model = model
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.started_at = 0.0
+        self._queue: asyncio.Queue[tuple[list[str], asyncio.Future[np.ndarray]]] | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._batcher: asyncio.Task[None] | None = None
+        self._executor: ThreadPoolExecutor | None = None  # One thread owns the model
+
+    def _claim_socket(self) -> None:
+        """Remove a stale socket file; refuse to start if a server already answers on it."""
+        if not self.socket_path.exists():
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()
+                return
+        raise RuntimeError(f"an embed server is already listening on {self.socket_path}")
+
+    async def start(self) -> None:
+        if self.model is None:
+            self.model = await asyncio.to_thread(load_model, self.model_name)
+            if self.model is None:
+                raise RuntimeError("sentence-transformers is not installed")
+        self._claim_socket()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path))
+        self.started_at = time.time()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+            self._batcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.socket_path.unlink(missing_ok=True)
+
+    async def __aenter__(self) -> EmbedServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    async def run(self, max_seconds: float | None = None) -> dict[str, Any]:
+        """Serve until cancelled (or for `max_seconds`)."""
+        async with self:
+            try:
+                await asyncio.sleep(max_seconds if max_seconds is not None else float("inf"))
+            except asyncio.CancelledError:
+                pass
+        return self.stats()
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        """Queue texts for the next batch and wait for their vectors."""
+        assert self._queue is not None, "server not started"
+        future: asyncio.Future[np.ndarray] = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _batch_loop(self) -> None:
+        assert self._queue is not None
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = asyncio.get_running_loop().time() + self.batch_window
+            while size < self.max_batch:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            texts = [text for batch, _ in pending for text in batch]
+            try:
+                vectors = await asyncio.get_running_loop().run_in_executor(
+                    self._executor,
+                    partial(
+                        self.model.encode, texts, convert_to_numpy=True, batch_size=self.max_batch
+                    ),
+                )
+                vectors = np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+            except Exception as e:  # Model errors go back to every waiting client
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            start = 0
+            for batch, future in pending:
+                if not future.done():
+                    future.set_result(vectors[start:start + len(batch)])
+                start += len(batch)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    texts = [str(t) for t in request["texts"]]
+                    if request.get("model", self.model_name) != self.model_name:
+                        raise ValueError(f"server runs {self.model_name}, not {request['model']}")
+                    vectors = await self.embed(texts)
+                except Exception as e:
+                    writer.write(json.dumps({"status": "ERROR", "error": str(e)}).encode() + b"\n")
+                else:
+                    self.requests += 1
+                    self.texts += len(texts)
+                    header = {
+                        "status": "OK",
+                        "count": len(texts),
+                        "dim": vectors.shape[1],
+                        "model": self.model_name,
+                    }
+                    writer.write(json.dumps(header).encode() + b"\n")
+                    writer.write(vectors.astype("<f4").tobytes())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "socket": str(self.socket_path),
+            "model": self.model_name,
+            "requests": self.requests,
+            "texts": self.texts,
+            "batches": self.batches,
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else 0.0,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Edge Bank — embedding server")
+    parser.add_argument(
+        "--socket", type=Path, help="Unix socket (default: firehose.yaml edge_bank.embed_server)"
+    )
+    parser.add_argument("--model", help=f"Model name (default: {MODEL_NAME})")
+    parser.add_argument(
+        "--max-seconds", type=float, help="Stop after this many seconds (default: run forever)"
+    )
+    args = parser.parse_args()
+
+    settings = server_settings()
+    server = EmbedServer(
+        args.socket or settings["socket_path"],
+        model_name=args.model or settings.get("model", MODEL_NAME),
+        max_batch=int(settings.get("max_batch", 64)),
+        batch_window_ms=float(settings.get("batch_window_ms", 5)),
+    )
+    try:
+        stats = asyncio.run(server.run(args.max_seconds))
+    except KeyboardInterrupt:
+        stats = server.stats()
+    except RuntimeError as e:
+        print(json.dumps({"status": "ERROR", "error": str(e)}))
+        sys.exit(1)
+
+    print(json.dumps({"status": "OK", **stats}, indent=2))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Edge Bank — approximate nearest-neighbour index over bead embeddings.
+
+query_similar used to deserialize every embedding blob and run a Python
+cosine loop per pre-trade query. IVFIndex extends the EmbeddingMatrix
+(lib/edge/matrix.py) with a k-means partition into `nlist` inverted lists.
+A query scores only the vectors in the `nprobe` lists whose centroids are
+closest, plus the "tail" of vectors added since the last training, so
+work is roughly N * nprobe / nlist instead of N.
+
+Training reorders the matrix so each list is one contiguous slice and the
+tail is everything after the trained rows; a query is then a handful of
+slice-times-vector products with no gather copy. A replaced vector keeps
+its slot (and list) until the next training.
+
+Small banks (under `train_threshold` vectors) are never partitioned: every
+vector is tail and search is exact. Filtered queries (e.g. outcome="win")
+keep probing further lists until at least k matching vectors were scored,
+so a rare outcome can end up scanning every list.
+
+The index metadata is persisted next to edge.db (edge.db.ivf.npz) together
+with the database file's (mtime_ns, size) at save time, and the vectors in
+the matrix's memory-mapped sidecar (edge.db.vectors.npy). A fingerprint
+mismatch means edge.db was changed by something that didn't update the
+index, and the caller rebuilds it from the database.
+
+Usage:
+    index = IVFIndex(dim=384)
+    index.add("bead_1", vector, outcome="win")
+    index.search(query_vector, k=3, outcome="win")   # [(similarity, bead_id), ...]
+    index.save(Path("edge.db.ivf.npz"), Path("edge.db.vectors.npy"), fingerprint)
+    IVFIndex.load(Path("edge.db.ivf.npz"), Path("edge.db.vectors.npy"))
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from lib.edge.matrix import EmbeddingMatrix, normalize, top_k
+
+INDEX_SUFFIX = ".ivf.npz"
+
+
+class IVFIndex(EmbeddingMatrix):
+    """Inverted-file (k-means partitioned) cosine index.
+
+    Args:
+        dim: Embedding dimension
+        nprobe: Lists scanned per query
+        train_threshold: Vectors needed before partitioning (below: exact scan)
+        seed: k-means initialisation seed
+    """
+
+    def __init__(self, dim: int, nprobe: int = 32, train_threshold: int = 4096, seed: int = 0):
+        super().__init__(dim)
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.seed = seed
+        self._trained = 0  # rows [0, _trained) are partitioned, the rest is tail
+        self.centroids = np.zeros((0, dim), dtype=np.float32)
+        self._offsets = np.zeros(1, dtype=np.int64)  # list i = rows [offsets[i], offsets[i+1])
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def tail(self) -> int:
+        return self._count - self._trained
+
+    def add_many(self, ids: list[str], vectors: np.ndarray, outcomes: list[str]) -> None:
+        """Insert or replace vectors in bulk; trains at most once at the end."""
+        super().add_many(ids, vectors, outcomes)
+        if self._needs_training():
+            self.train()
+
+    def _needs_training(self) -> bool:
+        if self._count < self.train_threshold:
+            return False
+        return not self.nlist or self.tail > max(self.train_threshold, self._count // 2)
+
+    def train(self, iterations: int = 8, sample_per_list: int = 64) -> None:
+        """(Re)partition every vector with k-means over a sample (nlist ≈ √N)."""
+        n = self._count
+        if n == 0:
+            return
+        vectors = self.vectors
+        nlist = max(1, min(n, int(np.sqrt(n))))
+        rng = np.random.default_rng(self.seed)
+        picked = rng.choice(n, size=min(n, nlist * sample_per_list), replace=False)
+        sample = np.asarray(vectors[np.sort(picked)])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            centroids = np.where(empty[:, None], centroids, normalize(sums))
+
+        assign = np.empty(n, dtype=np.int64)
+        for start in range(0, n, 8192):
+            chunk = vectors[start:start + 8192]
+            assign[start:start + 8192] = np.argmax(chunk @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        permuted = np.ascontiguousarray(vectors[order])
+        self._outcomes[:n] = self._outcomes[:n][order]
+        self.ids = [self.ids[i] for i in order]
+        self._rows = {bead_id: row for row, bead_id in enumerate(self.ids)}
+        self._offsets = np.searchsorted(assign[order], np.arange(nlist + 1))
+        self.centroids = centroids.astype(np.float32)
+        self._trained = n
+        self._vectors = permuted
+        if self.path is not None:
+            self.bind(self.path)  # Row order changed: rewrite the sidecar
+
+    def search(
+        self, query: np.ndarray, k: int = 3, outcome: str | None = None, exact: bool = False,
+    ) -> list[tuple[float, str]]:
+        """Top-k (cosine similarity, bead_id), best first, optionally filtered by outcome.
+
+        `exact` (or an unpartitioned index) scores every vector in one matrix product.
+        """
+        if exact or not self.nlist:
+            return super().search(query, k, outcome)
+        if self._count == 0 or k <= 0:
+            return []
+        code = None
+        if outcome is not None:
+            code = self._codes.get(outcome)
+            if code is None:
+                return []
+        q = normalize(np.asarray(query, dtype=np.float32).reshape(self.dim))
+
+        score_parts: list[np.ndarray] = []
+        row_parts: list[np.ndarray] = []
+
+        def scan(start: int, end: int) -> int:
+            if end <= start:
+                return 0
+            scores = self._vectors[start:end] @ q
+            rows = np.arange(start, end)
+            if code is not None:
+                keep = self._outcomes[start:end] == code
+                scores, rows = scores[keep], rows[keep]
+            score_parts.append(scores)
+            row_parts.append(rows)
+            return len(rows)
+
+        found = scan(self._trained, self._count)
+        for rank, i in enumerate(np.argsort(-(self.centroids @ q))):
+            if rank >= self.nprobe and found >= k:
+                break
+            found += scan(int(self._offsets[i]), int(self._offsets[i + 1]))
+        if not found:
+            return []
+
+        scores = np.concatenate(score_parts)
+        rows = np.concatenate(row_parts)
+        return [(float(scores[i]), self.ids[rows[i]]) for i in top_k(scores, k)]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "vectors": self._count,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "tail": self.tail,
+        }
+
+    def save(self, path: Path, vectors_path: Path, fingerprint: tuple[int, int] = (0, 0)) -> None:
+        """Persist metadata atomically (tmp + replace) with the edge.db fingerprint it matches.
+
+        Vectors already written through to `vectors_path` are not rewritten.
+        """
+        if self.path != vectors_path:
+            self.bind(vectors_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp_path,
+            **self.metadata(),
+            centroids=self.centroids,
+            offsets=self._offsets,
+            trained=np.int64(self._trained),
+            fingerprint=np.array(fingerprint, dtype=np.int64),
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(
+        cls, path: Path, vectors_path: Path, **kwargs: Any
+    ) -> tuple[IVFIndex, tuple[int, int]] | None:
+        """(index, saved edge.db fingerprint), or None if missing, unreadable or out of step."""
+        try:
+            with np.load(path) as data:
+                index = cls(int(data["dim"]), **kwargs)
+                index._restore(data)
+                index.centroids = np.asarray(data["centroids"], dtype=np.float32)
+                index._offsets = np.asarray(data["offsets"], dtype=np.int64)
+                index._trained = int(data["trained"])
+                fingerprint = (int(data["fingerprint"][0]), int(data["fingerprint"][1]))
+        except (FileNotFoundError, OSError, ValueError, KeyError, IndexError):
+            return None
+        if len(index._offsets) != index.nlist + 1 or index._trained > index._count:
+            return None
+        if not index.attach(vectors_path):
+            return None
+        return index, fingerprint
@@ -0,0 +1,237 @@
+"""Edge Bank — contiguous embedding matrix for vectorized recall.
+
+Every bead embedding is unit-normalised once and kept as one row of a
+float32 matrix, so exact recall is a single matrix-vector product plus
+argpartition for the top k instead of per-row deserialisation and dot
+products.
+
+Saved matrices live in a sidecar .npy next to edge.db (edge.db.vectors.npy)
+that later loads memory-map instead of reading. Once bound to that file,
+the matrix writes through: new rows are appended to the file (numpy leaves
+room in the .npy header for the row count to grow), replaced rows are
+patched in place, and the memory map is reopened, so a write_bead never
+rewrites the whole matrix.
+
+Usage:
+    matrix = EmbeddingMatrix(dim=384)
+    matrix.add_many(["bead_1"], vectors, ["win"])
+    matrix.search(query_vector, k=3, outcome="win")   # [(similarity, bead_id), ...]
+    matrix.bind(Path("edge.db.vectors.npy"))          # persist + memory-map
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+VECTORS_SUFFIX = ".vectors.npy"
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Unit-normalise rows (float32), so cosine similarity is a dot product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-8)
+
+
+def db_fingerprint(db_path: Path) -> tuple[int, int]:
+    """(mtime_ns, size) of the database file, (0, 0) if it doesn't exist."""
+    try:
+        st = db_path.stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first."""
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _read_header(fp: Any) -> tuple[tuple[int, ...], int]:
+    """(shape, data offset) of an open float32 C-order .npy file."""
+    version = npy_format.read_magic(fp)
+    if version == (1, 0):
+        shape, fortran_order, dtype = npy_format.read_array_header_1_0(fp)
+    else:
+        shape, fortran_order, dtype = npy_format.read_array_header_2_0(fp)
+    if fortran_order or dtype != np.float32:
+        raise ValueError("expected a C-order float32 matrix")
+    return shape, fp.tell()
+
+
+class EmbeddingMatrix:
+    """Unit-normalised embeddings in one float32 matrix, with outcome codes per row.
+
+    Args:
+        dim: Embedding dimension
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.ids: list[str] = []
+        self.labels: list[str] = []  # outcome code → outcome
+        self._codes: dict[str, int] = {}
+        self._rows: dict[str, int] = {}
+        self._vectors: np.ndarray = np.zeros((0, dim), dtype=np.float32)
+        self._outcomes = np.zeros(0, dtype=np.int16)  # row → outcome code
+        self._count = 0
+        self.path: Path | None = None  # Sidecar .npy once bound
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, bead_id: str) -> bool:
+        return bead_id in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[: self._count]
+
+    def _code(self, outcome: str) -> int:
+        code = self._codes.get(outcome)
+        if code is None:
+            code = self._codes[outcome] = len(self.labels)
+            self.labels.append(outcome)
+        return code
+
+    def add(self, bead_id: str, vector: np.ndarray, outcome: str = "pending") -> None:
+        """Insert or replace one vector (normalised here)."""
+        self.add_many([bead_id], np.asarray(vector).reshape(1, self.dim), [outcome])
+
+    def add_many(self, ids: list[str], vectors: np.ndarray, outcomes: list[str]) -> None:
+        """Insert or replace vectors in bulk (written through when bound)."""
+        vecs = normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+        start = self._count
+        new_ids: list[str] = []
+        latest: dict[int, int] = {}  # row → position in vecs (last write wins)
+        outcome_codes = np.array([self._code(o) for o in outcomes], dtype=np.int16)
+        for i, bead_id in enumerate(ids):
+            row = self._rows.get(bead_id)
+            if row is None:
+                row = self._rows[bead_id] = start + len(new_ids)
+                new_ids.append(bead_id)
+            latest[row] = i
+        rows = np.fromiter(latest.keys(), dtype=np.int64, count=len(latest))
+        picks = np.fromiter(latest.values(), dtype=np.int64, count=len(latest))
+        self.ids.extend(new_ids)
+        count = start + len(new_ids)
+        self._outcomes = self._resized(self._outcomes, count)
+        self._outcomes[rows] = outcome_codes[picks]
+
+        if self.path is None:
+            self._vectors = self._resized(self._vectors, count)
+            self._vectors[rows] = vecs[picks]
+        else:
+            self._write_through(rows, vecs[picks], start, count)
+        self._count = count
+
+    @staticmethod
+    def _resized(array: np.ndarray, count: int) -> np.ndarray:
+        """`array` with room for `count` rows (amortised doubling)."""
+        if count <= len(array):
+            return array
+        grown = np.zeros((max(64, 2 * len(array), count),) + array.shape[1:], dtype=array.dtype)
+        grown[: len(array)] = array
+        return grown
+
+    def _write_through(self, rows: np.ndarray, vecs: np.ndarray, start: int, count: int) -> None:
+        assert self.path is not None
+        new = rows >= start
+        order = np.argsort(rows[new])
+        appended = vecs[new][order]
+        try:
+            with open(self.path, "r+b") as fp:
+                shape, offset = _read_header(fp)
+                if shape != (start, self.dim):
+                    raise ValueError("sidecar out of step with the matrix")
+                row_bytes = self.dim * 4
+                for row, vec in zip(rows[~new], vecs[~new]):
+                    fp.seek(offset + int(row) * row_bytes)
+                    fp.write(vec.tobytes())
+                fp.seek(offset + start * row_bytes)
+                fp.write(np.ascontiguousarray(appended).tobytes())
+                fp.seek(0)
+                npy_format.write_array_header_1_0(
+                    fp, {"descr": "<f4", "fortran_order": False, "shape": (count, self.dim)}
+                )
+                if fp.tell() != offset:
+                    raise ValueError("header grew")
+        except (OSError, ValueError):
+            # Fall back to a full rewrite from the rows we have
+            vectors = np.zeros((count, self.dim), dtype=np.float32)
+            vectors[:start] = self._vectors[:start]
+            vectors[rows] = vecs
+            self._vectors = vectors
+            self._count = count
+            self.bind(self.path)
+            return
+        self._vectors = np.load(self.path, mmap_mode="r")
+
+    def bind(self, path: Path) -> None:
+        """Write the whole matrix to `path` (atomically) and memory-map it from then on."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, np.ascontiguousarray(self.vectors))
+        tmp_path.replace(path)
+        self.path = path
+        self._vectors = np.load(path, mmap_mode="r")
+
+    def attach(self, path: Path) -> bool:
+        """Memory-map an existing sidecar holding exactly this matrix's rows."""
+        try:
+            vectors = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, OSError, ValueError):
+            return False
+        if vectors.dtype != np.float32 or vectors.shape != (self._count, self.dim):
+            return False
+        self.path = path
+        self._vectors = vectors
+        return True
+
+    def search(
+        self, query: np.ndarray, k: int = 3, outcome: str | None = None
+    ) -> list[tuple[float, str]]:
+        """Exact top-k (cosine similarity, bead_id), best first, optionally filtered by outcome."""
+        if self._count == 0 or k <= 0:
+            return []
+        q = normalize(np.asarray(query, dtype=np.float32).reshape(self.dim))
+        scores = self.vectors @ q
+        rows = None
+        if outcome is not None:
+            code = self._codes.get(outcome)
+            if code is None:
+                return []
+            rows = np.flatnonzero(self._outcomes[: self._count] == code)
+            scores = scores[rows]
+        top = top_k(scores, k)
+        if rows is not None:
+            return [(float(scores[i]), self.ids[rows[i]]) for i in top]
+        return [(float(scores[i]), self.ids[i]) for i in top]
+
+    def metadata(self) -> dict[str, np.ndarray]:
+        """Everything but the vectors, as arrays for np.savez."""
+        return {
+            "dim": np.int64(self.dim),
+            "ids": np.array(self.ids, dtype=str),
+            "labels": np.array(self.labels, dtype=str),
+            "outcomes": self._outcomes[: self._count],
+        }
+
+    def _restore(self, data: Any) -> None:
+        self.ids = [str(i) for i in data["ids"]]
+        self.labels = [str(label) for label in data["labels"]]
+        self._outcomes = np.array(data["outcomes"], dtype=np.int16)
+        self._count = len(self.ids)
+        self._rows = {bead_id: row for row, bead_id in enumerate(self.ids)}
+        self._codes = {label: code for code, label in enumerate(self.labels)}
+        if len(self._outcomes) != self._count:
+            raise ValueError("outcomes out of step with ids")
@@ -20,17 +20,17 @@ import json
 import sys
 from datetime import datetime, timezone
 
-from lib.config import load_risk_config
+from lib.config import current_config
 from lib.state import load_state, save_state
 
 
 def check_drawdown() -> dict:
     """Check if pot has drawn down beyond the halt threshold."""
     state = load_state()
-    risk = load_risk_config()
+    portfolio = current_config().risk.portfolio
 
-    halt_pct = risk.get("portfolio", {}).get("drawdown_halt_pct", 50)
-    halt_hours = risk.get("portfolio", {}).get("drawdown_halt_hours", 24)
+    halt_pct = portfolio.drawdown_halt_pct
+    halt_hours = portfolio.drawdown_halt_hours
 
     # No starting balance set yet — can't check drawdown
     if state.starting_balance_sol <= 0:
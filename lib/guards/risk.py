@@ -19,7 +19,7 @@ from __future__ import annotations
 import json
 import sys
 
-from lib.config import load_risk_config
+from lib.config import current_config
 from lib.state import check_daily_reset, load_state, save_state
 
 
@@ -29,15 +29,15 @@ def check_risk() -> dict:
     state = check_daily_reset(state)
     save_state(state)
 
-    risk = load_risk_config()
-    portfolio = risk.get("portfolio", {})
-    circuit = risk.get("circuit_breakers", {})
+    risk = current_config().risk
+    portfolio = risk.portfolio
+    circuit = risk.circuit_breakers
 
     issues: list[str] = []
     warnings: list[str] = []
 
     # Daily exposure check (INV-DAILY-EXPOSURE-30)
-    max_daily_pct = portfolio.get("daily_exposure_pct", 30)
+    max_daily_pct = portfolio.daily_exposure_pct
     if state.current_balance_sol > 0:
         daily_pct = (state.daily_exposure_sol / state.current_balance_sol) * 100
         if daily_pct >= max_daily_pct:
@@ -49,7 +49,7 @@ def check_risk() -> dict:
         daily_pct = 0.0
 
     # Position count check
-    max_positions = portfolio.get("max_concurrent_positions", 5)
+    max_positions = portfolio.max_concurrent_positions
     if len(state.positions) >= max_positions:
         issues.append(
             f"Max positions reached ({len(state.positions)}/{max_positions}). "
@@ -57,7 +57,7 @@ def check_risk() -> dict:
         )
 
     # Consecutive losses circuit breaker
-    max_consec = circuit.get("consecutive_losses", 3)
+    max_consec = circuit.consecutive_losses
     if state.consecutive_losses >= max_consec:
         warnings.append(
             f"Consecutive losses: {state.consecutive_losses} (threshold: {max_consec}). "
@@ -65,7 +65,7 @@ def check_risk() -> dict:
         )
 
     # Daily loss circuit breaker
-    max_daily_loss = circuit.get("daily_loss_pct", 10)
+    max_daily_loss = circuit.daily_loss_pct
     if state.daily_loss_pct >= max_daily_loss:
         issues.append(
             f"Daily loss at {state.daily_loss_pct:.1f}% (limit: {max_daily_loss}%). "
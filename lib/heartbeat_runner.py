@@ -9,30 +9,177 @@ import asyncio
 import json
 import sys
 import time
-from datetime import datetime
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
-from lib.clients.nansen import NansenClient
 from lib.clients.birdeye import BirdeyeClient
+from lib.clients.nansen import NansenClient
+from lib.clients.pool import get_client_pool, with_client_pool
 from lib.clients.x_api import XClient
+from lib.config import config_scope, current_config, load_firehose_config
 from lib.scoring import ConvictionScorer, SignalInput
-from lib.utils.narrative_tracker import NarrativeTracker
-from lib.utils.async_batch import batch_price_fetch
+from lib.skills.warden_check import check_token
+from lib.smart_money import SmartMoneyIngester, aggregate_trades, window_signals
+from lib.utils.async_batch import batch_gather, batch_price_fetch
+from lib.utils.deadline import DeadlineExceededError, deadline_scope
 from lib.utils.file_lock import safe_read_json, safe_write_json
+from lib.utils.narrative_tracker import NarrativeTracker
 from lib.utils.red_flags import check_concentrated_volume
-from lib.skills.warden_check import check_token
+
+# Seconds of cycle budget kept back from candidate fetches for scoring + state write
+SCORING_RESERVE_SECONDS = 5.0
+# Deferred candidates older than this are dropped rather than carried forward
+DEFERRED_MAX_AGE_MINUTES = 30
+# Exit decisions and tier tracking written by the streaming price service
+PRICE_STREAM_PATH = Path("state/price_stream.json")
+
+
+@dataclass
+class HeartbeatStep:
+    """One node in the heartbeat step graph.
+
+    `run` receives the StepResults of its `deps` (keyed by step name) and is
+    started once they have all finished, whatever their status.
+    """
+
+    name: str
+    run: Callable[[dict[str, StepResult]], Awaitable[Any]]
+    deps: tuple[str, ...] = ()
+    budget_seconds: float = 30.0
+
+
+@dataclass
+class StepResult:
+    """Outcome of a single heartbeat step."""
+
+    name: str
+    status: str = "pending"  # ok | error | timeout | skipped
+    value: Any = None
+    error: str = ""
+    started_at: float = 0.0  # seconds since graph start
+    elapsed_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "started_at": round(self.started_at, 3),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+        }
+
+
+def _topological_order(steps: list[HeartbeatStep]) -> list[HeartbeatStep]:
+    """Order steps so every step follows its deps. Raises ValueError on bad graphs."""
+    by_name = {step.name: step for step in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("Duplicate heartbeat step names")
+    for step in steps:
+        missing = [dep for dep in step.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f"Step '{step.name}' depends on unknown step(s): {missing}")
+
+    ordered: list[HeartbeatStep] = []
+    done: set[str] = set()
+    pending = list(steps)
+    while pending:
+        ready = [step for step in pending if all(dep in done for dep in step.deps)]
+        if not ready:
+            raise ValueError(f"Cycle in heartbeat steps: {[step.name for step in pending]}")
+        for step in ready:
+            ordered.append(step)
+            done.add(step.name)
+            pending.remove(step)
+    return ordered
+
+
+async def run_step_graph(
+    steps: list[HeartbeatStep],
+    time_remaining: Callable[[], float],
+    min_start_seconds: float = 10.0,
+) -> dict[str, StepResult]:
+    """Run heartbeat steps as a dependency graph.
+
+    Independent steps run concurrently. Each step gets
+    min(budget_seconds, time_remaining()) to finish, also set as the context
+    deadline for the calls it makes; a step whose deps finish with less than
+    `min_start_seconds` of cycle budget left is skipped. A step that fails
+    with DeadlineExceededError counts as a timeout.
+
+    Returns:
+        Dict mapping step name -> StepResult (never raises for step failures)
+    """
+    ordered = _topological_order(steps)
+    results = {step.name: StepResult(name=step.name) for step in ordered}
+    tasks: dict[str, asyncio.Task[None]] = {}
+    graph_start = time.monotonic()
+
+    async def run_one(step: HeartbeatStep) -> None:
+        for dep in step.deps:
+            await tasks[dep]
+
+        outcome = results[step.name]
+        remaining = time_remaining()
+        if remaining < min_start_seconds:
+            outcome.status = "skipped"
+            outcome.error = f"{remaining:.1f}s of cycle budget left"
+            return
+
+        outcome.started_at = time.monotonic() - graph_start
+        inputs = {dep: results[dep] for dep in step.deps}
+        step_budget = min(step.budget_seconds, remaining)
+        try:
+            # Client calls inside the step see the step budget as their deadline
+            with deadline_scope(step_budget):
+                outcome.value = await asyncio.wait_for(step.run(inputs), timeout=step_budget)
+            outcome.status = "ok"
+        except DeadlineExceededError as e:
+            outcome.status = "timeout"
+            outcome.error = str(e)
+        except TimeoutError:
+            outcome.status = "timeout"
+            outcome.error = f"exceeded {min(step.budget_seconds, remaining):.1f}s"
+        except Exception as e:
+            outcome.status = "error"
+            outcome.error = str(e)
+        finally:
+            outcome.elapsed_seconds = time.monotonic() - graph_start - outcome.started_at
+
+    # Tasks are created in dependency order so tasks[dep] always exists
+    for step in ordered:
+        tasks[step.name] = asyncio.create_task(run_one(step))
+    await asyncio.gather(*tasks.values())
+
+    return results
 
 
 async def run_heartbeat(timeout_seconds: float = 120.0) -> dict[str, Any]:
     """Execute full heartbeat cycle with time budget.
     
+    Watchdog, oracle and narrative are independent I/O and run concurrently;
+    scoring starts once all three have finished (exits are still handled
+    before any new entry is considered). The budget is also set as the
+    context deadline, so client retries never outlive the cycle, and one
+    config snapshot is pinned for the whole cycle.
+
     Args:
         timeout_seconds: Maximum execution time before switching to observe-only mode
     
     Returns:
-        Dict with cycle results, errors, and timeout flag
+        Dict with cycle results, errors, timeout flag and per-step timings
     """
+    # One config snapshot per cycle: a mid-cycle edit to risk.yaml applies next cycle
+    with deadline_scope(timeout_seconds), config_scope():
+        return await _run_heartbeat_cycle(timeout_seconds)
+
+
+async def _run_heartbeat_cycle(timeout_seconds: float) -> dict[str, Any]:
     start_time = time.time()
     
     # Wrapper to check time budget
@@ -58,6 +205,8 @@ async def run_heartbeat(timeout_seconds: float = 120.0) -> dict[str, Any]:
         "observe_only": False,
         "data_completeness": 1.0,
         "sources_failed": [],
+        "steps": {},
+        "config_version": current_config().version,
     }
     
     # Check time budget before starting
@@ -67,66 +216,32 @@ async def run_heartbeat(timeout_seconds: float = 120.0) -> dict[str, Any]:
         result["errors"].append(f"Time budget exhausted before start: {time_remaining():.1f}s remaining")
         return result
     
-    # Step 7: Position Watchdog (runs before new signals to handle exits first)
-    if time_remaining() < 10:
-        result["timeout_triggered"] = True
-        result["observe_only"] = True
-        result["errors"].append("Timeout before watchdog step")
-        return result
+    # One wrapper per provider for the whole cycle; transports come from the
+    # process-wide client pool so connections and caches stay warm.
+    birdeye = BirdeyeClient()
+    nansen = NansenClient()
+    x_client = XClient()
+    narrative_tracker = NarrativeTracker()
+    smart_money = SmartMoneyIngester.from_config()
     
-    birdeye_watchdog = BirdeyeClient()
-    try:
-        exit_decisions = await asyncio.wait_for(
-            run_position_watchdog(state, birdeye_watchdog),
-            timeout=min(30, time_remaining())
-        )
+    # Step 7: Position Watchdog
+    async def watchdog_step(inputs: dict[str, StepResult]) -> list[dict[str, Any]]:
+        exit_decisions = await run_position_watchdog(state, birdeye)
         result["exits"] = exit_decisions
         # TODO: Execute exits in non-dry-run mode
-    except asyncio.TimeoutError:
-        result["errors"].append("Watchdog step timeout")
-        result["timeout_triggered"] = True
-        result["observe_only"] = True
-    except Exception as e:
-        result["errors"].append(f"Watchdog error: {e}")
-    finally:
-        await birdeye_watchdog.close()
+        return exit_decisions
     
     # Step 5: Smart Money Oracle
-    if time_remaining() < 10:
-        result["timeout_triggered"] = True
-        result["observe_only"] = True
-        result["errors"].append("Timeout before oracle step")
-        return result
-    
-    oracle_failed = False
-    nansen = NansenClient()
-    try:
-        oracle_data = await asyncio.wait_for(
-            nansen.get_smart_money_transactions(limit=50),
-            timeout=min(20, time_remaining())
-        )
-        oracle_signals = parse_oracle_signals(oracle_data)
+    async def oracle_step(inputs: dict[str, StepResult]) -> list[dict[str, Any]]:
+        # Incremental: only trades newer than the stored high-water mark are fetched
+        ingest = await smart_money.sync(nansen)
+        oracle_signals = smart_money.signals()
         result["oracle_signals"] = oracle_signals
-    except asyncio.TimeoutError:
-        result["errors"].append("Oracle step timeout")
-        oracle_signals = []
-        oracle_failed = True
-        result["sources_failed"].append("oracle")
-    except Exception as e:
-        result["errors"].append(f"Oracle error: {e}")
-        oracle_signals = []
-        oracle_failed = True
-        result["sources_failed"].append("oracle")
-    finally:
-        await nansen.close()
+        result["oracle_ingest"] = ingest.to_dict()
+        return oracle_signals
     
     # Step 6: Narrative Hunter
-    narrative_failed = False
-    birdeye = BirdeyeClient()
-    x_client = XClient()
-    narrative_tracker = NarrativeTracker()
-    
-    try:
+    async def narrative_step(inputs: dict[str, StepResult]) -> list[dict[str, Any]]:
         # Get trending tokens
         trending = await birdeye.get_token_list_trending(limit=10)
         tokens = trending.get("data", trending.get("items", []))
@@ -143,150 +258,212 @@ async def run_heartbeat(timeout_seconds: float = 120.0) -> dict[str, Any]:
                 narrative_signals.append(signal)
         
         result["narrative_signals"] = narrative_signals
-    except Exception as e:
-        result["errors"].append(f"Narrative error: {e}")
-        narrative_signals = []
-        narrative_failed = True
-        result["sources_failed"].append("narrative")
-    finally:
-        await birdeye.close()
-        await x_client.close()
-    
-    # PARTIAL DATA PENALTY (A2): Calculate data completeness
-    sources_failed_count = len(result["sources_failed"])
-    
-    if sources_failed_count >= 2:
-        # ≥2 primary sources unavailable → OBSERVE-ONLY MODE
-        result["observe_only"] = True
-        result["data_completeness"] = 0.0
-        result["decisions"].append("OBSERVE-ONLY MODE: ≥2 primary sources failed (oracle, narrative)")
-        # Skip entry logic, return early after watchdog
-        return result
-    elif oracle_failed:
-        # Oracle missing → 0.7x penalty (30% reduction)
-        result["data_completeness"] = 0.7
-    elif narrative_failed:
-        # Narrative missing → 0.8x penalty (20% reduction)
-        result["data_completeness"] = 0.8
-    else:
-        # All sources available
-        result["data_completeness"] = 1.0
-    
-    # Step 9: Conviction Scoring
-    scorer = ConvictionScorer()
-    
-    # Merge signals by token mint
-    all_mints = set()
-    for sig in oracle_signals:
-        all_mints.add(sig["token_mint"])
-    for sig in narrative_signals:
-        all_mints.add(sig["token_mint"])
-    
-    # Create new Birdeye client for red flag checks
-    birdeye_red_flags = BirdeyeClient()
-    
-    for mint in all_mints:
-        # Gather inputs
-        oracle_sig = next((s for s in oracle_signals if s["token_mint"] == mint), None)
-        narrative_sig = next((s for s in narrative_signals if s["token_mint"] == mint), None)
-        
-        whales = oracle_sig["wallet_count"] if oracle_sig else 0
-        volume_spike = 0.0
-        kol_detected = False
-        age_minutes = 0
-        
-        if narrative_sig:
-            volume_str = narrative_sig.get("volume_vs_avg", "0x")
-            volume_spike = float(volume_str.replace("x", ""))
-            kol_detected = narrative_sig.get("kol_mentions", 0) > 0
-            age_minutes = narrative_tracker.get_age_minutes(mint)
-        
-        # Run Rug Warden
-        rug_status = await run_rug_warden(mint)
-        
-        # RED FLAG CHECKS (Phase 3)
-        concentrated_vol = False
-        dumper_count = 0
-        
-        try:
-            # Check concentrated volume
-            trades_data = await birdeye_red_flags.get_trades(mint, limit=100)
-            concentrated_vol, vol_reason = check_concentrated_volume(trades_data)
-        except Exception as e:
-            result["errors"].append(f"Volume concentration check failed for {mint[:8]}: {e}")
+        return narrative_signals
+
+    # Step 9: Conviction Scoring — returns True when entry logic ran to completion
+    async def scoring_step(inputs: dict[str, StepResult]) -> bool:
+        oracle_failed = not inputs["oracle"].ok
+        narrative_failed = not inputs["narrative"].ok
+        oracle_signals = inputs["oracle"].value or []
+        narrative_signals = inputs["narrative"].value or []
         
-        # TODO: Dumper wallet check requires async wallet history fetching
-        # For now, dumper_count = 0 (stub)
+        # PARTIAL DATA PENALTY (A2): Calculate data completeness
+        if oracle_failed and narrative_failed:
+            # ≥2 primary sources unavailable → OBSERVE-ONLY MODE
+            result["observe_only"] = True
+            result["data_completeness"] = 0.0
+            result["decisions"].append(
+                "OBSERVE-ONLY MODE: ≥2 primary sources failed (oracle, narrative)"
+            )
+            # Skip entry logic
+            return False
+        elif oracle_failed:
+            # Oracle missing → 0.7x penalty (30% reduction)
+            result["data_completeness"] = 0.7
+        elif narrative_failed:
+            # Narrative missing → 0.8x penalty (20% reduction)
+            result["data_completeness"] = 0.8
+        else:
+            # All sources available
+            result["data_completeness"] = 1.0
         
-        # TIME MISMATCH CHECK (Phase 4 / B2)
-        # Oracle accumulation detected + Narrative age <5min → too fast, suspicious
-        time_mismatch_detected = (
-            whales >= 3 and  # Oracle signal present
-            volume_spike >= 5.0 and  # Narrative signal present
-            age_minutes < 5  # Narrative is brand new
-        )
+        scorer = ConvictionScorer()
         
-        # Score
-        signal_input = SignalInput(
-            smart_money_whales=whales,
-            narrative_volume_spike=volume_spike,
-            narrative_kol_detected=kol_detected,
-            narrative_age_minutes=age_minutes,
-            rug_warden_status=rug_status,
-            edge_bank_match_pct=0.0,  # No beads yet
-        )
+        # Merge signals by token mint, plus candidates deferred last cycle
+        oracle_by_mint = {sig["token_mint"]: sig for sig in oracle_signals}
+        narrative_by_mint = {sig["token_mint"]: sig for sig in narrative_signals}
+        carried = load_deferred_candidates(state)
+        for mint, entry in carried.items():
+            if entry.get("oracle_sig") and mint not in oracle_by_mint:
+                oracle_by_mint[mint] = entry["oracle_sig"]
+            if entry.get("narrative_sig") and mint not in narrative_by_mint:
+                narrative_by_mint[mint] = entry["narrative_sig"]
+        all_mints = sorted(set(oracle_by_mint) | set(narrative_by_mint))
         
-        score = scorer.score(
-            signal_input, 
-            pot_balance_sol=state["current_balance_sol"],
-            data_completeness=result["data_completeness"],
-            concentrated_volume=concentrated_vol,
-            dumper_wallet_count=dumper_count,
-            time_mismatch=time_mismatch_detected,
+        # Fan out Rug Warden + red flag fetches; whatever misses the deadline is deferred
+        max_concurrent = load_firehose_config().get("birdeye", {}).get("max_concurrent", 3)
+        candidate_deadline = time_remaining() - SCORING_RESERVE_SECONDS
+        evaluations = await batch_gather(
+            all_mints,
+            lambda mint: evaluate_candidate(mint, birdeye),
+            max_concurrent=max_concurrent,
+            timeout=candidate_deadline,
         )
         
-        opportunity = {
-            "token_mint": mint,
-            "token_symbol": (oracle_sig or narrative_sig or {}).get("token_symbol", "UNKNOWN"),
-            "ordering_score": score.ordering_score,
-            "permission_score": score.permission_score,
-            "breakdown": score.breakdown,
-            "red_flags": score.red_flags,
-            "primary_sources": score.primary_sources,
-            "recommendation": score.recommendation,
-            "position_size_sol": score.position_size_sol,
-            "reasoning": score.reasoning,
-            "signals": {
-                "whales": whales,
-                "volume_spike": volume_spike,
-                "kol": kol_detected,
-                "age_min": age_minutes,
-                "rug": rug_status,
+        deferred: list[dict[str, Any]] = []
+        for mint, evaluation in zip(all_mints, evaluations):
+            # Gather inputs
+            oracle_sig = oracle_by_mint.get(mint)
+            narrative_sig = narrative_by_mint.get(mint)
+
+            if evaluation is None:
+                deferred_at = carried.get(mint, {}).get("deferred_at")
+                deferred_at = deferred_at or datetime.utcnow().isoformat()
+                deferred.append({
+                    "token_mint": mint,
+                    "deferred_at": deferred_at,
+                    "oracle_sig": oracle_sig,
+                    "narrative_sig": narrative_sig,
+                })
+                result["decisions"].append(
+                    f"DEFERRED: {mint[:8]} — evaluation missed cycle deadline"
+                )
+                continue
+
+            whales = oracle_sig["wallet_count"] if oracle_sig else 0
+            volume_spike = 0.0
+            kol_detected = False
+            age_minutes = 0
+
+            if narrative_sig:
+                volume_str = narrative_sig.get("volume_vs_avg", "0x")
+                volume_spike = float(volume_str.replace("x", ""))
+                kol_detected = narrative_sig.get("kol_mentions", 0) > 0
+                age_minutes = narrative_tracker.get_age_minutes(mint)
+
+            rug_status = evaluation["rug_status"]
+
+            # RED FLAG CHECKS (Phase 3)
+            concentrated_vol = evaluation["concentrated_volume"]
+            dumper_count = 0
+            if evaluation["error"]:
+                result["errors"].append(evaluation["error"])
+
+            # TODO: Dumper wallet check requires async wallet history fetching
+            # For now, dumper_count = 0 (stub)
+
+            # TIME MISMATCH CHECK (Phase 4 / B2)
+            # Oracle accumulation detected + Narrative age <5min → too fast, suspicious
+            time_mismatch_detected = (
+                whales >= 3 and  # Oracle signal present
+                volume_spike >= 5.0 and  # Narrative signal present
+                age_minutes < 5  # Narrative is brand new
+            )
+
+            # Score
+            signal_input = SignalInput(
+                smart_money_whales=whales,
+                narrative_volume_spike=volume_spike,
+                narrative_kol_detected=kol_detected,
+                narrative_age_minutes=age_minutes,
+                rug_warden_status=rug_status,
+                edge_bank_match_pct=0.0,  # No beads yet
+            )
+
+            score = scorer.score(
+                signal_input,
+                pot_balance_sol=state["current_balance_sol"],
+                data_completeness=result["data_completeness"],
+                concentrated_volume=concentrated_vol,
+                dumper_wallet_count=dumper_count,
+                time_mismatch=time_mismatch_detected,
+            )
+
+            opportunity = {
+                "token_mint": mint,
+                "token_symbol": (oracle_sig or narrative_sig or {}).get("token_symbol", "UNKNOWN"),
+                "ordering_score": score.ordering_score,
+                "permission_score": score.permission_score,
+                "breakdown": score.breakdown,
+                "red_flags": score.red_flags,
+                "primary_sources": score.primary_sources,
+                "recommendation": score.recommendation,
+                "position_size_sol": score.position_size_sol,
+                "reasoning": score.reasoning,
+                "signals": {
+                    "whales": whales,
+                    "volume_spike": volume_spike,
+                    "kol": kol_detected,
+                    "age_min": age_minutes,
+                    "rug": rug_status,
+                }
             }
-        }
-        
-        result["opportunities"].append(opportunity)
-        
-        # Decision logic
-        if score.recommendation == "VETO":
-            result["decisions"].append(f"VETO: {mint[:8]} — {score.reasoning}")
-        elif score.recommendation == "DISCARD":
-            result["decisions"].append(f"DISCARD: {mint[:8]} — permission {score.permission_score} < 60")
-        elif score.recommendation == "WATCHLIST":
-            result["decisions"].append(f"WATCHLIST: {mint[:8]} — permission {score.permission_score} (60-84), ordering {score.ordering_score}, primary {len(score.primary_sources)}")
-        elif score.recommendation == "AUTO_EXECUTE":
-            if dry_run:
+
+            result["opportunities"].append(opportunity)
+
+            # Decision logic
+            if score.recommendation == "VETO":
+                result["decisions"].append(f"VETO: {mint[:8]} — {score.reasoning}")
+            elif score.recommendation == "DISCARD":
                 result["decisions"].append(
-                    f"DRY-RUN LOG: {mint[:8]} — would execute {score.position_size_sol:.4f} SOL (permission {score.permission_score}, ordering {score.ordering_score}, primary {len(score.primary_sources)})"
+                    f"DISCARD: {mint[:8]} — permission {score.permission_score} < 60"
                 )
-            else:
+            elif score.recommendation == "WATCHLIST":
                 result["decisions"].append(
-                    f"EXECUTE: {mint[:8]} — {score.position_size_sol:.4f} SOL (permission {score.permission_score}, ordering {score.ordering_score})"
+                    f"WATCHLIST: {mint[:8]} — permission {score.permission_score} (60-84), "
+                    f"ordering {score.ordering_score}, primary {len(score.primary_sources)}"
                 )
-                # TODO: Call execute_swap here in live mode
-    
-    # Close red flag client after loop
-    await birdeye_red_flags.close()
+            elif score.recommendation == "AUTO_EXECUTE":
+                if dry_run:
+                    result["decisions"].append(
+                        f"DRY-RUN LOG: {mint[:8]} — would execute "
+                        f"{score.position_size_sol:.4f} SOL (permission {score.permission_score}, "
+                        f"ordering {score.ordering_score}, "
+                        f"primary {len(score.primary_sources)})"
+                    )
+                else:
+                    result["decisions"].append(
+                        f"EXECUTE: {mint[:8]} — {score.position_size_sol:.4f} SOL "
+                        f"(permission {score.permission_score}, ordering {score.ordering_score})"
+                    )
+                    # TODO: Call execute_swap here in live mode
+
+        result["deferred"] = [d["token_mint"] for d in deferred]
+        state["deferred_candidates"] = deferred
+        return True
+
+    steps = [
+        HeartbeatStep("watchdog", watchdog_step, budget_seconds=30),
+        HeartbeatStep("oracle", oracle_step, budget_seconds=20),
+        HeartbeatStep("narrative", narrative_step, budget_seconds=60),
+        HeartbeatStep(
+            "scoring",
+            scoring_step,
+            deps=("watchdog", "oracle", "narrative"),
+            budget_seconds=timeout_seconds,
+        ),
+    ]
+    outcomes = await run_step_graph(steps, time_remaining)
+    result["steps"] = {name: outcome.to_dict() for name, outcome in outcomes.items()}
+    result["client_stats"] = get_client_pool().stats()
+
+    for name, outcome in outcomes.items():
+        label = name.capitalize()
+        if outcome.status == "skipped":
+            result["errors"].append(f"Timeout before {name} step")
+        elif outcome.status == "timeout":
+            result["errors"].append(f"{label} step timeout")
+        elif outcome.status == "error":
+            result["errors"].append(f"{label} error: {outcome.error}")
+
+        if not outcome.ok and name in ("oracle", "narrative"):
+            result["sources_failed"].append(name)
+        if outcome.status in ("skipped", "timeout") and name in ("watchdog", "scoring"):
+            result["timeout_triggered"] = True
+            result["observe_only"] = True
+
+    if not (outcomes["scoring"].ok and outcomes["scoring"].value):
+        return result
     
     # Step 13: Update state with file locking (R5 fix)
     if dry_run:
@@ -302,60 +479,142 @@ async def run_heartbeat(timeout_seconds: float = 120.0) -> dict[str, Any]:
 
 
 def parse_oracle_signals(data: dict[str, Any]) -> list[dict[str, Any]]:
-    """Parse Nansen smart money transactions into signals."""
-    SOL_MINT = "So11111111111111111111111111111111111111112"
-    token_wallets: dict[str, dict[str, Any]] = {}
-    
+    """Parse Nansen smart money transactions into signals (3+ distinct buying wallets)."""
     transactions = data.get("data", [])
     if not isinstance(transactions, list):
         return []
+    return window_signals(aggregate_trades(transactions))
+
+
+def merge_exit_tracking(pos: dict[str, Any], tracking: dict[str, Any]) -> None:
+    """Fold exit tracking kept elsewhere (price stream or heartbeat state) into `pos`.
     
-    for tx in transactions:
-        token_sold = tx.get("token_sold_address", "")
-        token_bought = tx.get("token_bought_address", "")
-        
-        if token_sold == SOL_MINT and token_bought != SOL_MINT:
-            mint = token_bought
-            symbol = tx.get("token_bought_symbol", "UNKNOWN")
-            value_usd = tx.get("trade_value_usd", 0)
-        else:
-            continue
-        
-        wallet = tx.get("trader_address", "")
-        if not mint or not wallet:
-            continue
-        
-        if mint not in token_wallets:
-            token_wallets[mint] = {
-                "token_mint": mint,
-                "token_symbol": symbol,
-                "wallets": set(),
-                "total_value_usd": 0.0,
-            }
-        
-        token_wallets[mint]["wallets"].add(wallet)
-        token_wallets[mint]["total_value_usd"] += float(value_usd)
-    
-    signals = []
-    for info in token_wallets.values():
-        wallet_count = len(info["wallets"])
-        if wallet_count >= 3:
-            signals.append({
-                "token_mint": info["token_mint"],
-                "token_symbol": info["token_symbol"],
-                "wallet_count": wallet_count,
-                "total_buy_usd": round(info["total_value_usd"], 2),
-            })
+    Tier flags are sticky (fired by either side counts) and the peak is the
+    higher of the two, so the watchdog and the stream never repeat a tier.
+    """
+    for key in ("tier1_exited", "tier2_exited", "stream_exited"):
+        if tracking.get(key):
+            pos[key] = True
+    if tracking.get("peak_price") is not None:
+        pos["peak_price"] = max(float(tracking["peak_price"]), float(pos.get("peak_price", 0.0)))
+
+
+def position_tracking(pos: dict[str, Any], tracking: dict[str, Any]) -> dict[str, Any]:
+    """Tracking kept for `pos`'s mint, or {} if it belongs to an earlier position in it."""
+    track = tracking.get(pos["token_mint"]) or {}
+    return track if track.get("entry_time") in (None, pos.get("entry_time")) else {}
+
+
+def evaluate_position_exit(
+    pos: dict[str, Any],
+    current_price: float,
+    liquidity: float | None = None,
+    now: datetime | None = None,
+) -> dict[str, Any] | None:
+    """Apply the exit rules to one position at `current_price`.
+
+    Shared by the heartbeat watchdog and the streaming price service. Updates
+    `pos` in place (peak_price, tier1_exited / tier2_exited). Pass
+    liquidity=None when it is unknown (e.g. a stream tick) to skip the
+    liquidity-drop rule.
     
-    return signals
+    Returns the exit decision, or None to hold.
+    """
+    mint = pos["token_mint"]
+    entry_price = pos["entry_price"]
+    peak_price = pos.get("peak_price", entry_price)
+    entry_time = datetime.fromisoformat(pos["entry_time"])
+
+    # Update peak price if needed
+    if current_price > peak_price:
+        pos["peak_price"] = current_price
+        peak_price = current_price
+
+    # Calculate PnL
+    pnl_pct = ((current_price - entry_price) / entry_price) * 100
+    peak_drawdown_pct = ((current_price - peak_price) / peak_price) * 100
+
+    # Position age
+    age_minutes = ((now or datetime.utcnow()) - entry_time).total_seconds() / 60
+
+    # Exit logic
+    # 1. Stop-loss (-20%)
+    if pnl_pct <= -20:
+        return {
+            "token_mint": mint,
+            "symbol": pos["token_symbol"],
+            "reason": f"Stop-loss hit: {pnl_pct:.1f}%",
+            "exit_pct": 100,
+            "urgency": "critical",
+        }
+    # 2. Take-profit tier 1 (+100%)
+    elif pnl_pct >= 100 and not pos.get("tier1_exited", False):
+        pos["tier1_exited"] = True
+        return {
+            "token_mint": mint,
+            "symbol": pos["token_symbol"],
+            "reason": f"TP tier 1: {pnl_pct:.1f}% (2x)",
+            "exit_pct": 50,
+            "urgency": "normal",
+        }
+    # 3. Take-profit tier 2 (+400%)
+    elif pnl_pct >= 400 and not pos.get("tier2_exited", False):
+        pos["tier2_exited"] = True
+        return {
+            "token_mint": mint,
+            "symbol": pos["token_symbol"],
+            "reason": f"TP tier 2: {pnl_pct:.1f}% (5x)",
+            "exit_pct": 30,
+            "urgency": "normal",
+        }
+    # 4. Trailing stop (20% from peak while in profit)
+    elif pnl_pct > 0 and peak_drawdown_pct <= -20:
+        return {
+            "token_mint": mint,
+            "symbol": pos["token_symbol"],
+            "reason": f"Trailing stop: {peak_drawdown_pct:.1f}% from peak",
+            "exit_pct": 100,
+            "urgency": "high",
+        }
+    # 5. Time decay (no movement after 60min)
+    elif age_minutes >= 60 and abs(pnl_pct) < 5:
+        return {
+            "token_mint": mint,
+            "symbol": pos["token_symbol"],
+            "reason": f"Time decay: {age_minutes:.0f}min, {pnl_pct:.1f}% PnL",
+            "exit_pct": 100,
+            "urgency": "low",
+        }
+    # 6. Liquidity drop (>50% from entry)
+    elif (
+        liquidity is not None
+        and pos.get("entry_liquidity")
+        and liquidity < pos["entry_liquidity"] * 0.5
+    ):
+        return {
+            "token_mint": mint,
+            "symbol": pos["token_symbol"],
+            "reason": f"Liquidity drop: ${liquidity:,.0f} (was ${pos['entry_liquidity']:,.0f})",
+            "exit_pct": 100,
+            "urgency": "high",
+        }
+    return None
 
 
 async def run_position_watchdog(
     state: dict[str, Any],
     birdeye: BirdeyeClient,
+    stream_path: Path = PRICE_STREAM_PATH,
 ) -> list[dict[str, Any]]:
     """Monitor open positions and generate exit decisions.
     
+    Exits the streaming price service (lib.price_stream) detected since the
+    last cycle come first: the stream never executes, so its decisions are
+    handed on here once each (consumed ids are kept in
+    state["stream_exits_consumed"]). Its exit tracking is merged in too, so
+    a tier it already fired is not fired again and a position it fully
+    exited gets no second decision.
+
     Returns list of exit decisions with reason and percentage.
     """
     exit_decisions = []
@@ -364,16 +623,37 @@ async def run_position_watchdog(
     if not positions:
         return exit_decisions
     
-    # Batch fetch all position prices (R4 fix: parallel API calls)
+    stream = safe_read_json(stream_path) if stream_path.exists() else {}
+    if not isinstance(stream, dict):
+        stream = {}
+    tracking = stream.get("tracking", {})
+    for pos in positions:
+        merge_exit_tracking(pos, position_tracking(pos, tracking))
+
+    consumed = set(state.get("stream_exits_consumed", []))
+    stream_exits = [e for e in stream.get("exits", []) if isinstance(e, dict)]
+    for decision in stream_exits:
+        exit_id = stream_exit_id(decision)
+        if exit_id in consumed:
+            continue
+        consumed.add(exit_id)  # Exits for positions closed since are dropped, not deferred
+        if any(_same_position(pos, decision) for pos in positions):
+            exit_decisions.append(decision)
+    # Only ids the stream still lists can come back, so the record stays bounded
+    state["stream_exits_consumed"] = sorted(
+        {stream_exit_id(e) for e in stream_exits} & consumed
+    )
+
+    positions = [pos for pos in positions if not pos.get("stream_exited")]
+    if not positions:
+        return exit_decisions
+
+    # Batch fetch all position prices (one multi-price request, per-mint fallback)
     mints = [pos["token_mint"] for pos in positions]
     price_data = await batch_price_fetch(birdeye, mints, max_concurrent=3)
     
     for pos in positions:
         mint = pos["token_mint"]
-        entry_price = pos["entry_price"]
-        entry_sol = pos["entry_amount_sol"]
-        peak_price = pos.get("peak_price", entry_price)
-        entry_time = datetime.fromisoformat(pos["entry_time"])
         
         # Get refreshed price from batch fetch
         overview = price_data.get(mint, {})
@@ -389,92 +669,88 @@ async def run_position_watchdog(
             })
             continue
         
-        current_price = float(data.get("price", 0))
-        liquidity = float(data.get("liquidity", 0))
-        
-        # Update peak price if needed
-        if current_price > peak_price:
-            pos["peak_price"] = current_price
-            peak_price = current_price
-        
-        # Calculate PnL
-        pnl_pct = ((current_price - entry_price) / entry_price) * 100
-        peak_drawdown_pct = ((current_price - peak_price) / peak_price) * 100
-        
-        # Position age
-        age_minutes = (datetime.utcnow() - entry_time).total_seconds() / 60
-        
-        # Exit logic
-        # 1. Stop-loss (-20%)
-        if pnl_pct <= -20:
-            exit_decisions.append({
-                "token_mint": mint,
-                "symbol": pos["token_symbol"],
-                "reason": f"Stop-loss hit: {pnl_pct:.1f}%",
-                "exit_pct": 100,
-                "urgency": "critical",
-            })
-        # 2. Take-profit tier 1 (+100%)
-        elif pnl_pct >= 100 and not pos.get("tier1_exited", False):
-            exit_decisions.append({
-                "token_mint": mint,
-                "symbol": pos["token_symbol"],
-                "reason": f"TP tier 1: {pnl_pct:.1f}% (2x)",
-                "exit_pct": 50,
-                "urgency": "normal",
-            })
-            pos["tier1_exited"] = True
-        # 3. Take-profit tier 2 (+400%)
-        elif pnl_pct >= 400 and not pos.get("tier2_exited", False):
-            exit_decisions.append({
-                "token_mint": mint,
-                "symbol": pos["token_symbol"],
-                "reason": f"TP tier 2: {pnl_pct:.1f}% (5x)",
-                "exit_pct": 30,
-                "urgency": "normal",
-            })
-            pos["tier2_exited"] = True
-        # 4. Trailing stop (20% from peak while in profit)
-        elif pnl_pct > 0 and peak_drawdown_pct <= -20:
-            exit_decisions.append({
-                "token_mint": mint,
-                "symbol": pos["token_symbol"],
-                "reason": f"Trailing stop: {peak_drawdown_pct:.1f}% from peak",
-                "exit_pct": 100,
-                "urgency": "high",
-            })
-        # 5. Time decay (no movement after 60min)
-        elif age_minutes >= 60 and abs(pnl_pct) < 5:
-            exit_decisions.append({
-                "token_mint": mint,
-                "symbol": pos["token_symbol"],
-                "reason": f"Time decay: {age_minutes:.0f}min, {pnl_pct:.1f}% PnL",
-                "exit_pct": 100,
-                "urgency": "low",
-            })
-        # 6. Liquidity drop (>50% from entry)
-        elif pos.get("entry_liquidity") and liquidity < pos["entry_liquidity"] * 0.5:
-            exit_decisions.append({
-                "token_mint": mint,
-                "symbol": pos["token_symbol"],
-                "reason": f"Liquidity drop: ${liquidity:,.0f} (was ${pos['entry_liquidity']:,.0f})",
-                "exit_pct": 100,
-                "urgency": "high",
-            })
+        decision = evaluate_position_exit(
+            pos,
+            current_price=float(data.get("price", 0)),
+            liquidity=float(data.get("liquidity", 0)),
+        )
+        if decision:
+            exit_decisions.append(decision)
     
     return exit_decisions
 
 
-async def run_rug_warden(mint: str) -> str:
-    """Run Rug Warden check on a token mint."""
+def stream_exit_id(decision: dict[str, Any]) -> str:
+    """Identity of an exit decision written by the price stream."""
+    return f"{decision.get('token_mint')}:{decision.get('detected_at')}"
+
+
+def _same_position(pos: dict[str, Any], decision: dict[str, Any]) -> bool:
+    """Whether a stream decision is about `pos` (not an earlier position in the same mint)."""
+    if decision.get("token_mint") != pos.get("token_mint"):
+        return False
+    return decision.get("entry_time") in (None, pos.get("entry_time"))
+
+
+async def run_rug_warden(mint: str, birdeye: BirdeyeClient | None = None) -> str:
+    """Run Rug Warden check on a token mint.
+
+    Timeouts propagate (the candidate is deferred, not failed); any other
+    error gives FAIL.
+    """
     try:
-        result = await check_token(mint)
+        result = await check_token(mint, birdeye)
         return result.get("verdict", "FAIL")
-    except Exception as e:
+    except TimeoutError:
+        # Includes DeadlineExceededError: out of time is not a verdict
+        raise
+    except Exception:
         # On error, return FAIL to be safe
         return "FAIL"
 
 
+async def evaluate_candidate(mint: str, birdeye: BirdeyeClient) -> dict[str, Any]:
+    """Fetch the per-candidate inputs for scoring (Rug Warden + volume concentration).
+
+    Both lookups run concurrently. A failed volume check is reported in
+    "error" and scored as not concentrated; only a timeout raises, which
+    batch_gather turns into None so the candidate is deferred.
+    """
+    async def volume_check() -> tuple[bool, str]:
+        try:
+            trades_data = await birdeye.get_trades(mint, limit=100)
+            concentrated, _reason = check_concentrated_volume(trades_data)
+            return concentrated, ""
+        except TimeoutError:
+            raise
+        except Exception as e:
+            return False, f"Volume concentration check failed for {mint[:8]}: {e}"
+
+    rug_status, (concentrated_vol, error) = await asyncio.gather(
+        run_rug_warden(mint, birdeye),
+        volume_check(),
+    )
+    return {
+        "rug_status": rug_status,
+        "concentrated_volume": concentrated_vol,
+        "error": error,
+    }
+
+
+def load_deferred_candidates(state: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Candidates deferred by a previous cycle that are still fresh enough to score."""
+    cutoff = datetime.utcnow() - timedelta(minutes=DEFERRED_MAX_AGE_MINUTES)
+    carried = {}
+    for entry in state.get("deferred_candidates", []):
+        try:
+            deferred_at = datetime.fromisoformat(entry["deferred_at"])
+        except (KeyError, ValueError):
+            continue
+        if deferred_at >= cutoff:
+            carried[entry["token_mint"]] = entry
+    return carried
+
+
 async def scan_token_narrative(
     mint: str,
     birdeye: BirdeyeClient,
@@ -523,7 +799,7 @@ async def scan_token_narrative(
 
 
 async def main():
-    result = await run_heartbeat()
+    result = await with_client_pool(run_heartbeat())
     print(json.dumps(result, indent=2, default=str))
     sys.exit(0)
 
@@ -0,0 +1,321 @@
+"""Price Stream — real-time exit monitoring for open positions.
+
+The heartbeat watchdog only looks at positions every cycle (~10 min), so a
+-20% stop-loss can become -60% before anyone notices. This service stays
+connected to a price WebSocket (Birdeye protocol: SUBSCRIBE_PRICE /
+PRICE_DATA), subscribes to every open position mint, keeps an in-memory
+latest-price table and runs the watchdog exit rules
+(heartbeat_runner.evaluate_position_exit) on every tick.
+
+Exit decisions are written to state/price_stream.json (not state.json, which
+the heartbeat rewrites wholesale) together with the latest prices and the
+per-position peak / take-profit flags the rules maintain. The heartbeat
+watchdog picks up each new decision once and acts on it with its own; it
+merges those flags before evaluating, and this service merges the
+heartbeat's flags from state.json on every positions refresh, so a tier
+fires once whichever side sees it first. Executing the exits stays with
+the heartbeat (still dry-run only).
+
+Positions are re-read from state/state.json periodically; new mints are
+subscribed and closed ones unsubscribed (and their tracking dropped)
+without reconnecting. Dropped
+connections and rejected handshakes (401/429/5xx) are retried with
+exponential backoff.
+
+Usage:
+    python3 -m lib.price_stream
+    python3 -m lib.price_stream --url ws://127.0.0.1:8765 --max-seconds 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from string import Template
+from typing import Any
+
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import WebSocketException
+
+from lib.config import WORKSPACE, load_firehose_config
+from lib.heartbeat_runner import (
+    evaluate_position_exit,
+    merge_exit_tracking,
+    position_tracking,
+)
+from lib.utils.file_lock import safe_read_json, safe_write_json
+
+STATE_PATH = WORKSPACE / "state" / "state.json"
+OUTPUT_PATH = WORKSPACE / "state" / "price_stream.json"
+DEFAULT_URL = "wss://public-api.birdeye.so/socket/solana?x-api-key=${BIRDEYE_API_KEY}"
+
+
+@dataclass
+class PriceTick:
+    """Latest price seen for a mint."""
+
+    price: float
+    unix_time: float
+    received_at: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "price": self.price,
+            "unix_time": self.unix_time,
+            "age_seconds": round(time.time() - self.received_at, 1),
+        }
+
+
+def subscribe_message(mint: str, subscribe: bool = True) -> str:
+    """Birdeye price subscription frame for one mint."""
+    return json.dumps({
+        "type": "SUBSCRIBE_PRICE" if subscribe else "UNSUBSCRIBE_PRICE",
+        "data": {"queryType": "simple", "chartType": "1m", "address": mint, "currency": "usd"},
+    })
+
+
+def _normalise_position(pos: dict[str, Any]) -> dict[str, Any] | None:
+    """Heartbeat positions use entry_price; lib.state.Position uses entry_price_usd."""
+    entry_price = pos.get("entry_price", pos.get("entry_price_usd"))
+    if not pos.get("token_mint") or not entry_price or not pos.get("entry_time"):
+        return None
+    return {
+        **pos,
+        "entry_price": float(entry_price),
+        "token_symbol": pos.get("token_symbol", pos["token_mint"][:6]),
+    }
+
+
+class PriceStreamService:
+    """WebSocket price subscriber that evaluates exit rules per tick.
+
+    `connector` opens the connection (websockets' connect by default).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        state_path: Path = STATE_PATH,
+        output_path: Path = OUTPUT_PATH,
+        positions_refresh_seconds: float = 30.0,
+        reconnect_initial_seconds: float = 1.0,
+        reconnect_max_seconds: float = 30.0,
+        connector: Callable[..., Any] = connect,
+    ):
+        self.url = url
+        self.connector = connector
+        self.state_path = state_path
+        self.output_path = output_path
+        self.positions_refresh_seconds = positions_refresh_seconds
+        self.reconnect_initial_seconds = reconnect_initial_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self.prices: dict[str, PriceTick] = {}
+        self.positions: dict[str, dict[str, Any]] = {}
+        self.exits: list[dict[str, Any]] = []
+        self.ticks = 0
+        self.connects = 0
+        self.failures = 0
+        self._subscribed: set[str] = set()
+        self._stop = asyncio.Event()
+        self._restore_tracking()
+
+    def _restore_tracking(self) -> None:
+        """Carry peak prices, take-profit flags and sent exits across restarts."""
+        saved = safe_read_json(self.output_path) if self.output_path.exists() else {}
+        self._tracking: dict[str, dict[str, Any]] = saved.get("tracking", {})
+        self.exits = saved.get("exits", [])
+
+    def load_positions(self) -> set[str]:
+        """Re-read open positions from state. Returns the mints to subscribe to."""
+        state = safe_read_json(self.state_path) if self.state_path.exists() else {}
+        positions: dict[str, dict[str, Any]] = {}
+        for raw in state.get("positions", []):
+            pos = _normalise_position(raw)
+            if pos is None:
+                continue
+            mint = pos["token_mint"]
+            current = self.positions.get(mint)
+            if current is None or current.get("entry_time") != pos["entry_time"]:
+                merge_exit_tracking(pos, position_tracking(pos, self._tracking))
+                current = pos
+            else:
+                merge_exit_tracking(current, pos)  # The heartbeat may have fired a tier since
+            positions[mint] = current
+        self.positions = positions
+        # Closed positions' flags and peaks must not carry over to a later buy of the mint
+        self._tracking = {
+            mint: track
+            for mint, pos in positions.items()
+            if (track := position_tracking(pos, self._tracking))
+        }
+        return {mint for mint, pos in positions.items() if not pos.get("stream_exited")}
+
+    def handle_message(self, raw: str | bytes) -> dict[str, Any] | None:
+        """Process one frame. Returns the exit decision it triggered, if any."""
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(message, dict) or message.get("type") != "PRICE_DATA":
+            return None
+        data = message.get("data") or {}
+        mint = data.get("address")
+        price = data.get("c", data.get("value"))
+        if not mint or price is None:
+            return None
+
+        self.ticks += 1
+        now = time.time()
+        self.prices[mint] = PriceTick(float(price), float(data.get("unixTime", now)), now)
+
+        pos = self.positions.get(mint)
+        if pos is None or pos.get("stream_exited"):
+            return None
+        # Liquidity is not on the price stream; that rule stays with the heartbeat watchdog
+        decision = evaluate_position_exit(pos, float(price), liquidity=None)
+        self._tracking[mint] = {
+            key: pos[key]
+            for key in ("entry_time", "peak_price", "tier1_exited", "tier2_exited", "stream_exited")
+            if key in pos
+        }
+        if decision is None:
+            return None
+
+        if decision["exit_pct"] >= 100:
+            pos["stream_exited"] = True
+            self._tracking[mint]["stream_exited"] = True
+        decision.update({
+            "source": "price_stream",
+            "entry_time": pos.get("entry_time"),
+            "price": float(price),
+            "detected_at": datetime.utcnow().isoformat(),
+            "tick_lag_seconds": round(max(0.0, now - float(data.get("unixTime", now))), 3),
+        })
+        self.exits.append(decision)
+        self.persist()
+        return decision
+
+    def persist(self) -> None:
+        safe_write_json(self.output_path, {
+            "updated_at": datetime.utcnow().isoformat(),
+            "url": self.url.split("?", 1)[0],  # Never write the API key
+            "prices": {mint: tick.to_dict() for mint, tick in self.prices.items()},
+            "exits": self.exits[-200:],
+            "tracking": self._tracking,
+            "stats": self.stats(),
+        })
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "connects": self.connects,
+            "failures": self.failures,
+            "subscribed": sorted(self._subscribed),
+            "exits": len(self.exits),
+        }
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def _sync_subscriptions(self, ws: ClientConnection) -> None:
+        wanted = self.load_positions()
+        for mint in sorted(wanted - self._subscribed):
+            await ws.send(subscribe_message(mint))
+        for mint in sorted(self._subscribed - wanted):
+            await ws.send(subscribe_message(mint, subscribe=False))
+        self._subscribed = wanted
+
+    async def _session(self, ws: ClientConnection) -> None:
+        self._subscribed = set()
+        await self._sync_subscriptions(ws)
+        next_refresh = time.monotonic() + self.positions_refresh_seconds
+        while not self._stop.is_set():
+            try:
+                timeout = max(0.0, next_refresh - time.monotonic())
+                raw = await asyncio.wait_for(ws.recv(), timeout=timeout)
+            except TimeoutError:
+                await self._sync_subscriptions(ws)
+                self.persist()
+                next_refresh = time.monotonic() + self.positions_refresh_seconds
+                continue
+            self.handle_message(raw)
+
+    async def run(self, max_seconds: float | None = None) -> dict[str, Any]:
+        """Stream until stop() or `max_seconds`, reconnecting on failures."""
+        delay = self.reconnect_initial_seconds
+
+        async def loop() -> None:
+            nonlocal delay
+            while not self._stop.is_set():
+                try:
+                    async with self.connector(self.url, subprotocols=["echo-protocol"]) as ws:
+                        self.connects += 1
+                        delay = self.reconnect_initial_seconds
+                        await self._session(ws)
+                except (WebSocketException, OSError, TimeoutError) as e:
+                    # Includes rejected handshakes (InvalidStatus for 401/429/5xx)
+                    self.failures += 1
+                    print(
+                        f"price stream disconnected: {e}; retrying in {delay:.0f}s",
+                        file=sys.stderr,
+                    )
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                    except TimeoutError:
+                        pass
+                    delay = min(delay * 2, self.reconnect_max_seconds)
+
+        streaming = asyncio.create_task(loop())
+        stopping = asyncio.create_task(self._stop.wait())
+        await asyncio.wait(
+            {streaming, stopping}, timeout=max_seconds, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in (streaming, stopping):
+            task.cancel()
+        await asyncio.gather(streaming, stopping, return_exceptions=True)
+        self.persist()
+        return self.stats()
+
+
+def stream_settings() -> dict[str, Any]:
+    """firehose.yaml price_stream section, with ${VAR} placeholders in the URL expanded."""
+    settings = dict(load_firehose_config().get("price_stream", {}) or {})
+    settings["url"] = Template(settings.get("url", DEFAULT_URL)).safe_substitute(os.environ)
+    return settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Price Stream — real-time exit monitoring")
+    parser.add_argument("--url", help="WebSocket URL (default: firehose.yaml price_stream.url)")
+    parser.add_argument(
+        "--max-seconds", type=float, help="Stop after this many seconds (default: run forever)"
+    )
+    args = parser.parse_args()
+
+    settings = stream_settings()
+    service = PriceStreamService(
+        args.url or settings["url"],
+        positions_refresh_seconds=float(settings.get("positions_refresh_seconds", 30)),
+        reconnect_initial_seconds=float(settings.get("reconnect_initial_seconds", 1)),
+        reconnect_max_seconds=float(settings.get("reconnect_max_seconds", 30)),
+    )
+    try:
+        stats = asyncio.run(service.run(args.max_seconds))
+    except KeyboardInterrupt:
+        service.persist()
+        stats = service.stats()
+
+    print(json.dumps({"status": "OK", **stats}, indent=2))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
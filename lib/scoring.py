@@ -3,10 +3,14 @@
 Conviction Scoring System
 Weighted signal aggregation for trade decision-making.
 """
-import yaml
-from pathlib import Path
-from typing import Dict, List, Optional
+from collections.abc import Sequence
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from lib.config import load_risk_config
 
 
 @dataclass
@@ -25,21 +29,117 @@ class ConvictionScore:
     """Output conviction score with breakdown."""
     ordering_score: int      # Pure signal strength (for learning)
     permission_score: int    # After penalties and gates (for action)
-    breakdown: Dict[str, int]
-    red_flags: Dict[str, int]  # Negative contributions
-    primary_sources: List[str]  # Which primary sources triggered
+    breakdown: dict[str, int]
+    red_flags: dict[str, int]  # Negative contributions
+    primary_sources: list[str]  # Which primary sources triggered
     recommendation: str  # AUTO_EXECUTE, WATCHLIST, DISCARD, VETO
     position_size_sol: float
     reasoning: str
 
 
+# Rug Warden status codes for columnar scoring (anything else is UNKNOWN)
+WARDEN_PASS, WARDEN_WARN, WARDEN_FAIL, WARDEN_UNKNOWN = 0, 1, 2, 3
+WARDEN_CODES = {"PASS": WARDEN_PASS, "WARN": WARDEN_WARN, "FAIL": WARDEN_FAIL}
+
+
+def warden_codes(statuses: Any) -> Any:
+    """Rug Warden statuses (strings or already-coded ints) as an int8 code array."""
+    import numpy as np
+
+    statuses = np.asarray(statuses)
+    if statuses.dtype.kind in "iu":
+        return statuses.astype(np.int8, copy=False)
+    codes = np.full(statuses.shape, WARDEN_UNKNOWN, dtype=np.int8)
+    for status, code in WARDEN_CODES.items():
+        codes[statuses == status] = code
+    return codes
+
+
+@dataclass
+class SignalBatch:
+    """Columnar signals for many candidates (NumPy arrays of equal length).
+
+    Mirrors SignalInput plus the per-candidate red-flag arguments of
+    ConvictionScorer.score(). rug_warden_status holds status strings or
+    warden_codes(); red-flag columns may be None (flag absent for all rows).
+    """
+    smart_money_whales: Any
+    narrative_volume_spike: Any
+    narrative_kol_detected: Any
+    narrative_age_minutes: Any
+    rug_warden_status: Any
+    edge_bank_match_pct: Any
+    concentrated_volume: Any = None
+    dumper_wallet_count: Any = None
+    time_mismatch: Any = None
+
+    def __len__(self) -> int:
+        return len(self.smart_money_whales)
+
+    @classmethod
+    def from_inputs(
+        cls,
+        signals: Sequence[SignalInput],
+        concentrated_volume: Sequence[bool] | None = None,
+        dumper_wallet_count: Sequence[int] | None = None,
+        time_mismatch: Sequence[bool] | None = None,
+    ) -> "SignalBatch":
+        """Build a batch from SignalInput rows (e.g. replayed candidates)."""
+        import numpy as np
+
+        def column(name: str, dtype: Any) -> Any:
+            return np.array([getattr(s, name) for s in signals], dtype=dtype)
+
+        def optional(values: Sequence[Any] | None, dtype: Any) -> Any:
+            return None if values is None else np.asarray(values, dtype=dtype)
+
+        return cls(
+            smart_money_whales=column("smart_money_whales", np.int64),
+            narrative_volume_spike=column("narrative_volume_spike", np.float64),
+            narrative_kol_detected=column("narrative_kol_detected", bool),
+            narrative_age_minutes=column("narrative_age_minutes", np.float64),
+            rug_warden_status=warden_codes([s.rug_warden_status for s in signals]),
+            edge_bank_match_pct=column("edge_bank_match_pct", np.float64),
+            concentrated_volume=optional(concentrated_volume, bool),
+            dumper_wallet_count=optional(dumper_wallet_count, np.int64),
+            time_mismatch=optional(time_mismatch, bool),
+        )
+
+
+# BatchScores.recommendation_code values, indexed into RECOMMENDATIONS
+RECOMMENDATIONS = ("DISCARD", "WATCHLIST", "AUTO_EXECUTE", "VETO")
+
+
+@dataclass
+class BatchScores:
+    """Output of ConvictionScorer.score_batch (one array element per candidate)."""
+    ordering_score: Any      # int64
+    permission_score: Any    # int64
+    recommendation_code: Any  # int8 index into RECOMMENDATIONS
+    position_size_sol: Any   # float64
+    primary_source_count: Any  # int64
+
+    def __len__(self) -> int:
+        return len(self.ordering_score)
+
+    @property
+    def recommendation(self) -> Any:
+        """Recommendation strings (object array), decoded from recommendation_code."""
+        import numpy as np
+
+        return np.array(RECOMMENDATIONS, dtype=object)[self.recommendation_code]
+
+
 class ConvictionScorer:
     """Calculate conviction scores from signal inputs."""
     
-    def __init__(self, config_path: Path = Path("config/risk.yaml")):
-        """Load scoring configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config_path: Path | None = None):
+        """Load scoring configuration (the current config snapshot unless a path is given)."""
+        if config_path is None:
+            self.config = load_risk_config()
+        else:
+            with open(config_path) as f:
+                self.config = yaml.safe_load(f)
         
         self.weights = self.config['conviction']['weights']
         self.thresholds = self.config['conviction']['thresholds']
@@ -337,6 +437,97 @@ class ConvictionScorer:
         )
 
 
+    def score_batch(
+        self,
+        batch: SignalBatch,
+        pot_balance_sol: float,
+        volatility_factor: Any = 1.0,
+        data_completeness: Any = 1.0,
+    ) -> BatchScores:
+        """
+        Vectorized score() for many candidates at once (offline re-scoring, tuning).
+
+        Produces the same ordering/permission scores, recommendations and
+        position sizes as calling score() per row; breakdowns and reasoning
+        strings are not built. volatility_factor and data_completeness may be
+        scalars or per-candidate arrays.
+        """
+        import numpy as np
+
+        n = len(batch)
+        whales = np.asarray(batch.smart_money_whales, dtype=np.int64)
+        spike = np.asarray(batch.narrative_volume_spike, dtype=np.float64)
+        kol = np.asarray(batch.narrative_kol_detected, dtype=bool)
+        age = np.asarray(batch.narrative_age_minutes, dtype=np.float64)
+        warden = warden_codes(batch.rug_warden_status)
+        match = np.asarray(batch.edge_bank_match_pct, dtype=np.float64)
+        completeness = np.asarray(data_completeness, dtype=np.float64)
+        volatility = np.asarray(volatility_factor, dtype=np.float64)
+
+        is_pass = warden == WARDEN_PASS
+        is_warden_primary = warden <= WARDEN_WARN  # PASS or WARN
+        spike_primary = spike >= 5.0
+
+        # Vetoes 1, 3, 4 (score() returns before any scoring)
+        early_veto = (
+            (warden == WARDEN_FAIL) | ((age < 2) & spike_primary) | ((spike >= 10.0) & ~kol)
+        )
+
+        # Oracle: +15 per whale, capped (0 whales -> 0 as in score_smart_money_oracle)
+        oracle = np.minimum(whales * 15, self.weights['smart_money_oracle'])
+
+        # Narrative: volume base + KOL bonus, linear decay from 30 to 60 minutes
+        base = np.where(spike_primary, np.minimum(np.trunc((spike / 5.0) * 15), 25), 0.0)
+        decay = 1.0 - np.clip((age - 30) / 30, 0.0, 1.0)
+        narrative = np.minimum(
+            np.trunc((base + kol * 10) * decay), self.weights['narrative_hunter']
+        ).astype(np.int64)
+
+        warden_max = self.weights['rug_warden']
+        warden_points = np.where(is_pass, warden_max, is_warden_primary * int(warden_max * 0.5))
+
+        edge_max = self.weights['edge_bank']
+        edge = np.where(
+            match < 70.0, 0, np.minimum(np.trunc(((match - 70) / 30) * edge_max), edge_max)
+        )
+
+        ordering = oracle + narrative + warden_points + edge.astype(np.int64)
+
+        # Red flags: concentrated volume, then dumper wallets (all whales dumping -> veto)
+        permission = ordering
+        if batch.concentrated_volume is not None:
+            permission = permission - np.asarray(batch.concentrated_volume, dtype=bool) * 15
+        dumper_veto = np.zeros(n, dtype=bool)
+        if batch.dumper_wallet_count is not None:
+            dumpers = np.asarray(batch.dumper_wallet_count, dtype=np.int64)
+            dumper_veto = (dumpers > 0) & (dumpers >= whales) & (whales > 0)
+            penalty = np.where((dumpers <= 0) | dumper_veto, 0, np.where(dumpers == 1, 15, 30))
+            permission = permission - penalty
+        permission = np.trunc(permission * completeness).astype(np.int64)
+
+        # Permission gate: AUTO_EXECUTE needs >=2 primary sources
+        primary = (whales >= 3).astype(np.int64) + spike_primary + is_warden_primary
+        auto = permission >= self.thresholds['auto_execute']
+        watch = (permission >= self.thresholds['watchlist']).astype(np.int8)
+        level = watch + (auto & (primary >= 2))
+        if batch.time_mismatch is not None:
+            level = np.maximum(level - np.asarray(batch.time_mismatch, dtype=np.int8), 0)
+        vetoed = early_veto | dumper_veto
+        level = np.where(vetoed, 3, level).astype(np.int8)
+
+        base_size = (permission / 100) * (pot_balance_sol * self.sizing['base_multiplier'])
+        max_size = pot_balance_sol * (self.trade_limits['max_position_pct'] / 100)
+        size = np.minimum(base_size / volatility, max_size)
+
+        return BatchScores(
+            ordering_score=np.where(early_veto, 0, ordering),
+            permission_score=np.where(vetoed, 0, permission),
+            recommendation_code=level,
+            position_size_sol=np.where(vetoed, 0.0, size),
+            primary_source_count=np.where(early_veto, 0, primary),
+        )
+
+
 def main():
     """CLI for testing conviction scoring."""
     import argparse
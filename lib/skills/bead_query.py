@@ -4,6 +4,7 @@ Queries similar historical patterns for pre-trade pattern recognition.
 
 Usage:
     python3 -m lib.skills.bead_query --context "whale accumulation, 5x volume, AI narrative"
+    python3 -m lib.skills.bead_query --context "..." --outcome loss
 """
 
 from __future__ import annotations
@@ -15,10 +16,10 @@ import sys
 from lib.edge.bank import EdgeBank
 
 
-def query_beads(context: str, top_k: int = 3) -> dict:
-    """Query similar beads and return matches."""
+def query_beads(context: str, top_k: int = 3, outcome: str | None = None) -> dict:
+    """Query similar beads (optionally only those with `outcome`) and return matches."""
     bank = EdgeBank()
-    matches = bank.query_similar(context, top_k=top_k)
+    matches = bank.query_similar(context, top_k=top_k, outcome=outcome)
     stats = bank.get_stats()
 
     return {
@@ -33,9 +34,12 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Edge Bank — Query Similar Patterns")
     parser.add_argument("--context", required=True, help="Signal context to match against")
     parser.add_argument("--top-k", type=int, default=3, help="Number of matches (default: 3)")
+    parser.add_argument(
+        "--outcome", choices=["pending", "win", "loss"], help="Only match beads with this outcome"
+    )
     args = parser.parse_args()
 
-    result = query_beads(args.context, args.top_k)
+    result = query_beads(args.context, args.top_k, args.outcome)
     print(json.dumps(result, indent=2))
     sys.exit(0)
 
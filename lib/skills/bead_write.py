@@ -2,8 +2,15 @@
 
 Writes a trade autopsy bead to beads/ and edge.db.
 
+--bulk streams a JSONL file (one bead per line: "type" plus the --data
+fields, optionally a historical "timestamp") through EdgeBank.write_beads.
+--reembed re-encodes every stored bead, e.g. after a model change. Both
+report progress on stderr and print the JSON result on stdout.
+
 Usage:
     python3 -m lib.skills.bead_write --type entry --data '{"token_symbol": "BOAR", ...}'
+    python3 -m lib.skills.bead_write --bulk autopsies.jsonl
+    python3 -m lib.skills.bead_write --reembed
 """
 
 from __future__ import annotations
@@ -11,16 +18,20 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
 
-from lib.edge.bank import Bead, EdgeBank
+from lib.edge.bank import Bead, EdgeBank, Progress
 
+BEAD_TYPES = ("entry", "exit")
 
-def write_bead(bead_type: str, data: dict) -> dict:
-    """Write a bead and return confirmation."""
-    bank = EdgeBank()
 
-    bead = Bead(
+def bead_from_data(bead_type: str, data: dict) -> Bead:
+    """Bead from --data style JSON."""
+    return Bead(
         bead_type=bead_type,
+        timestamp=data.get("timestamp", ""),
         token_mint=data.get("token_mint", ""),
         token_symbol=data.get("token_symbol", ""),
         direction=data.get("direction", ""),
@@ -34,7 +45,11 @@ def write_bead(bead_type: str, data: dict) -> dict:
         market_conditions=data.get("market_conditions", ""),
     )
 
-    bead_id = bank.write_bead(bead)
+
+def write_bead(bead_type: str, data: dict) -> dict:
+    """Write a bead and return confirmation."""
+    bank = EdgeBank()
+    bead_id = bank.write_bead(bead_from_data(bead_type, data))
     stats = bank.get_stats()
 
     return {
@@ -45,12 +60,80 @@ def write_bead(bead_type: str, data: dict) -> dict:
     }
 
 
+def _read_jsonl(path: Path, errors: list[dict]) -> Iterator[Bead]:
+    """Beads from a JSONL file, lazily; bad lines are recorded in `errors` and skipped."""
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                bead_type = data.get("type", data.get("bead_type"))
+                if bead_type not in BEAD_TYPES:
+                    raise ValueError(f"type must be one of {BEAD_TYPES}, got {bead_type!r}")
+                bead = bead_from_data(bead_type, data)
+                if bead.timestamp:
+                    datetime.fromisoformat(bead.timestamp)
+                yield bead
+            except (ValueError, TypeError, AttributeError) as e:
+                errors.append({"line": line_no, "error": str(e)})
+
+
+def _report(label: str) -> Progress:
+    def progress(done: int, total: int | None) -> None:
+        print(f"{label}: {done}" + (f"/{total}" if total is not None else ""), file=sys.stderr)
+    return progress
+
+
+def write_bulk(path: Path, batch_size: int = 64) -> dict:
+    """Write every bead in a JSONL file in batches and return a summary."""
+    bank = EdgeBank()
+    errors: list[dict] = []
+    bead_ids = bank.write_beads(
+        _read_jsonl(path, errors), batch_size=batch_size, progress=_report("written")
+    )
+    return {
+        "status": "OK" if not errors else "PARTIAL",
+        "written": len(bead_ids),
+        "errors": errors,
+        "bank_stats": bank.get_stats(),
+    }
+
+
+def reembed(batch_size: int = 64) -> dict:
+    """Re-encode every stored bead and return a summary."""
+    bank = EdgeBank()
+    result = bank.reembed(batch_size=batch_size, progress=_report("reembedded"))
+    return {**result, "bank_stats": bank.get_stats()}
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Edge Bank — Write Bead")
-    parser.add_argument("--type", required=True, choices=["entry", "exit"], dest="bead_type")
-    parser.add_argument("--data", required=True, help="JSON string with bead data")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--data", help="JSON string with bead data (with --type)")
+    mode.add_argument("--bulk", type=Path, metavar="FILE", help="JSONL file, one bead per line")
+    mode.add_argument("--reembed", action="store_true", help="Recompute every stored embedding")
+    parser.add_argument("--type", choices=BEAD_TYPES, dest="bead_type")
+    parser.add_argument(
+        "--batch-size", type=int, default=64, help="Beads per embedding batch (default: 64)"
+    )
     args = parser.parse_args()
 
+    if args.bulk is not None or args.reembed:
+        try:
+            if args.bulk is not None:
+                result = write_bulk(args.bulk, args.batch_size)
+            else:
+                result = reembed(args.batch_size)
+        except OSError as e:
+            print(json.dumps({"status": "ERROR", "error": str(e)}))
+            sys.exit(1)
+        print(json.dumps(result, indent=2))
+        sys.exit(0 if result["status"] != "ERROR" else 1)
+
+    if args.bead_type is None:
+        parser.error("--data requires --type")
+
     try:
         data = json.loads(args.data)
     except json.JSONDecodeError as e:
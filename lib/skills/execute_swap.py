@@ -19,6 +19,7 @@ from typing import Any
 
 from lib.clients.jupiter import JupiterClient, SOL_MINT
 from lib.clients.jito import JitoClient
+from lib.clients.pool import with_client_pool
 from lib.signer.keychain import sign_transaction, verify_isolation, SignerError
 
 
@@ -160,13 +161,13 @@ def main() -> None:
     parser.add_argument("--slippage", type=int, default=300, help="Max slippage in bps (default: 300 = 3%%)")
     args = parser.parse_args()
 
-    result = asyncio.run(execute_swap(
+    result = asyncio.run(with_client_pool(execute_swap(
         direction=args.direction,
         token_mint=args.token,
         amount=args.amount,
         dry_run=args.dry_run,
         slippage_bps=args.slippage,
-    ))
+    )))
     print(json.dumps(result, indent=2))
     sys.exit(0 if result["status"] in ("DRY_RUN", "SUCCESS") else 1)
 
@@ -7,6 +7,7 @@ Usage:
     python3 -m lib.skills.narrative_scan
     python3 -m lib.skills.narrative_scan --token <MINT_ADDRESS>
     python3 -m lib.skills.narrative_scan --topic "AI tokens"
+    python3 -m lib.skills.narrative_scan --deadline 30
 """
 
 from __future__ import annotations
@@ -18,7 +19,9 @@ import sys
 from typing import Any
 
 from lib.clients.birdeye import BirdeyeClient
+from lib.clients.pool import with_client_pool
 from lib.clients.x_api import XClient
+from lib.utils.deadline import within_deadline
 
 
 async def scan_narrative(
@@ -126,9 +129,13 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Narrative Hunter")
     parser.add_argument("--token", help="Specific token mint to scan")
     parser.add_argument("--topic", help="Topic to search on X")
+    parser.add_argument(
+        "--deadline", type=float, help="Overall time budget in seconds (calls fail fast once spent)"
+    )
     args = parser.parse_args()
 
-    result = asyncio.run(scan_narrative(args.token, args.topic))
+    scan = scan_narrative(args.token, args.topic)
+    result = asyncio.run(with_client_pool(within_deadline(args.deadline, scan)))
     print(json.dumps(result, indent=2))
     sys.exit(0 if result["status"] == "OK" else 1)
 
@@ -5,6 +5,7 @@ Queries Nansen for whale accumulation signals on Solana.
 Usage:
     python3 -m lib.skills.oracle_query
     python3 -m lib.skills.oracle_query --token <MINT_ADDRESS>
+    python3 -m lib.skills.oracle_query --deadline 20
 """
 
 from __future__ import annotations
@@ -19,6 +20,9 @@ from typing import Any
 from dotenv import load_dotenv
 
 from lib.clients.nansen import NansenClient
+from lib.clients.pool import with_client_pool
+from lib.smart_money import aggregate_trades, window_signals
+from lib.utils.deadline import within_deadline
 
 # Load environment variables
 load_dotenv()
@@ -53,60 +57,14 @@ async def query_oracle(token_mint: str | None = None) -> dict[str, Any]:
 
 def _parse_broad_signals(data: dict[str, Any]) -> list[dict[str, Any]]:
     """Parse broad smart money transaction data into signals."""
-    # Group by token, count unique wallets
-    SOL_MINT = "So11111111111111111111111111111111111111112"
-    token_wallets: dict[str, dict[str, Any]] = {}
     transactions = data.get("data", data.get("transactions", []))
     if not isinstance(transactions, list):
         return []
 
-    for tx in transactions:
-        # Infer BUY: sold SOL, bought token
-        token_sold = tx.get("token_sold_address", "")
-        token_bought = tx.get("token_bought_address", "")
-        
-        if token_sold == SOL_MINT and token_bought != SOL_MINT:
-            # This is a BUY (spent SOL to get token)
-            mint = token_bought
-            symbol = tx.get("token_bought_symbol", "UNKNOWN")
-            value_usd = tx.get("trade_value_usd", 0)
-        elif token_bought == SOL_MINT and token_sold != SOL_MINT:
-            # This is a SELL (sold token for SOL) — skip
-            continue
-        else:
-            # Token-to-token swap or unknown — skip
-            continue
-        
-        wallet = tx.get("trader_address", "")
-        if not mint or not wallet:
-            continue
-
-        if mint not in token_wallets:
-            token_wallets[mint] = {
-                "token_mint": mint,
-                "token_symbol": symbol,
-                "wallets": set(),
-                "total_value_usd": 0.0,
-            }
-
-        token_wallets[mint]["wallets"].add(wallet)
-        token_wallets[mint]["total_value_usd"] += float(value_usd)
-
-    # Filter: require 3+ independent wallets
-    signals = []
-    for info in token_wallets.values():
-        wallet_count = len(info["wallets"])
-        if wallet_count >= 3:
-            confidence = "high" if wallet_count >= 5 else "medium"
-            signals.append({
-                "token_mint": info["token_mint"],
-                "token_symbol": info["token_symbol"],
-                "wallet_count": wallet_count,
-                "total_buy_usd": round(info["total_value_usd"], 2),
-                "confidence": confidence,
-            })
-
-    signals.sort(key=lambda s: s["wallet_count"], reverse=True)
+    # Buys only (sold SOL, bought token); require 3+ independent wallets
+    signals = window_signals(aggregate_trades(transactions))
+    for signal in signals:
+        signal["confidence"] = "high" if signal["wallet_count"] >= 5 else "medium"
     return signals[:10]
 
 
@@ -129,9 +87,12 @@ def _parse_token_signals(data: dict[str, Any], mint: str) -> list[dict[str, Any]
 def main() -> None:
     parser = argparse.ArgumentParser(description="Smart Money Oracle")
     parser.add_argument("--token", help="Specific token mint to query")
+    parser.add_argument(
+        "--deadline", type=float, help="Overall time budget in seconds (calls fail fast once spent)"
+    )
     args = parser.parse_args()
 
-    result = asyncio.run(query_oracle(args.token))
+    result = asyncio.run(with_client_pool(within_deadline(args.deadline, query_oracle(args.token))))
     print(json.dumps(result, indent=2))
     sys.exit(0 if result["status"] == "OK" else 1)
 
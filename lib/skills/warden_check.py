@@ -10,6 +10,7 @@ Pre-trade token validation. 6-point check:
 
 Usage:
     python3 -m lib.skills.warden_check --token <MINT_ADDRESS>
+    python3 -m lib.skills.warden_check --token <MINT_ADDRESS> --deadline 20
 """
 
 from __future__ import annotations
@@ -21,13 +22,22 @@ import sys
 from typing import Any
 
 from lib.clients.birdeye import BirdeyeClient
-from lib.config import load_risk_config
+from lib.clients.pool import with_client_pool
+from lib.config import current_config
+from lib.utils.deadline import within_deadline
 
 
-async def check_token(mint: str) -> dict[str, Any]:
-    """Run all 6 Rug Warden checks on a token."""
-    risk = load_risk_config().get("rug_warden", {})
-    birdeye = BirdeyeClient()
+async def check_token(mint: str, birdeye: BirdeyeClient | None = None) -> dict[str, Any]:
+    """Run all 6 Rug Warden checks on a token.
+
+    Pass the caller's BirdeyeClient to share it; otherwise one is drawn from
+    the client pool (closed by the pool, not here). Other failures give a FAIL
+    verdict, but a timeout (incl. DeadlineExceededError) propagates so the
+    caller can retry the mint rather than reject it.
+    """
+    risk = current_config().risk.rug_warden
+    if birdeye is None:
+        birdeye = BirdeyeClient()
 
     checks: dict[str, Any] = {}
     reasons: list[str] = []
@@ -43,7 +53,7 @@ async def check_token(mint: str) -> dict[str, Any]:
 
         # 1. Liquidity check
         liquidity = float(overview_data.get("liquidity", 0))
-        min_liq = risk.get("min_liquidity_usd", 10000)
+        min_liq = risk.min_liquidity_usd
         checks["liquidity_usd"] = liquidity
         if liquidity < min_liq:
             verdict = "FAIL"
@@ -51,7 +61,7 @@ async def check_token(mint: str) -> dict[str, Any]:
 
         # 2. Holder concentration
         top_holder_pct = float(security_data.get("top10HolderPercent", 0)) * 100
-        max_conc = risk.get("max_holder_concentration_pct", 80)
+        max_conc = risk.max_holder_concentration_pct
         checks["holder_concentration_pct"] = round(top_holder_pct, 1)
         if top_holder_pct > max_conc:
             verdict = "FAIL"
@@ -62,7 +72,7 @@ async def check_token(mint: str) -> dict[str, Any]:
         freeze_mutable = bool(security_data.get("isFreezable", False))
         checks["mint_authority_mutable"] = mint_mutable
         checks["freeze_authority_mutable"] = freeze_mutable
-        if risk.get("reject_mutable_mint", True) and (mint_mutable or freeze_mutable):
+        if risk.reject_mutable_mint and (mint_mutable or freeze_mutable):
             verdict = "FAIL"
             reasons.append(f"Mutable authority: mint={mint_mutable}, freeze={freeze_mutable}")
 
@@ -76,7 +86,7 @@ async def check_token(mint: str) -> dict[str, Any]:
             import time
             age_seconds = int(time.time() - creation_time / 1000)
             checks["token_age_seconds"] = age_seconds
-            min_age = risk.get("min_token_age_seconds", 300)
+            min_age = risk.min_token_age_seconds
             if age_seconds < min_age:
                 if verdict != "FAIL":
                     verdict = "WARN"
@@ -88,16 +98,16 @@ async def check_token(mint: str) -> dict[str, Any]:
         lp_locked = bool(security_data.get("isLpLocked", False))
         lp_burned = bool(security_data.get("isLpBurned", False))
         checks["lp_locked"] = lp_locked or lp_burned
-        if not (lp_locked or lp_burned) and not risk.get("reject_unlocked_lp", False):
+        if not (lp_locked or lp_burned) and not risk.reject_unlocked_lp:
             if verdict != "FAIL":
                 verdict = "WARN"
             reasons.append("LP not locked or burned")
 
+    except TimeoutError:
+        raise
     except Exception as e:
         verdict = "FAIL"
         reasons.append(f"Check failed: {e}")
-    finally:
-        await birdeye.close()
 
     return {
         "verdict": verdict,
@@ -110,9 +120,22 @@ async def check_token(mint: str) -> dict[str, Any]:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Rug Warden — Pre-trade validation")
     parser.add_argument("--token", required=True, help="Token mint address")
+    parser.add_argument(
+        "--deadline", type=float, help="Overall time budget in seconds (calls fail fast once spent)"
+    )
     args = parser.parse_args()
 
-    result = asyncio.run(check_token(args.token))
+    try:
+        result = asyncio.run(
+            with_client_pool(within_deadline(args.deadline, check_token(args.token)))
+        )
+    except TimeoutError as e:
+        result = {
+            "verdict": "FAIL",
+            "token_mint": args.token,
+            "checks": {},
+            "reasons": [f"Check failed: {e or 'timed out'}"],
+        }
     print(json.dumps(result, indent=2))
 
     exit_code = 0 if result["verdict"] == "PASS" else (2 if result["verdict"] == "WARN" else 1)
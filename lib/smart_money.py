@@ -0,0 +1,701 @@
+"""Smart money ingestion — incremental Nansen DEX-trade polling.
+
+The oracle used to fetch the latest 50 trades every heartbeat and rebuild
+wallet sets from scratch: trades that fell outside that window were lost and
+overlapping ones were re-processed. SmartMoneyIngester instead keeps a
+high-water mark (block timestamp + transaction hash) and pages forward
+(newest first) until it reaches it, appending only unseen trades to a local
+SQLite store (state/smart_money.db). Signals are per-mint distinct-wallet
+aggregates over a rolling window, so they reflect all accumulation since the
+last run while a warm cycle usually costs a single small page. The window is
+a WindowAggregator (lib.utils.window_aggregator) updated per sync and saved
+next to the store, so signals never rescan trade history.
+
+The high-water mark only moves once a sync reaches it, the end of the feed
+or the retention horizon (older trades would be pruned anyway, so a cold
+start never pages back further than `retention_hours`). When `max_pages`
+runs out first, the sync records a backfill resume point instead: the next
+page to read and the head it started from. Later cycles first read the head
+pages down to that head, so fresh trades are never held back, then continue
+from the saved page (new trades only push older ones deeper, so nothing is
+skipped) until the gap closes and the cursor jumps to the head.
+
+Every append bumps a store version that the saved window is stamped with.
+A window saved by a process that raced another sync no longer matches the
+store and is rebuilt from it.
+
+Configured in config/firehose.yaml:
+
+    nansen:
+      ingest:
+        path: state/smart_money.db
+        window_path: state/smart_money_window.json
+        per_page: 25
+        max_pages: 10
+        window_minutes: 120
+        retention_hours: 48
+        distinct: {mode: exact}    # or sketch: HyperLogLog above a threshold
+
+Usage:
+    python3 -m lib.smart_money --sync
+    python3 -m lib.smart_money --signals [--window 60]
+    python3 -m lib.smart_money --stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from lib.config import WORKSPACE, load_firehose_config
+from lib.utils.window_aggregator import WindowAggregator
+
+DEFAULT_PATH = WORKSPACE / "state" / "smart_money.db"
+DEFAULT_WINDOW_PATH = WORKSPACE / "state" / "smart_money_window.json"
+SOL_MINT = "So11111111111111111111111111111111111111112"
+# Distinct wallets a mint needs inside the window to become a signal
+MIN_SIGNAL_WALLETS = 3
+
+
+def _parse_timestamp(value: Any) -> float | None:
+    """Nansen block_timestamp (ISO-8601, naive = UTC) or epoch → epoch seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.timestamp()
+
+
+def trade_id(tx: dict[str, Any]) -> str:
+    """Stable id for a trade: the transaction hash, or a digest when it is missing.
+
+    One transaction can contain several swaps, so the hash is qualified with
+    the trader and token pair.
+    """
+    tx_hash = tx.get("transaction_hash") or tx.get("tx_hash")
+    if not tx_hash:
+        tx_hash = hashlib.sha256(json.dumps(tx, sort_keys=True, default=str).encode()).hexdigest()
+    parts = (
+        tx_hash,
+        tx.get("trader_address", ""),
+        tx.get("token_sold_address", ""),
+        tx.get("token_bought_address", ""),
+    )
+    return ":".join(str(p) for p in parts)
+
+
+def buy_from_trade(tx: dict[str, Any]) -> tuple[str, str, str, float] | None:
+    """(mint, symbol, wallet, usd) for a SOL → token buy; None for sells and token-token swaps."""
+    mint = tx.get("token_bought_address", "")
+    wallet = tx.get("trader_address", "")
+    if tx.get("token_sold_address", "") != SOL_MINT or mint == SOL_MINT or not mint or not wallet:
+        return None
+    value_usd = float(tx.get("trade_value_usd") or 0.0)
+    return mint, tx.get("token_bought_symbol", "UNKNOWN"), wallet, value_usd
+
+
+def aggregate_trades(
+    transactions: list[dict[str, Any]],
+    aggregator: WindowAggregator | None = None,
+    now: float | None = None,
+) -> WindowAggregator:
+    """Add the buys in a Nansen DEX-trade list to `aggregator` (a fresh unbounded one by default).
+
+    Trades without a block_timestamp are stamped `now`.
+    """
+    aggregator = aggregator if aggregator is not None else WindowAggregator()
+    now = time.time() if now is None else now
+    for tx in transactions:
+        buy = buy_from_trade(tx) if isinstance(tx, dict) else None
+        if buy is None:
+            continue
+        mint, symbol, wallet, value_usd = buy
+        ts = _parse_timestamp(tx.get("block_timestamp"))
+        aggregator.insert(ts if ts is not None else now, mint, wallet, value_usd, symbol)
+    return aggregator
+
+
+def _aggregate_row(row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "token_mint": row["key"],
+        "token_symbol": row["label"] or "UNKNOWN",
+        "wallet_count": row["distinct"],
+        "total_buy_usd": row["total_value"],
+        "trade_count": row["events"],
+        "first_trade_ts": row["first_seen"],
+        "last_trade_ts": row["last_seen"],
+    }
+
+
+def window_signals(
+    aggregator: WindowAggregator, min_wallets: int = MIN_SIGNAL_WALLETS
+) -> list[dict[str, Any]]:
+    """Oracle signals (mint, symbol, distinct wallets, buy USD), most wallets first."""
+    return [
+        {
+            "token_mint": row["key"],
+            "token_symbol": row["label"] or "UNKNOWN",
+            "wallet_count": row["distinct"],
+            "total_buy_usd": row["total_value"],
+        }
+        for row in aggregator.snapshot(min_members=min_wallets)
+    ]
+
+
+@dataclass(order=True)
+class Cursor:
+    """High-water mark: the newest trade already ingested."""
+
+    block_ts: float = 0.0
+    trade_id: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"block_ts": self.block_ts, "trade_id": self.trade_id}
+
+
+@dataclass
+class Backfill:
+    """Resume point of a catch-up that ran out of pages before reaching the cursor."""
+
+    head: Cursor  # Newest trade of the gap; becomes the cursor once the gap is closed
+    next_page: int = 1
+    oldest_ts: float = 0.0  # Oldest trade ingested so far
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "head": self.head.to_dict(),
+            "next_page": self.next_page,
+            "oldest_ts": self.oldest_ts,
+        }
+
+
+@dataclass
+class SyncReport:
+    """Outcome of one SmartMoneyIngester.sync() call."""
+
+    pages: int = 0
+    fetched: int = 0
+    inserted: int = 0
+    caught_up: bool = False
+    pruned: int = 0
+    cursor: Cursor = field(default_factory=Cursor)
+    backfill: Backfill | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "pages": self.pages,
+            "fetched": self.fetched,
+            "inserted": self.inserted,
+            "caught_up": self.caught_up,
+            "pruned": self.pruned,
+            "cursor": self.cursor.to_dict(),
+            "backfill": self.backfill.to_dict() if self.backfill else None,
+        }
+
+
+class SmartMoneyStore:
+    """Append-only SQLite store of smart money trades plus the ingest cursor.
+
+    Rows are only ever inserted (duplicates ignored) or dropped by retention;
+    they are never updated. WAL mode lets the heartbeat and the oracle CLI
+    share the file. `version` counts appends that inserted trades.
+    """
+
+    def __init__(self, path: Path | None = None, busy_timeout: float = 5.0):
+        self.path = path or DEFAULT_PATH
+        self.busy_timeout = busy_timeout
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS trades (
+                    trade_id TEXT PRIMARY KEY,
+                    block_ts REAL NOT NULL,
+                    trader TEXT NOT NULL,
+                    token_bought TEXT NOT NULL,
+                    token_sold TEXT NOT NULL,
+                    token_bought_symbol TEXT,
+                    value_usd REAL NOT NULL,
+                    ingested_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades (block_ts)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cursor (
+                    stream TEXT PRIMARY KEY,
+                    block_ts REAL NOT NULL,
+                    trade_id TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS backfill (
+                    stream TEXT PRIMARY KEY,
+                    head_ts REAL NOT NULL,
+                    head_id TEXT NOT NULL,
+                    next_page INTEGER NOT NULL,
+                    oldest_ts REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def cursor(self, stream: str = "dex-trades") -> Cursor:
+        row = self._connect().execute(
+            "SELECT block_ts, trade_id FROM cursor WHERE stream = ?", (stream,)
+        ).fetchone()
+        return Cursor(*row) if row else Cursor()
+
+    def backfill(self, stream: str = "dex-trades") -> Backfill | None:
+        """Unfinished catch-up for `stream`, if any."""
+        row = self._connect().execute(
+            "SELECT head_ts, head_id, next_page, oldest_ts FROM backfill WHERE stream = ?",
+            (stream,),
+        ).fetchone()
+        return Backfill(Cursor(row[0], row[1]), row[2], row[3]) if row else None
+
+    def version(self) -> int:
+        row = self._connect().execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def append(
+        self,
+        trades: list[dict[str, Any]],
+        cursor: Cursor,
+        backfill: Backfill | None = None,
+        stream: str = "dex-trades",
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Insert unseen trades and move the ingest position in one transaction.
+
+        Without `backfill` the sync caught up: the cursor advances to `cursor`
+        and any backfill is cleared. With it, the cursor stays and the
+        backfill resume point is saved.
+
+        Returns:
+            (trades added, store version after this append)
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            inserted = []
+            for t in trades:
+                row = (
+                    t["trade_id"], t["block_ts"], t["trader"], t["token_bought"],
+                    t["token_sold"], t["token_bought_symbol"], t["value_usd"], now,
+                )
+                added = conn.execute(
+                    "INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row
+                ).rowcount
+                if added:
+                    inserted.append(t)
+            if backfill is None:
+                conn.execute(
+                    "INSERT INTO cursor VALUES (?, ?, ?) "
+                    "ON CONFLICT(stream) DO UPDATE SET "
+                    "block_ts = excluded.block_ts, trade_id = excluded.trade_id "
+                    "WHERE excluded.block_ts > cursor.block_ts "
+                    "OR (excluded.block_ts = cursor.block_ts "
+                    "AND excluded.trade_id > cursor.trade_id)",
+                    (stream, cursor.block_ts, cursor.trade_id),
+                )
+                conn.execute("DELETE FROM backfill WHERE stream = ?", (stream,))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO backfill VALUES (?, ?, ?, ?, ?)",
+                    (stream, backfill.head.block_ts, backfill.head.trade_id,
+                     backfill.next_page, backfill.oldest_ts),
+                )
+            if inserted:
+                conn.execute(
+                    "INSERT INTO meta VALUES ('version', 1) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+                )
+            version = conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return inserted, version[0] if version else 0
+
+    def buy_aggregates(self, since_ts: float) -> list[dict[str, Any]]:
+        """Per-mint SOL→token buys since `since_ts`: distinct wallets, USD, trade span."""
+        rows = self._connect().execute(
+            """
+            SELECT token_bought,
+                   (SELECT token_bought_symbol FROM trades s
+                    WHERE s.token_bought = t.token_bought ORDER BY block_ts DESC LIMIT 1),
+                   COUNT(DISTINCT trader), SUM(value_usd), COUNT(*), MIN(block_ts), MAX(block_ts)
+            FROM trades t
+            WHERE block_ts >= ? AND token_sold = ? AND token_bought != ?
+            GROUP BY token_bought
+            """,
+            (since_ts, SOL_MINT, SOL_MINT),
+        ).fetchall()
+        return [
+            {
+                "token_mint": mint,
+                "token_symbol": symbol or "UNKNOWN",
+                "wallet_count": wallets,
+                "total_buy_usd": round(total or 0.0, 2),
+                "trade_count": count,
+                "first_trade_ts": first_ts,
+                "last_trade_ts": last_ts,
+            }
+            for mint, symbol, wallets, total, count, first_ts, last_ts in rows
+        ]
+
+    def buys_since(self, since_ts: float) -> tuple[list[dict[str, Any]], int]:
+        """(buy trades since `since_ts` oldest first, store version they reflect).
+
+        Read in one snapshot, so the version matches the rows (rebuilds the
+        rolling window).
+        """
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            rows = conn.execute(
+                """
+                SELECT trade_id, block_ts, trader, token_bought, token_sold,
+                       token_bought_symbol, value_usd
+                FROM trades WHERE block_ts >= ? AND token_sold = ? AND token_bought != ?
+                ORDER BY block_ts
+                """,
+                (since_ts, SOL_MINT, SOL_MINT),
+            ).fetchall()
+            version = self.version()
+        finally:
+            conn.execute("COMMIT")
+        keys = (
+            "trade_id", "block_ts", "trader", "token_bought", "token_sold",
+            "token_bought_symbol", "value_usd",
+        )
+        return [dict(zip(keys, row)) for row in rows], version
+
+    def prune(self, before_ts: float) -> int:
+        """Drop trades older than `before_ts` (retention). The cursor is kept."""
+        cursor = self._connect().execute("DELETE FROM trades WHERE block_ts < ?", (before_ts,))
+        return cursor.rowcount
+
+    def stats(self) -> dict[str, Any]:
+        conn = self._connect()
+        count, oldest, newest = conn.execute(
+            "SELECT COUNT(*), MIN(block_ts), MAX(block_ts) FROM trades"
+        ).fetchone()
+        return {
+            "path": str(self.path),
+            "trades": count,
+            "oldest_ts": oldest,
+            "newest_ts": newest,
+            "cursor": self.cursor().to_dict(),
+            "backfill": backfill.to_dict() if (backfill := self.backfill()) else None,
+            "version": self.version(),
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class SmartMoneyIngester:
+    """Pages Nansen smart money DEX trades forward to the high-water mark.
+
+    Args:
+        store: Append-only trade store
+        per_page: Trades per Nansen page
+        max_pages: Page cap per sync (a longer outage is backfilled over several cycles)
+        window_minutes: Rolling window for signals
+        retention_hours: Trades older than this are pruned after each sync
+        window_path: Where the rolling-window aggregator is saved between runs;
+            None keeps it in memory (rebuilt from the store on first use)
+        distinct: Optional WindowAggregator sketch settings (sketch_precision,
+            exact_threshold, bucket_seconds) for approximate wallet counts
+    """
+
+    def __init__(
+        self,
+        store: SmartMoneyStore | None = None,
+        per_page: int = 25,
+        max_pages: int = 10,
+        window_minutes: float = 120,
+        retention_hours: float = 48,
+        window_path: Path | None = None,
+        distinct: dict[str, Any] | None = None,
+    ):
+        self.store = store or SmartMoneyStore()
+        self.per_page = per_page
+        self.max_pages = max_pages
+        self.window_minutes = window_minutes
+        self.retention_hours = retention_hours
+        self.window_path = window_path
+        self.distinct = distinct or {}
+        self._window: WindowAggregator | None = None
+
+    def window(self) -> WindowAggregator:
+        """The rolling-window aggregator matching the store: in memory, from disk, else rebuilt."""
+        version = self.store.version()
+        if self._window is None or self._window.stamp != version:
+            loaded = WindowAggregator.load(self.window_path) if self.window_path else None
+            if (
+                loaded is None
+                or loaded.stamp != version
+                or self._window_settings(loaded) != self._window_settings(None)
+            ):
+                loaded = self._rebuild_window()
+            self._window = loaded
+        self._window.expire(time.time())
+        return self._window
+
+    def _rebuild_window(self) -> WindowAggregator:
+        window_seconds = self.window_minutes * 60
+        window = WindowAggregator(window_seconds, **self.distinct)
+        trades, window.stamp = self.store.buys_since(time.time() - window_seconds)
+        for trade in trades:
+            self._add_to_window(window, trade)
+        return window
+
+    @classmethod
+    def from_config(cls) -> SmartMoneyIngester:
+        """Build from firehose.yaml nansen.ingest (relative paths are under the workspace)."""
+        settings = (load_firehose_config().get("nansen", {}) or {}).get("ingest", {}) or {}
+        path = Path(settings.get("path", DEFAULT_PATH))
+        window_path = Path(settings.get("window_path", DEFAULT_WINDOW_PATH))
+        distinct = settings.get("distinct", {}) or {}
+        sketch = None
+        if distinct.get("mode") == "sketch":
+            sketch = {
+                "sketch_precision": int(distinct.get("precision", 12)),
+                "exact_threshold": int(distinct.get("exact_threshold", 64)),
+                "bucket_seconds": float(distinct.get("bucket_minutes", 10)) * 60,
+            }
+        return cls(
+            store=SmartMoneyStore(path if path.is_absolute() else WORKSPACE / path),
+            window_path=window_path if window_path.is_absolute() else WORKSPACE / window_path,
+            per_page=int(settings.get("per_page", 25)),
+            max_pages=int(settings.get("max_pages", 10)),
+            window_minutes=float(settings.get("window_minutes", 120)),
+            retention_hours=float(settings.get("retention_hours", 48)),
+            distinct=sketch,
+        )
+
+    @staticmethod
+    def _normalise(tx: dict[str, Any], fallback_ts: float) -> dict[str, Any] | None:
+        trader = tx.get("trader_address", "")
+        if not trader:
+            return None
+        block_ts = _parse_timestamp(tx.get("block_timestamp"))
+        return {
+            "trade_id": trade_id(tx),
+            "block_ts": block_ts if block_ts is not None else fallback_ts,
+            "trader": trader,
+            "token_bought": tx.get("token_bought_address", ""),
+            "token_sold": tx.get("token_sold_address", ""),
+            "token_bought_symbol": tx.get("token_bought_symbol"),
+            "value_usd": float(tx.get("trade_value_usd") or 0.0),
+        }
+
+    def _window_settings(self, window: WindowAggregator | None) -> tuple[Any, ...]:
+        """Settings a saved window must match to be reused (else it is rebuilt)."""
+        if window is None:
+            window = WindowAggregator(self.window_minutes * 60, **self.distinct)
+        if window.sketch_precision is None:
+            return (window.window_seconds, None)
+        return (
+            window.window_seconds,
+            window.sketch_precision,
+            window.exact_threshold,
+            window.bucket_seconds,
+        )
+
+    @staticmethod
+    def _add_to_window(window: WindowAggregator, trade: dict[str, Any]) -> None:
+        if trade["token_sold"] == SOL_MINT and trade["token_bought"] not in ("", SOL_MINT):
+            window.insert(
+                trade["block_ts"], trade["token_bought"], trade["trader"],
+                trade["value_usd"], trade["token_bought_symbol"] or "UNKNOWN",
+            )
+
+    async def sync(self, nansen: Any) -> SyncReport:
+        """Fetch pages until the high-water mark, a short page or `max_pages`.
+
+        While a gap is open the head pages are read first (down to the
+        backfill's head), then paging resumes at the saved backfill page.
+        The cursor only advances once caught up; otherwise the resume point
+        is saved for the next call.
+        """
+        report = SyncReport()
+        start = self.store.cursor()
+        resume = self.store.backfill()
+        fetched_at = time.time()
+        horizon = fetched_at - self.retention_hours * 3600
+        newest = resume.head if resume else start
+        oldest_ts = float("inf")
+        budget = self.max_pages
+        new_trades: list[dict[str, Any]] = []
+        collected: set[str] = set()
+
+        async def read(first_page: int, floor: Cursor) -> tuple[int, bool]:
+            """Page from `first_page` down to `floor` or the horizon: (last page, reached)."""
+            nonlocal newest, oldest_ts, budget
+            page = first_page - 1
+            while budget > 0:
+                page += 1
+                budget -= 1
+                data = await nansen.get_smart_money_transactions(limit=self.per_page, page=page)
+                rows = data.get("data", []) if isinstance(data, dict) else []
+                if not isinstance(rows, list):
+                    rows = []
+                report.pages += 1
+                report.fetched += len(rows)
+
+                fresh = 0
+                reached = False
+                for tx in rows:
+                    trade = self._normalise(tx, fetched_at) if isinstance(tx, dict) else None
+                    if trade is None or trade["trade_id"] in collected:
+                        continue
+                    fresh += 1
+                    if trade["block_ts"] < horizon:
+                        reached = True
+                        continue
+                    if trade["block_ts"] <= floor.block_ts:
+                        reached = True
+                        # Same-second trades may still be new; the store drops repeats
+                        if trade["block_ts"] < floor.block_ts:
+                            continue
+                    collected.add(trade["trade_id"])
+                    new_trades.append(trade)
+                    newest = max(newest, Cursor(trade["block_ts"], trade["trade_id"]))
+                    oldest_ts = min(oldest_ts, trade["block_ts"])
+
+                # A short page is the end of the feed
+                if reached or len(rows) < self.per_page:
+                    return page, True
+                # A page of repeats means the feed is not moving: resume after it next time
+                if fresh == 0:
+                    break
+            return page, False
+
+        if resume is None:
+            last_page, report.caught_up = await read(1, start)
+        else:
+            last_page, at_head = await read(1, resume.head)
+            if at_head:
+                oldest_ts = min(oldest_ts, resume.oldest_ts)
+                last_page, report.caught_up = await read(resume.next_page, start)
+            # Otherwise the head outran the page cap again: restart the gap from here
+
+        if not report.caught_up:
+            if oldest_ts == float("inf"):
+                oldest_ts = newest.block_ts
+            report.backfill = Backfill(newest, last_page + 1, oldest_ts)
+        window = self.window()
+        added, version = self.store.append(new_trades, newest, report.backfill)
+        report.inserted = len(added)
+        if resume is not None or version != window.stamp + (1 if added else 0):
+            # Backfilled trades predate the window's newest events, and another
+            # process may have appended since the window was loaded
+            window = self._window = self._rebuild_window()
+        else:
+            for trade in sorted(added, key=lambda t: t["block_ts"]):
+                self._add_to_window(window, trade)
+            window.stamp = version
+        window.expire(time.time())
+        if self.window_path:
+            window.save(self.window_path)
+        report.pruned = self.store.prune(time.time() - self.retention_hours * 3600)
+        report.cursor = self.store.cursor()
+        return report
+
+    def aggregates(self, window_minutes: float | None = None) -> list[dict[str, Any]]:
+        """Per-mint buy aggregates over the rolling window, most wallets first.
+
+        The configured window is served from the incremental aggregator; any
+        other window is computed from the store.
+        """
+        if window_minutes is None or window_minutes == self.window_minutes:
+            window = self.window()
+            window.expire(time.time())
+            return [_aggregate_row(row) for row in window.snapshot()]
+        rows = self.store.buy_aggregates(time.time() - window_minutes * 60)
+        rows.sort(key=lambda r: (r["wallet_count"], r["total_buy_usd"]), reverse=True)
+        return rows
+
+    def signals(
+        self, window_minutes: float | None = None, min_wallets: int = MIN_SIGNAL_WALLETS
+    ) -> list[dict[str, Any]]:
+        """Oracle signals (same shape as window_signals)."""
+        return [
+            {
+                "token_mint": row["token_mint"],
+                "token_symbol": row["token_symbol"],
+                "wallet_count": row["wallet_count"],
+                "total_buy_usd": row["total_buy_usd"],
+            }
+            for row in self.aggregates(window_minutes)
+            if row["wallet_count"] >= min_wallets
+        ]
+
+
+async def _sync_once() -> dict[str, Any]:
+    from lib.clients.nansen import NansenClient
+    from lib.clients.pool import with_client_pool
+
+    ingester = SmartMoneyIngester.from_config()
+    report = await with_client_pool(ingester.sync(NansenClient()))
+    return {"status": "OK", **report.to_dict(), "signals": ingester.signals()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Incremental smart money ingestion (Nansen DEX trades)"
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "--sync", action="store_true", help="Fetch new trades up to the high-water mark"
+    )
+    group.add_argument("--signals", action="store_true", help="Print signals from the local store")
+    group.add_argument("--stats", action="store_true", help="Print store statistics")
+    parser.add_argument("--window", type=float, help="Signal window in minutes (default: config)")
+    args = parser.parse_args()
+
+    try:
+        if args.sync:
+            result = asyncio.run(_sync_once())
+        elif args.signals:
+            ingester = SmartMoneyIngester.from_config()
+            result = {"status": "OK", "signals": ingester.signals(args.window)}
+        else:
+            result = {"status": "OK", **SmartMoneyIngester.from_config().store.stats()}
+    except Exception as e:
+        result = {"status": "ERROR", "error": str(e)}
+
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["status"] == "OK" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ from __future__ import annotations
 import asyncio
 from typing import Any, Callable, TypeVar, Sequence
 
+from lib.utils.deadline import check_deadline, time_left
+
 
 T = TypeVar('T')
 R = TypeVar('R')
@@ -14,6 +16,7 @@ async def batch_gather(
     async_fn: Callable[[T], Any],
     max_concurrent: int = 5,
     continue_on_error: bool = True,
+    timeout: float | None = None,
 ) -> list[R | None]:
     """Execute async function on items with concurrency limit.
     
@@ -22,21 +25,35 @@ async def batch_gather(
         async_fn: Async function to call on each item
         max_concurrent: Max concurrent operations
         continue_on_error: If True, errors return None; if False, propagate
+        timeout: Per-item deadline in seconds from batch start, including time
+            spent queued behind the concurrency limit. Late items return None
+            (or raise asyncio.TimeoutError if continue_on_error=False). Also
+            capped by the context deadline (lib.utils.deadline).
     
     Returns:
-        List of results (None for failed items if continue_on_error=True)
+        List of results (None for failed or late items if continue_on_error=True)
     """
     semaphore = asyncio.Semaphore(max_concurrent)
+    left = time_left()
+    if left is not None:
+        timeout = left if timeout is None else min(timeout, left)
     
-    async def bounded_call(item: T) -> R | None:
+    async def limited_call(item: T) -> R | None:
         async with semaphore:
-            try:
-                return await async_fn(item)
-            except Exception as e:
-                if not continue_on_error:
-                    raise
-                # Log error silently and return None
-                return None
+            # Items still queued when the deadline passes are not started
+            check_deadline("batch item")
+            return await async_fn(item)
+
+    async def bounded_call(item: T) -> R | None:
+        try:
+            if timeout is None:
+                return await limited_call(item)
+            return await asyncio.wait_for(limited_call(item), timeout=max(timeout, 0))
+        except Exception:
+            if not continue_on_error:
+                raise
+            # Log error silently and return None
+            return None
     
     return await asyncio.gather(*[bounded_call(item) for item in items])
 
@@ -46,16 +63,39 @@ async def batch_price_fetch(
     mints: list[str],
     max_concurrent: int = 3,
 ) -> dict[str, dict[str, Any]]:
-    """Fetch prices for multiple tokens in parallel.
+    """Fetch prices for multiple tokens.
+
+    One Birdeye multi-price request covers up to 100 mints. Mints it does not
+    return (or returns without liquidity) fall back to per-mint
+    get_token_overview calls in parallel.
     
     Args:
         birdeye_client: BirdeyeClient instance
         mints: List of token mint addresses
-        max_concurrent: Max concurrent API calls
+        max_concurrent: Max concurrent per-mint fallback calls
     
     Returns:
-        Dict mapping mint -> price data (empty dict on failure)
+        Dict mapping mint -> price data ({"data": {"price", "liquidity", ...}}),
+        an empty dict on failure
     """
+    results: dict[str, dict[str, Any]] = {}
+    try:
+        multi = await birdeye_client.get_multi_price(mints)
+    except Exception:
+        multi = {}
+    for mint in mints:
+        item = multi.get(mint)
+        # The watchdog's liquidity-drop exit needs liquidity; without it use the overview
+        if isinstance(item, dict) and item.get("liquidity") is not None:
+            results[mint] = {
+                "data": {
+                    "price": item["value"],
+                    "liquidity": item["liquidity"],
+                    "updateUnixTime": item.get("updateUnixTime"),
+                    "priceChange24h": item.get("priceChange24h"),
+                }
+            }
+
     async def fetch_one(mint: str) -> tuple[str, dict[str, Any]]:
         try:
             result = await birdeye_client.get_token_overview(mint)
@@ -63,5 +103,7 @@ async def batch_price_fetch(
         except Exception:
             return (mint, {})
     
-    results = await batch_gather(mints, fetch_one, max_concurrent=max_concurrent)
-    return {mint: data for mint, data in results if data is not None}
+    missing = [mint for mint in dict.fromkeys(mints) if mint not in results]
+    fallback = await batch_gather(missing, fetch_one, max_concurrent=max_concurrent)
+    results.update(entry for entry in fallback if entry is not None)
+    return results
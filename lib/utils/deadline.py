@@ -0,0 +1,83 @@
+"""Cycle deadline carried in a context variable.
+
+run_heartbeat opens a deadline scope for its time budget (and each step a
+nested, tighter one); every coroutine and task started inside it (step
+graph, batch_gather workers, BaseClient / RPCFallbackClient calls) sees the
+same absolute deadline without it being passed around. Per-request
+timeouts shrink to what is left, and work that would start too late fails
+fast with DeadlineExceededError instead of racing an outer wait_for.
+
+Usage:
+    with deadline_scope(120):
+        ...
+        left = time_left()  # Seconds until the innermost deadline, or None
+        check_deadline("GET /defi/price")  # Raises DeadlineExceededError if spent
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable, Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """The context deadline left too little time to start (or retry) an operation.
+
+    A TimeoutError, so existing `except asyncio.TimeoutError` handling treats
+    it as a timeout; never retried.
+    """
+
+    retryable = False
+
+
+def time_left() -> float | None:
+    """Seconds until the current deadline (may be negative), or None if unbounded."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Generator[None, None, None]:
+    """Bound everything inside to `seconds` from now. Nested scopes can only shrink it."""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def check_deadline(what: str = "operation", min_seconds: float = 0.0) -> None:
+    """Raise DeadlineExceededError unless more than `min_seconds` remain."""
+    left = time_left()
+    if left is not None and left <= min_seconds:
+        raise DeadlineExceededError(f"{what}: deadline exceeded ({left:.2f}s left)")
+
+
+def bounded_timeout(timeout: float, what: str = "operation") -> float:
+    """`timeout`, shrunk to the time left before the deadline (raises if none is left)."""
+    left = time_left()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceededError(f"{what}: deadline exceeded ({left:.2f}s left)")
+    return min(timeout, left)
+
+
+async def within_deadline(seconds: float | None, awaitable: Awaitable[T]) -> T:  # noqa: UP047
+    """Await inside a deadline scope (no scope if seconds is None). For CLI entry points."""
+    if seconds is None:
+        return await awaitable
+    with deadline_scope(seconds):
+        return await awaitable
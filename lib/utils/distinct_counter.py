@@ -0,0 +1,159 @@
+"""Distinct counting: exact for small sets, HyperLogLog above a threshold.
+
+Oracle gating is "3+ distinct wallets", so small counts must be exact, but
+keeping a set of every trader address for thousands of busy mints is
+memory-heavy. DistinctCounter stores 64-bit hashes exactly until it holds
+`exact_threshold` of them, then folds them into a HyperLogLog sketch of
+2**precision one-byte registers (standard error ≈ 1.04 / sqrt(2**precision),
+~1.6% at the default precision 12, in 4 KiB).
+
+Counters merge (union) losslessly: two exact counters stay exact while the
+union is under the threshold, and sketches merge register-wise. That lets a
+sliding window keep one counter per time bucket and union the live ones.
+
+Usage:
+    counter = DistinctCounter(exact_threshold=64, precision=12)
+    counter.add("wallet1")
+    counter.count()
+    merged = DistinctCounter.union([bucket_a, bucket_b])
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import math
+from collections.abc import Iterable
+from typing import Any
+
+HASH_BITS = 64
+
+
+def hash64(item: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """HyperLogLog sketch over 64-bit hashes (no large-range correction needed)."""
+
+    def __init__(self, precision: int = 12, registers: bytearray | None = None):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"precision must be in [4, 16], got {precision}")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.m)
+
+    def add_hash(self, h: int) -> None:
+        idx = h >> (HASH_BITS - self.precision)
+        rest_bits = HASH_BITS - self.precision
+        rest = h & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1  # leading zeros + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def count(self) -> int:
+        m = self.m
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return int(round(estimate))
+
+    def merge(self, other: HyperLogLog) -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def copy(self) -> HyperLogLog:
+        return HyperLogLog(self.precision, bytearray(self.registers))
+
+
+class DistinctCounter:
+    """Exact distinct count below `exact_threshold`, HyperLogLog estimate above it.
+
+    Args:
+        exact_threshold: Hashes kept exactly before switching to the sketch
+        precision: HLL precision p (2**p registers)
+    """
+
+    def __init__(self, exact_threshold: int = 64, precision: int = 12):
+        self.exact_threshold = exact_threshold
+        self.precision = precision
+        self._exact: set[int] | None = set()
+        self._sketch: HyperLogLog | None = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self._sketch is None
+
+    def _add_hash(self, h: int) -> None:
+        if self._sketch is not None:
+            self._sketch.add_hash(h)
+            return
+        assert self._exact is not None
+        self._exact.add(h)
+        if len(self._exact) > self.exact_threshold:
+            self._sketch = HyperLogLog(self.precision)
+            for held in self._exact:
+                self._sketch.add_hash(held)
+            self._exact = None
+
+    def add(self, item: str) -> None:
+        self._add_hash(hash64(item))
+
+    def count(self) -> int:
+        if self._sketch is not None:
+            return self._sketch.count()
+        assert self._exact is not None
+        return len(self._exact)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def update(self, other: DistinctCounter) -> None:
+        """Union `other` into this counter."""
+        if other._sketch is None:
+            assert other._exact is not None
+            for h in other._exact:
+                self._add_hash(h)
+            return
+        if self._sketch is None:
+            assert self._exact is not None
+            held, self._exact = self._exact, None
+            self._sketch = other._sketch.copy()
+            for h in held:
+                self._sketch.add_hash(h)
+        else:
+            self._sketch.merge(other._sketch)
+
+    @classmethod
+    def union(cls, counters: Iterable[DistinctCounter]) -> DistinctCounter:
+        """New counter holding the union (settings taken from the first counter)."""
+        merged: DistinctCounter | None = None
+        for counter in counters:
+            if merged is None:
+                merged = cls(counter.exact_threshold, counter.precision)
+            merged.update(counter)
+        return merged if merged is not None else cls()
+
+    def to_dict(self) -> dict[str, Any]:
+        if self._sketch is not None:
+            registers = base64.b64encode(bytes(self._sketch.registers)).decode()
+            return {"hll": registers, "p": self.precision}
+        assert self._exact is not None
+        return {"exact": sorted(self._exact)}
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], exact_threshold: int = 64, precision: int = 12
+    ) -> DistinctCounter:
+        counter = cls(exact_threshold, data.get("p", precision))
+        if "hll" in data:
+            counter._exact = None
+            registers = bytearray(base64.b64decode(data["hll"]))
+            counter._sketch = HyperLogLog(counter.precision, registers)
+        else:
+            for h in data.get("exact", []):
+                counter._add_hash(int(h))
+        return counter
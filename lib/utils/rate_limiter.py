@@ -1,67 +1,253 @@
-"""Smart rate limiter for API calls with per-provider tracking."""
+"""Async token-bucket rate limiting, shared per provider.
+
+Every BaseClient with the same provider_name draws from one TokenBucket, so
+the per-call BirdeyeClient built by check_token() and the heartbeat's own
+client share a single 5 req/s budget.
+
+Tokens are *reserved* synchronously before any await: N concurrent callers
+get N distinct slots (FIFO in call order) instead of all seeing the same
+deficit, sleeping the same amount and bursting together.
+
+SharedTokenBucket keeps the bucket state in a file-locked JSON store under
+state/ instead, so separate processes (skill CLIs launched in parallel by
+the agent, the heartbeat) draw from one budget per provider.
+"""
 from __future__ import annotations
 
 import asyncio
+import json
+import os
 import time
-from collections import defaultdict
-from typing import Any, Callable, TypeVar
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
 
+from lib.utils.deadline import DeadlineExceededError
+from lib.utils.file_lock import exclusive_file_lock
 
-F = TypeVar('F', bound=Callable[..., Any])
 
+class TokenBucket:
+    """Token bucket with FIFO reservations, burst capacity and provider pauses.
 
-class RateLimiter:
-    """Per-provider rate limiter with sliding window tracking.
-    
-    Prevents hitting API rate limits by tracking call timestamps
-    and enforcing minimum delay between calls.
+    Args:
+        rate: Sustained requests per second
+        burst: Bucket capacity (requests allowed back-to-back); defaults to max(1, rate)
     """
-    
-    def __init__(self):
-        # provider_name -> list of timestamps
-        self._call_history: dict[str, list[float]] = defaultdict(list)
-        self._locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
-    
-    async def wait_if_needed(self, provider: str, min_interval_sec: float) -> None:
-        """Wait if needed to respect minimum interval between calls.
-        
-        Args:
-            provider: Provider name (e.g., 'x_api', 'birdeye')
-            min_interval_sec: Minimum seconds between calls
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self.acquired = 0
+        self.total_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens now (possibly going into debt). Returns seconds until the slot is usable."""
+        now = self._clock()
+        self._refill(now)
+        self._tokens -= tokens
+        ready_at = self._updated + max(0.0, -self._tokens) / self.rate
+        return max(0.0, ready_at - now)
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Return an unused reservation (e.g. the waiter was cancelled)."""
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Pause the whole bucket (e.g. on 429 Retry-After).
+
+        No tokens refill until the pause ends and at most one request is
+        released when it lifts, so queued callers are spaced out afterwards
+        rather than bursting.
+        """
+        now = self._clock()
+        until = now + max(0.0, seconds)
+        if until <= self._paused_until:
+            return
+        self._refill(now)
+        self._tokens = min(self._tokens, 1.0)
+        self._paused_until = until
+        self._updated = max(self._updated, until)
+
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - self._clock())
+
+    async def acquire(self, tokens: float = 1.0, max_wait: float | None = None) -> float:
+        """Wait for a slot. Returns the total seconds waited.
+
+        Raises:
+            DeadlineExceededError: if the slot (or a provider pause) is further away
+                than `max_wait`; the reservation is returned first.
         """
-        async with self._locks[provider]:
-            now = time.time()
-            history = self._call_history[provider]
-            
-            # Clean old entries (keep last 1 hour)
-            cutoff = now - 3600
-            self._call_history[provider] = [t for t in history if t > cutoff]
-            
-            # Check if we need to wait
-            if self._call_history[provider]:
-                last_call = self._call_history[provider][-1]
-                time_since = now - last_call
-                
-                if time_since < min_interval_sec:
-                    wait_time = min_interval_sec - time_since
-                    await asyncio.sleep(wait_time)
-                    now = time.time()
-            
-            # Record this call
-            self._call_history[provider].append(now)
-    
-    def get_call_count(self, provider: str, window_sec: float = 60.0) -> int:
-        """Get number of calls made in the last N seconds."""
-        now = time.time()
-        cutoff = now - window_sec
-        history = self._call_history.get(provider, [])
-        return len([t for t in history if t > cutoff])
-
-
-# Global rate limiter instance
-_rate_limiter = RateLimiter()
-
-
-def get_rate_limiter() -> RateLimiter:
-    """Get the global rate limiter instance."""
+        waited = 0.0
+        delay = self.reserve(tokens)
+        if max_wait is not None and max(delay, self.paused_for()) > max_wait:
+            self.refund(tokens)
+            raise DeadlineExceededError(f"rate limit slot in {delay:.2f}s, {max_wait:.2f}s left")
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+                waited += delay
+            # A pause issued while we slept applies to us too
+            while (remaining := self.paused_for()) > 0:
+                await asyncio.sleep(remaining)
+                waited += remaining
+        except asyncio.CancelledError:
+            self.refund(tokens)
+            raise
+        self.acquired += 1
+        self.total_wait += waited
+        return waited
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.capacity,
+            "acquired": self.acquired,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "paused_for_seconds": round(self.paused_for(), 3),
+        }
+
+
+class SharedTokenBucket(TokenBucket):
+    """TokenBucket whose state lives in a file shared by every process on the box.
+
+    Each operation loads the provider's entry, applies the in-memory bucket
+    logic and writes it back, all under an exclusive flock. The critical
+    section is a few hundred microseconds, so it is held synchronously.
+    Wall-clock time is used because monotonic clocks are not comparable
+    across processes.
+
+    Args:
+        provider: Key in the store
+        rate: Sustained requests per second (every process should agree)
+        burst: Bucket capacity; defaults to max(1, rate)
+        path: JSON store, e.g. state/rate_limits.json
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        rate: float,
+        path: Path,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(rate, burst, clock)
+        self.provider = provider
+        self.path = path
+
+    def _read_store(self) -> dict[str, Any]:
+        try:
+            return json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return {}  # Missing or torn file: start from a full bucket
+
+    @contextmanager
+    def _synced(self, write: bool = True) -> Generator[None, None, None]:
+        with exclusive_file_lock(self.path):
+            store = self._read_store()
+            entry = store.get(self.provider)
+            if isinstance(entry, dict):
+                self._tokens = min(self.capacity, float(entry.get("tokens", self.capacity)))
+                self._updated = float(entry.get("updated", self._clock()))
+                self._paused_until = float(entry.get("paused_until", 0.0))
+            else:
+                self._tokens, self._updated, self._paused_until = self.capacity, self._clock(), 0.0
+            yield
+            if write:
+                store[self.provider] = {
+                    "tokens": self._tokens,
+                    "updated": self._updated,
+                    "paused_until": self._paused_until,
+                }
+                tmp_path = self.path.with_suffix(f"{self.path.suffix}.{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(store))
+                tmp_path.replace(self.path)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        with self._synced():
+            return super().reserve(tokens)
+
+    def refund(self, tokens: float = 1.0) -> None:
+        with self._synced():
+            super().refund(tokens)
+
+    def pause(self, seconds: float) -> None:
+        with self._synced():
+            super().pause(seconds)
+
+    def paused_for(self) -> float:
+        with self._synced(write=False):
+            return super().paused_for()
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "backend": "shared", "path": str(self.path)}
+
+
+class RateLimiterRegistry:
+    """Process-wide TokenBuckets keyed by provider name."""
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def get(
+        self,
+        provider: str,
+        rate: float,
+        burst: float | None = None,
+        shared_path: Path | None = None,
+    ) -> TokenBucket:
+        """Return the provider's bucket. The first registration sets its rate and backend.
+
+        With shared_path the bucket is a SharedTokenBucket backed by that
+        file, so the budget is also shared with other processes.
+        """
+        bucket = self._buckets.get(provider)
+        if bucket is None:
+            if shared_path is not None:
+                bucket = SharedTokenBucket(provider, rate, shared_path, burst)
+            else:
+                bucket = TokenBucket(rate, burst)
+            self._buckets[provider] = bucket
+        return bucket
+
+    async def wait_if_needed(self, provider: str, min_interval_sec: float) -> None:
+        """Interval-style API: at most one call per `min_interval_sec` for this provider."""
+        await self.get(provider, 1.0 / min_interval_sec, burst=1.0).acquire()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {provider: bucket.stats() for provider, bucket in self._buckets.items()}
+
+
+# Global rate limiter registry
+_rate_limiter = RateLimiterRegistry()
+
+
+def get_rate_limiter() -> RateLimiterRegistry:
+    """Get the global rate limiter registry."""
     return _rate_limiter
+
+
+def get_provider_limiter(
+    provider: str,
+    rate: float,
+    burst: float | None = None,
+    shared_path: Path | None = None,
+) -> TokenBucket:
+    """Shared TokenBucket for a provider (cross-process if shared_path is given)."""
+    return _rate_limiter.get(provider, rate, burst, shared_path)
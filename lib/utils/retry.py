@@ -1,43 +1,174 @@
-"""Retry and backoff utilities for external API calls."""
+"""Retry engine for external API calls — one layer, deadline-aware.
+
+BaseClient runs every request through retry_call(), so provider wrappers
+(Birdeye, Nansen, X) no longer stack a second retry layer on top. The engine
+reads the caller's remaining budget from lib.utils.deadline and never
+schedules a retry whose backoff plus expected attempt time would overrun it.
+Each call is reported (attempts, time spent, time slept) to a RetryStats.
+"""
 from __future__ import annotations
 
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from functools import wraps
-from typing import Any, Callable, TypeVar
+from typing import Any, TypeVar
 
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-import aiohttp
+import httpx
 
+from lib.utils.deadline import DeadlineExceededError, time_left
 
-# Type variable for decorated functions
+T = TypeVar('T')
 F = TypeVar('F', bound=Callable[..., Any])
 
 
-def with_retry(func: F) -> F:
-    """Decorator for async functions that call external APIs.
-    
-    Retries on network errors with exponential backoff.
-    - 3 attempts max
-    - 1s initial wait, 10s max wait
-    - Only retries on aiohttp errors (not on 4xx HTTP codes)
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Attempt limit and exponential backoff between attempts."""
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+
+    def backoff(self, retry_number: int) -> float:
+        """Sleep before retry `retry_number` (1-based)."""
+        return min(self.base_delay * self.multiplier ** (retry_number - 1), self.max_delay)
+
+
+@dataclass
+class CallReport:
+    """Outcome of one retried call: ok, error, or deadline (gave up early)."""
+
+    label: str
+    attempts: int
+    elapsed_seconds: float
+    slept_seconds: float
+    outcome: str
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "label": self.label,
+            "attempts": self.attempts,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "slept_seconds": round(self.slept_seconds, 3),
+            "outcome": self.outcome,
+        }
+
+
+class RetryStats:
+    """Aggregate retry counters plus the most recent call reports."""
+
+    def __init__(self, keep_recent: int = 20) -> None:
+        self.calls = 0
+        self.attempts = 0
+        self.failures = 0
+        self.deadline_giveups = 0
+        self.slept_seconds = 0.0
+        self.recent: deque[CallReport] = deque(maxlen=keep_recent)
+
+    def record(self, report: CallReport) -> None:
+        self.calls += 1
+        self.attempts += report.attempts
+        self.slept_seconds += report.slept_seconds
+        if report.outcome == "error":
+            self.failures += 1
+        elif report.outcome == "deadline":
+            self.deadline_giveups += 1
+        self.recent.append(report)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.attempts - self.calls,
+            "failures": self.failures,
+            "deadline_giveups": self.deadline_giveups,
+            "slept_seconds": round(self.slept_seconds, 3),
+            "recent": [report.to_dict() for report in self.recent if report.attempts > 1],
+        }
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """APIError-style exceptions say so themselves; otherwise transient transport errors."""
+    flag = getattr(exc, "retryable", None)
+    if flag is not None:
+        return bool(flag)
+    return isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+async def retry_call(  # noqa: UP047
+    fn: Callable[[], Awaitable[T]],
+    policy: RetryPolicy = RetryPolicy(),
+    label: str = "",
+    stats: RetryStats | None = None,
+    retryable: Callable[[BaseException], bool] = is_retryable,
+    delay_hint: Callable[[BaseException], float | None] | None = None,
+) -> T:
+    """Await fn() with retries.
+
+    Args:
+        fn: Zero-argument coroutine factory, called once per attempt
+        policy: Attempt limit and backoff
+        label: Name used in the call report (e.g. "GET /defi/price")
+        stats: Where to record the call report
+        retryable: Which exceptions may be retried
+        delay_hint: Overrides the backoff for an exception (e.g. a provider
+            pause after 429 Retry-After); None keeps the policy backoff
+
+    Raises:
+        The last exception once attempts run out or the error is not retryable.
+        DeadlineExceededError (chained to the last error) if the next retry could
+        not finish before the context deadline.
+    """
+    start = time.monotonic()
+    slept = 0.0
+    attempt = 0
+
+    def report(outcome: str) -> None:
+        if stats is not None:
+            stats.record(CallReport(label, attempt, time.monotonic() - start, slept, outcome))
+
+    while True:
+        attempt += 1
+        attempt_start = time.monotonic()
+        try:
+            result = await fn()
+        except DeadlineExceededError:
+            report("deadline")
+            raise
+        except Exception as e:
+            if not retryable(e) or attempt >= policy.max_attempts:
+                report("error")
+                raise
+            hint = delay_hint(e) if delay_hint is not None else None
+            delay = hint if hint is not None else policy.backoff(attempt)
+            # The next attempt is expected to take about as long as this one did
+            remaining = time_left()
+            if remaining is not None and delay + (time.monotonic() - attempt_start) > remaining:
+                report("deadline")
+                raise DeadlineExceededError(
+                    f"{label or 'call'}: no time to retry after attempt {attempt} "
+                    f"({remaining:.2f}s left): {e}"
+                ) from e
+            await asyncio.sleep(delay)
+            slept += delay
+            continue
+        report("ok")
+        return result
+
+
+def with_retry(func: F) -> F:  # noqa: UP047
+    """Decorator for async functions that call external APIs directly (not via BaseClient).
+
+    Same engine as BaseClient: 3 attempts, 1s initial wait, 10s max wait,
+    retries transient transport errors only, and respects the context deadline.
+    BaseClient already retries, so do not stack this on client methods.
     """
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((
-            aiohttp.ClientError,
-            aiohttp.ClientConnectionError,
-            ConnectionError,
-            TimeoutError,
-        )),
-        reraise=True,
-    )
     @wraps(func)
     async def wrapper(*args: Any, **kwargs: Any) -> Any:
-        return await func(*args, **kwargs)
-    
+        return await retry_call(lambda: func(*args, **kwargs), label=func.__qualname__)
+
     return wrapper  # type: ignore
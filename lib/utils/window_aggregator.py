@@ -0,0 +1,249 @@
+"""Sliding-window per-key aggregates with O(1) insert and expire.
+
+Oracle signals are "distinct wallets buying a mint within the last N minutes,
+with total USD and first/last seen". Rebuilding dicts of sets from the raw
+trade list on every call is O(history); WindowAggregator keeps the answer
+up to date incrementally instead:
+
+- events sit in one time-ordered deque, so expiry pops from the left;
+- each key keeps a member → event-count map (distinct = len), a running
+  USD total and the timestamps of its live events;
+- members (wallet addresses) are interned to small ints, so a wallet
+  buying twenty mints is stored once.
+
+Insert and expire are amortized O(1). Events are expected in roughly
+time order; one older than the newest event is still accepted and expires
+once everything before it has.
+
+For very busy keys, `sketch_precision` switches distinct counting to
+DistinctCounter (exact below `exact_threshold`, HyperLogLog above) kept per
+`bucket_seconds` time bucket and unioned across live buckets. Wallets are
+then not stored at all; a bucket expires once it lies wholly before the
+window, so distinct counts have bucket granularity.
+
+Usage:
+    agg = WindowAggregator(window_seconds=3600)
+    agg.insert(ts, mint, wallet, value_usd, label="BOAR")
+    agg.expire(time.time())
+    agg.snapshot(min_members=3)
+    agg.save(Path("state/smart_money_window.json"))
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from lib.utils.distinct_counter import DistinctCounter
+
+
+@dataclass
+class KeyAggregate:
+    """Live aggregate for one key (mint)."""
+
+    label: str = ""
+    members: dict[int, int] = field(default_factory=dict)  # member id → live events
+    total_value: float = 0.0
+    timestamps: deque[float] = field(default_factory=deque)
+    last_seen: float = 0.0
+    buckets: dict[int, DistinctCounter] = field(default_factory=dict)  # sketch mode only
+
+    @property
+    def distinct(self) -> int:
+        if self.buckets:
+            return DistinctCounter.union(self.buckets.values()).count()
+        return len(self.members)
+
+    @property
+    def first_seen(self) -> float:
+        return self.timestamps[0] if self.timestamps else 0.0
+
+
+class WindowAggregator:
+    """Distinct members, value sum and first/last seen per key over a time window.
+
+    Args:
+        window_seconds: Events older than the newest expire() time minus this
+            are dropped; math.inf keeps everything (one-shot parsing)
+        sketch_precision: Count distinct members with per-bucket
+            DistinctCounters of this HLL precision instead of exact maps
+        exact_threshold: Distinct members a bucket counts exactly before sketching
+        bucket_seconds: Time-bucket width for sketch mode
+
+    `stamp` is an opaque marker of the source state the aggregates reflect
+    (e.g. a store version); it is saved and loaded with them.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = math.inf,
+        sketch_precision: int | None = None,
+        exact_threshold: int = 64,
+        bucket_seconds: float = 600.0,
+    ):
+        self.window_seconds = window_seconds
+        self.sketch_precision = sketch_precision
+        self.exact_threshold = exact_threshold
+        self.bucket_seconds = bucket_seconds
+        self._events: deque[tuple[float, str, int, float]] = deque()
+        self._keys: dict[str, KeyAggregate] = {}
+        self._member_ids: dict[str, int] = {}
+        self._members: list[str] = []
+        self.stamp: Any = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _intern(self, member: str) -> int:
+        member_id = self._member_ids.get(member)
+        if member_id is None:
+            member_id = self._member_ids[member] = len(self._members)
+            self._members.append(member)
+        return member_id
+
+    def insert(
+        self, ts: float, key: str, member: str | None, value: float = 0.0, label: str | None = None
+    ) -> None:
+        """Add one event. member=None counts value and time only (restoring sketch mode)."""
+        sketching = self.sketch_precision is not None
+        member_id = self._intern(member) if member is not None and not sketching else -1
+        self._events.append((ts, key, member_id, value))
+        agg = self._keys.get(key)
+        if agg is None:
+            agg = self._keys[key] = KeyAggregate(label=label or "")
+        elif label:
+            agg.label = label
+        if sketching and member is not None:
+            bucket = int(ts // self.bucket_seconds)
+            counter = agg.buckets.get(bucket)
+            if counter is None:
+                counter = DistinctCounter(self.exact_threshold, self.sketch_precision)
+                agg.buckets[bucket] = counter
+            counter.add(member)
+        elif member_id >= 0:
+            agg.members[member_id] = agg.members.get(member_id, 0) + 1
+        agg.total_value += value
+        agg.timestamps.append(ts)
+        agg.last_seen = max(agg.last_seen, ts)
+
+    def expire(self, now: float) -> int:
+        """Drop events older than `now - window_seconds`. Returns how many expired."""
+        cutoff = now - self.window_seconds
+        expired = 0
+        touched: set[str] = set()
+        while self._events and self._events[0][0] < cutoff:
+            _ts, key, member_id, value = self._events.popleft()
+            agg = self._keys[key]
+            if member_id >= 0:
+                remaining = agg.members[member_id] - 1
+                if remaining:
+                    agg.members[member_id] = remaining
+                else:
+                    del agg.members[member_id]
+            agg.total_value -= value
+            agg.timestamps.popleft()
+            if agg.timestamps:
+                touched.add(key)
+            else:
+                del self._keys[key]
+                touched.discard(key)
+            expired += 1
+        for key in touched:
+            buckets = self._keys[key].buckets
+            for bucket in [b for b in buckets if (b + 1) * self.bucket_seconds <= cutoff]:
+                del buckets[bucket]
+        return expired
+
+    def get(self, key: str) -> KeyAggregate | None:
+        return self._keys.get(key)
+
+    def snapshot(self, min_members: int = 1) -> list[dict[str, Any]]:
+        """Aggregates with at least `min_members` distinct members, most members first."""
+        rows = [
+            {
+                "key": key,
+                "label": agg.label,
+                "distinct": agg.distinct,
+                "total_value": round(agg.total_value, 2),
+                "events": len(agg.timestamps),
+                "first_seen": agg.first_seen,
+                "last_seen": agg.last_seen,
+            }
+            for key, agg in self._keys.items()
+            if agg.distinct >= min_members
+        ]
+        rows.sort(key=lambda r: (r["distinct"], r["total_value"]), reverse=True)
+        return rows
+
+    def to_dict(self) -> dict[str, Any]:
+        """Compact form: members once, events as [ts, key index, member id, value]."""
+        keys = list(self._keys)
+        key_index = {key: i for i, key in enumerate(keys)}
+        # Only members with live events are written, renumbered densely
+        member_index: dict[int, int] = {}
+        events = []
+        for ts, key, member_id, value in self._events:
+            idx = member_index.setdefault(member_id, len(member_index)) if member_id >= 0 else -1
+            events.append([ts, key_index[key], idx, value])
+        data: dict[str, Any] = {
+            "window_seconds": None if math.isinf(self.window_seconds) else self.window_seconds,
+            "members": [self._members[member_id] for member_id in member_index],
+            "keys": keys,
+            "labels": [self._keys[key].label for key in keys],
+            "events": events,
+        }
+        if self.stamp is not None:
+            data["stamp"] = self.stamp
+        if self.sketch_precision is not None:
+            data["sketch"] = {
+                "precision": self.sketch_precision,
+                "exact_threshold": self.exact_threshold,
+                "bucket_seconds": self.bucket_seconds,
+                "buckets": [
+                    {str(b): counter.to_dict() for b, counter in self._keys[key].buckets.items()}
+                    for key in keys
+                ],
+            }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> WindowAggregator:
+        window = data.get("window_seconds")
+        sketch = data.get("sketch")
+        agg = cls(
+            math.inf if window is None else float(window),
+            sketch_precision=sketch["precision"] if sketch else None,
+            exact_threshold=sketch["exact_threshold"] if sketch else 64,
+            bucket_seconds=sketch["bucket_seconds"] if sketch else 600.0,
+        )
+        members, keys, labels = data["members"], data["keys"], data["labels"]
+        for ts, key_idx, member_id, value in data["events"]:
+            member = members[member_id] if member_id >= 0 and not sketch else None
+            agg.insert(ts, keys[key_idx], member, value, labels[key_idx])
+        if sketch:
+            for key, buckets in zip(keys, sketch["buckets"]):
+                agg._keys[key].buckets = {
+                    int(b): DistinctCounter.from_dict(c, agg.exact_threshold, agg.sketch_precision)
+                    for b, c in buckets.items()
+                }
+        agg.stamp = data.get("stamp")
+        return agg
+
+    def save(self, path: Path) -> None:
+        """Atomic write (tmp + replace), so a reader never sees a torn file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), separators=(",", ":")))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> WindowAggregator | None:
+        """Saved aggregator, or None if the file is missing or unreadable."""
+        try:
+            return cls.from_dict(json.loads(path.read_text()))
+        except (FileNotFoundError, OSError, ValueError, KeyError, IndexError, TypeError):
+            return None
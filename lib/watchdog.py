@@ -17,7 +17,8 @@ import sys
 from typing import Any
 
 from lib.clients.birdeye import BirdeyeClient
-from lib.config import load_risk_config
+from lib.clients.pool import with_client_pool
+from lib.config import current_config
 from lib.state import Position, load_state, save_state
 
 
@@ -27,23 +28,33 @@ async def check_positions() -> dict[str, Any]:
     Returns a list of positions that need action (exit/alert).
     """
     state = load_state()
-    risk = load_risk_config().get("trade", {})
+    risk = current_config().risk.trade
     birdeye = BirdeyeClient()
 
-    stop_loss_pct = risk.get("stop_loss_pct", 20)
-    take_profit_pct = risk.get("take_profit_pct", 100)
+    stop_loss_pct = risk.stop_loss_pct
+    take_profit_pct = risk.take_profit_pct
 
     exits_needed: list[dict[str, Any]] = []
     warnings: list[dict[str, Any]] = []
     updated_positions: list[Position] = []
 
     try:
+        # One multi-price request for every open position; per-mint fallback for gaps
+        mints = [pos.token_mint for pos in state.positions]
+        try:
+            prices = await birdeye.get_multi_price(mints, include_liquidity=False) if mints else {}
+        except Exception:
+            prices = {}
+
         for pos in state.positions:
-            try:
-                price_data = await birdeye.get_price(pos.token_mint)
-                current_price = float(price_data.get("data", {}).get("value", 0))
-            except Exception:
-                current_price = pos.current_price_usd  # Keep last known price
+            if pos.token_mint in prices:
+                current_price = float(prices[pos.token_mint]["value"])
+            else:
+                try:
+                    price_data = await birdeye.get_price(pos.token_mint)
+                    current_price = float(price_data.get("data", {}).get("value", 0))
+                except Exception:
+                    current_price = pos.current_price_usd  # Keep last known price
 
             # Update position with current price
             pos.current_price_usd = current_price
@@ -102,7 +113,7 @@ async def check_positions() -> dict[str, Any]:
 
 
 def main() -> None:
-    result = asyncio.run(check_positions())
+    result = asyncio.run(with_client_pool(check_positions()))
     print(json.dumps(result, indent=2))
     sys.exit(0)
 
@@ -0,0 +1,82 @@
+"""Local stand-in for the Birdeye price WebSocket, for testing lib.price_stream."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Any
+
+from websockets.asyncio.server import Server, ServerConnection, serve
+
+
+class PriceStreamStandIn:
+    """Serves SUBSCRIBE_PRICE / PRICE_DATA on 127.0.0.1 (random port).
+
+    Usage:
+        async with PriceStreamStandIn() as feed:
+            service = PriceStreamService(feed.url, ...)
+            await feed.wait_subscribed(mint)
+            await feed.push(mint, 0.5)
+    """
+
+    def __init__(self) -> None:
+        self.subscriptions: set[str] = set()
+        self.messages: list[dict[str, Any]] = []
+        self.connections: set[ServerConnection] = set()
+        self._server: Server | None = None
+        self._changed = asyncio.Event()
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None
+        host, port = list(self._server.sockets)[0].getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    async def __aenter__(self) -> PriceStreamStandIn:
+        self._server = await serve(self._handle, "127.0.0.1", 0, subprotocols=["echo-protocol"])
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        assert self._server is not None
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws: ServerConnection) -> None:
+        self.connections.add(ws)
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                self.messages.append(message)
+                mint = message.get("data", {}).get("address")
+                if message.get("type") == "SUBSCRIBE_PRICE":
+                    self.subscriptions.add(mint)
+                elif message.get("type") == "UNSUBSCRIBE_PRICE":
+                    self.subscriptions.discard(mint)
+                self._changed.set()
+        finally:
+            self.connections.discard(ws)
+            self.subscriptions.clear()
+
+    async def wait_subscribed(self, mint: str, timeout: float = 2.0) -> None:
+        async def wait() -> None:
+            while mint not in self.subscriptions:
+                self._changed.clear()
+                await self._changed.wait()
+        await asyncio.wait_for(wait(), timeout)
+
+    async def push(self, mint: str, price: float) -> None:
+        """Broadcast a PRICE_DATA tick to every connection subscribed to `mint`."""
+        frame = json.dumps({
+            "type": "PRICE_DATA",
+            "data": {"address": mint, "c": price, "o": price, "h": price, "l": price,
+                     "type": "1m", "unixTime": time.time()},
+        })
+        for ws in list(self.connections):
+            if mint in self.subscriptions:
+                await ws.send(frame)
+
+    async def drop_clients(self) -> None:
+        """Close every client connection (simulates a server-side disconnect)."""
+        for ws in list(self.connections):
+            await ws.close()
@@ -0,0 +1,246 @@
+"""Tests for Edge Bank bulk ingestion (write_beads, --bulk) and re-embedding."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from lib.edge.bank import Bead, EdgeBank
+from lib.skills import bead_write
+
+
+class BatchEmbedder:
+    """Bag-of-words stand-in for SentenceTransformer.encode that counts calls."""
+
+    def __init__(self, dim: int = 64, salt: str = ""):
+        self.dim = dim
+        self.salt = salt
+        self.calls: list[int] = []
+
+    def _one(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().replace(",", " ").replace("|", " ").split():
+            vec[int(hashlib.md5((self.salt + word).encode()).hexdigest(), 16) % self.dim] += 1.0
+        return vec
+
+    def encode(self, texts, convert_to_numpy=True, batch_size=32):
+        if isinstance(texts, str):
+            self.calls.append(1)
+            return self._one(texts)
+        self.calls.append(len(texts))
+        return np.stack([self._one(t) for t in texts])
+
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = EdgeBank(
+        db_path=tmp_path / "edge.db",
+        beads_dir=tmp_path / "beads",
+        embed_socket=tmp_path / "none.sock",
+    )
+    bank._embedder = BatchEmbedder()
+    return bank
+
+
+def historical(n: int) -> list[Bead]:
+    return [
+        Bead(
+            bead_type="exit",
+            timestamp=f"2026-01-{1 + i % 28:02d}T{i % 24:02d}:00:00+00:00",
+            token_symbol=f"T{i}",
+            thesis=f"pattern {i % 7} whale volume",
+            outcome="win" if i % 3 else "loss",
+        )
+        for i in range(n)
+    ]
+
+
+def stored(bank: EdgeBank) -> dict[str, bytes]:
+    conn = sqlite3.connect(bank.db_path)
+    rows = conn.execute("SELECT bead_id, embedding FROM beads").fetchall()
+    conn.close()
+    return dict(rows)
+
+
+class TestWriteBeads:
+    """Batched writes: one encode per batch, one transaction, index in sync."""
+
+    def test_batches_embedding_calls(self, bank):
+        ids = bank.write_beads(historical(150), batch_size=64)
+        assert len(ids) == len(set(ids)) == 150
+        assert bank._embedder.calls == [64, 64, 22]
+        assert len(stored(bank)) == 150
+        assert len(list(bank.beads_dir.glob("*.md"))) == 150
+
+    def test_matches_single_writes(self, bank, tmp_path):
+        """Bulk-written beads are recalled exactly like write_bead ones."""
+        bank.write_beads(historical(20))
+        single = EdgeBank(db_path=tmp_path / "single.db", beads_dir=tmp_path / "single")
+        single._embedder = BatchEmbedder()
+        for bead in historical(20):
+            single.write_bead(bead)
+        bulk_hits = bank.query_similar("pattern 3 whale", top_k=3)
+        single_hits = single.query_similar("pattern 3 whale", top_k=3)
+        assert [h["token_symbol"] for h in bulk_hits] == [h["token_symbol"] for h in single_hits]
+        assert bulk_hits == bank.query_similar("pattern 3 whale", top_k=3, exact=True)
+
+    def test_rerun_replaces_instead_of_duplicating(self, bank):
+        """Historical timestamps give stable ids, so a backfill can be re-run."""
+        first = bank.write_beads(historical(30))
+        assert bank.write_beads(historical(30)) == first
+        assert bank.get_stats()["total_beads"] == 30
+        assert first[0].startswith("20260101_000000_exit_T0")
+
+    def test_colliding_ids_get_suffix(self, bank):
+        beads = [
+            Bead(bead_type="entry", timestamp="2026-02-01T10:00:00", token_symbol="DUP")
+            for _ in range(3)
+        ]
+        ids = bank.write_beads(beads)
+        base = "20260201_100000_entry_DUP"
+        assert ids == [base, f"{base}_2", f"{base}_3"]
+
+    def test_failed_run_writes_nothing(self, bank):
+        def beads():
+            yield from historical(70)
+            raise RuntimeError("source died")
+
+        with pytest.raises(RuntimeError):
+            bank.write_beads(beads(), batch_size=32)
+        assert bank.get_stats()["total_beads"] == 0
+        assert list(bank.beads_dir.glob("*.md")) == []
+
+    def test_embedding_failure_leaves_no_orphan_files(self, bank, monkeypatch):
+        """A later chunk failing to embed leaves no markdown from the earlier ones."""
+        encode = bank._embedder.encode
+
+        def failing_encode(texts, **kwargs):
+            if len(bank._embedder.calls) >= 2:
+                raise RuntimeError("model crashed")
+            return encode(texts, **kwargs)
+
+        monkeypatch.setattr(bank._embedder, "encode", failing_encode)
+        with pytest.raises(RuntimeError):
+            bank.write_beads(historical(100), batch_size=32)
+        assert bank.get_stats()["total_beads"] == 0
+        assert list(bank.beads_dir.glob("*.md")) == []
+
+    def test_progress_reported_per_batch(self, bank):
+        seen = []
+        bank.write_beads(
+            historical(10), batch_size=4, progress=lambda done, total: seen.append(done)
+        )
+        assert seen == [4, 8, 10]
+
+
+class TestConcurrentWriters:
+    """Two EdgeBanks (as two processes would open) writing to one edge.db."""
+
+    def test_concurrent_insert_kept_in_saved_index(self, bank, tmp_path):
+        def open_bank() -> EdgeBank:
+            other = EdgeBank(bank.db_path, bank.beads_dir, embed_socket=tmp_path / "none.sock")
+            other._embedder = BatchEmbedder()
+            return other
+
+        bank.write_beads(historical(4))
+        inserted = threading.Event()
+        index_beads = bank._index_beads
+
+        def slow_index_beads(*args):
+            inserted.set()  # The row is in edge.db, the index not yet saved
+            time.sleep(0.2)
+            index_beads(*args)
+
+        bank._index_beads = slow_index_beads
+        writer = threading.Thread(target=bank.write_bead, args=(Bead(token_symbol="A"),))
+        writer.start()
+        assert inserted.wait(2)
+        other_id = open_bank().write_bead(Bead(token_symbol="B"))
+        writer.join()
+
+        index = open_bank()._get_index()  # Loaded from disk, fingerprint matching
+        assert len(index.ids) == 6 and other_id in index.ids
+
+
+class TestReembed:
+    """In-place re-embedding after a model change."""
+
+    def test_reembed_rewrites_vectors_and_index(self, bank):
+        bank.write_beads(historical(40))
+        before = stored(bank)
+        bank._embedder = BatchEmbedder(dim=32, salt="v2")
+        seen = []
+
+        result = bank.reembed(
+            batch_size=16, progress=lambda done, total: seen.append((done, total))
+        )
+        assert result == {"status": "OK", "reembedded": 40, "total": 40}
+        assert seen == [(16, 40), (32, 40), (40, 40)]
+        after = stored(bank)
+        assert after.keys() == before.keys()
+        assert all(len(v) == 32 * 4 for v in after.values())
+        assert bank.query_similar("pattern 5 whale", top_k=3) == bank.query_similar(
+            "pattern 5 whale", top_k=3, exact=True
+        )
+
+    def test_reembed_without_model(self, bank, monkeypatch):
+        bank.write_beads(historical(5))
+        bank._embedder = None
+        monkeypatch.setattr("lib.edge.bank.load_model", lambda name: None)
+        assert bank.reembed()["status"] == "ERROR"
+
+    def test_partial_chunk_keeps_old_vectors(self, bank, monkeypatch):
+        """A chunk with any missing embedding is not written; the index still matches edge.db."""
+        bank.write_beads(historical(20))
+        before = stored(bank)
+        bank._embedder = BatchEmbedder(dim=32, salt="v2")
+        real = bank._embed_many
+
+        def flaky(texts, use_cache=True):
+            return [None, *real(texts, use_cache)[1:]]
+
+        monkeypatch.setattr(bank, "_embed_many", flaky)
+        result = bank.reembed(batch_size=8)
+        assert (result["status"], result["reembedded"]) == ("ERROR", 0)
+        assert stored(bank) == before
+        assert bank.query_similar("pattern 2 whale", top_k=3) == bank.query_similar(
+            "pattern 2 whale", top_k=3, exact=True
+        )
+
+
+class TestBulkCLI:
+    """--bulk / --reembed entry points."""
+
+    def test_bulk_file_with_bad_lines(self, tmp_path, monkeypatch, capsys):
+        path = tmp_path / "beads.jsonl"
+        lines = [
+            json.dumps({"type": "exit", "token_symbol": f"T{i}", "thesis": "whale"})
+            for i in range(3)
+        ]
+        lines[1:1] = ["{not json", json.dumps({"type": "hold"}), ""]
+        path.write_text("\n".join(lines) + "\n")
+        monkeypatch.setattr(
+            bead_write, "EdgeBank",
+            lambda: EdgeBank(db_path=tmp_path / "edge.db", beads_dir=tmp_path / "beads"),
+        )
+        monkeypatch.setattr(sys, "argv", ["bead_write", "--bulk", str(path)])
+        with pytest.raises(SystemExit) as exit_info:
+            bead_write.main()
+        assert exit_info.value.code == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result["status"] == "PARTIAL"
+        assert result["written"] == 3
+        assert [e["line"] for e in result["errors"]] == [2, 3]
+
+    def test_data_requires_type(self, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["bead_write", "--data", "{}"])
+        with pytest.raises(SystemExit) as exit_info:
+            bead_write.main()
+        assert exit_info.value.code == 2
@@ -0,0 +1,822 @@
+"""Tests for the client layer — pooling and shared transport behaviour.
+
+No network: requests go to an in-process httpx.MockTransport.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from lib.clients.base import (
+    APIError,
+    BaseClient,
+    ConnectionSettings,
+    ConnectionStats,
+    EndpointHealth,
+    ResponseCache,
+    RPCFallbackClient,
+    make_cache_key,
+    rpc_endpoints_from_config,
+    rpc_hedgeable,
+)
+from lib.clients.birdeye import BirdeyeClient
+from lib.clients.disk_cache import DiskCache
+from lib.clients.pool import ClientPool, config_fingerprint, get_client_pool
+from lib.utils.async_batch import batch_gather, batch_price_fetch
+from lib.utils.deadline import DeadlineExceededError, deadline_scope
+from lib.utils.rate_limiter import SharedTokenBucket, TokenBucket
+from lib.utils.retry import RetryPolicy, RetryStats, retry_call
+
+
+class TestClientPool:
+    """One warm BaseClient per provider."""
+
+    @pytest.mark.asyncio
+    async def test_same_provider_shares_client(self):
+        """Repeated lookups for a provider return the same BaseClient."""
+        pool = ClientPool()
+        built = []
+
+        def factory() -> BaseClient:
+            built.append(1)
+            return BaseClient(base_url="https://example.test", provider_name="demo")
+
+        first = pool.get("demo", factory)
+        second = pool.get("demo", factory)
+
+        assert first is second
+        assert len(built) == 1
+        assert pool.providers() == ["demo"]
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_wrappers_draw_from_global_pool(self):
+        """Separate BirdeyeClient wrappers share one transport."""
+        a = BirdeyeClient()
+        b = BirdeyeClient()
+        assert a._client is b._client
+        assert "birdeye" in get_client_pool().providers()
+
+        # Wrapper close() must not tear down the shared transport
+        await a.close()
+        assert not b._client._client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_close_all_empties_pool(self):
+        """close_all() closes every client and resets the registry."""
+        pool = ClientPool()
+        client = pool.get("demo", lambda: BaseClient(base_url="https://example.test"))
+        await pool.close_all()
+
+        assert client._client.is_closed
+        assert pool.providers() == []
+
+    def test_new_event_loop_rebuilds_clients(self):
+        """Clients bound to a finished loop are not reused by the next loop."""
+        pool = ClientPool()
+
+        def factory() -> BaseClient:
+            return BaseClient(base_url="https://example.test")
+
+        async def grab() -> BaseClient:
+            return pool.get("demo", factory)
+
+        first = asyncio.run(grab())
+        second = asyncio.run(grab())
+        assert first is not second
+        # The first loop closed its client on shutdown instead of leaking it
+        assert first._client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_different_config_gets_own_client(self):
+        """A caller with another API key never receives the first caller's client."""
+        pool = ClientPool()
+
+        def factory(key: str):
+            return lambda: BaseClient(base_url="https://example.test", headers={"X-API-KEY": key})
+
+        first = pool.get("demo", factory("a"), config={"api_key": "a"})
+        assert pool.get("demo", factory("a"), config={"api_key": "a"}) is first
+        second = pool.get("demo", factory("b"), config={"api_key": "b"})
+        assert second is not first
+        assert second._client.headers["X-API-KEY"] == "b"
+        assert pool.providers() == ["demo"]
+        labels = [f"demo:{config_fingerprint({'api_key': k})}" for k in "ab"]
+        assert sorted(pool.stats()) == sorted(labels)
+        await pool.close_all()
+
+
+def _mock_client(handler, **kwargs) -> BaseClient:
+    """BaseClient whose transport is an in-process async handler."""
+    client = BaseClient(base_url="https://example.test", provider_name="mock", **kwargs)
+    client._client = httpx.AsyncClient(
+        base_url="https://example.test",
+        transport=httpx.MockTransport(handler),
+    )
+    return client
+
+
+class TestRequestCoalescing:
+    """Single-flight GETs: identical concurrent requests share one upstream call."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_gets_share_one_request(self):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(str(request.url))
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"price": 1.0})
+
+        client = _mock_client(handler, rate_limit=100)
+        results = await asyncio.gather(*[
+            client.get("/defi/token_overview", params={"address": "M1"}, cache_ttl=30)
+            for _ in range(5)
+        ])
+
+        assert len(calls) == 1
+        assert all(r == {"price": 1.0} for r in results)
+        assert client.stats.to_dict() == {"hits": 0, "misses": 1, "coalesced": 4, "disk_hits": 0}
+
+        # Later call is served from cache
+        await client.get("/defi/token_overview", params={"address": "M1"}, cache_ttl=30)
+        assert client.stats.hits == 1
+        assert len(calls) == 1
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_different_params_not_coalesced(self):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.params["address"])
+            return httpx.Response(200, json={})
+
+        client = _mock_client(handler, rate_limit=100)
+        await asyncio.gather(
+            client.get("/x", params={"address": "A"}),
+            client.get("/x", params={"address": "B"}),
+        )
+        assert sorted(calls) == ["A", "B"]
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            return httpx.Response(404, text="nope")
+
+        client = _mock_client(handler, rate_limit=100)
+        results = await asyncio.gather(
+            client.get("/missing"), client.get("/missing"), return_exceptions=True
+        )
+        assert all(isinstance(r, APIError) and r.status_code == 404 for r in results)
+        assert client.stats.coalesced == 1
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_request(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"ok": True})
+
+        client = _mock_client(handler, rate_limit=100)
+        first = asyncio.ensure_future(client.get("/slow"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(client.get("/slow"))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == {"ok": True}
+        await client.close()
+
+
+class TestResponseCache:
+    """Bounded LRU cache with TTL sweeps."""
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", 1, 60)
+        cache.set("b", 2, 60)
+        cache.get("a")  # a is now most recently used
+        cache.set("c", 3, 60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_byte_size(self):
+        cache = ResponseCache(max_entries=100, max_bytes=100)
+        cache.set("big1", "x" * 60, 60)
+        cache.set("big2", "y" * 60, 60)
+
+        assert len(cache) == 1
+        assert cache.get("big2") == "y" * 60
+        assert cache.stats()["bytes"] <= 100
+
+        # A single payload larger than the cap is never stored
+        cache.set("huge", "z" * 500, 60)
+        assert cache.get("huge") is None
+
+    def test_expired_entries_swept_without_reads(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("lib.clients.base.time.monotonic", lambda: clock[0])
+        cache = ResponseCache(sweep_interval=10)
+        cache.set("stale", {"v": 1}, ttl_seconds=5)
+
+        clock[0] += 30
+        cache.set("fresh", {"v": 2}, ttl_seconds=60)  # Triggers sweep
+
+        assert len(cache) == 1
+        assert cache.stats()["expirations"] == 1
+
+    def test_hit_miss_counters(self):
+        cache = ResponseCache()
+        cache.get("missing")
+        cache.set("k", 1, 60)
+        cache.get("k")
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_cache_key_ignores_param_order(self):
+        key = make_cache_key("GET", "/p", {"a": 1, "b": 2})
+        assert key == make_cache_key("GET", "/p", {"b": 2, "a": 1})
+        assert make_cache_key("GET", "/p", {"a": 1}) != make_cache_key("GET", "/p", {"a": 2})
+
+
+class TestDiskCache:
+    """Persistent response tier shared across processes."""
+
+    def test_entries_survive_new_instance(self, tmp_path):
+        path = tmp_path / "cache.db"
+        DiskCache(path).set("k", {"v": 1}, ttl_seconds=60, provider="birdeye", endpoint="/p")
+
+        other = DiskCache(path)  # Fresh connection, as a new process would open
+        assert other.get("k") == {"v": 1}
+        assert other.stats()["providers"]["birdeye"]["entries"] == 1
+
+    def test_expired_entries_ignored_and_purged(self, tmp_path, monkeypatch):
+        cache = DiskCache(tmp_path / "cache.db")
+        cache.set("old", 1, ttl_seconds=10, provider="birdeye")
+        cache.set("new", 2, ttl_seconds=1000, provider="helius")
+
+        now = __import__("time").time()
+        monkeypatch.setattr("lib.clients.disk_cache.time.time", lambda: now + 100)
+        assert cache.get("old") is None
+        assert cache.purge(expired_only=True) == 1
+        assert cache.purge(provider="helius") == 1
+        assert cache.entries() == []
+
+    def test_expired_entries_pruned_by_writes(self, tmp_path, monkeypatch):
+        path = tmp_path / "cache.db"
+        DiskCache(path).set("old", 1, ttl_seconds=10, provider="birdeye")
+        now = __import__("time").time()
+        monkeypatch.setattr("lib.clients.disk_cache.time.time", lambda: now + 100)
+
+        cache = DiskCache(path)  # A later process prunes on its first write
+        cache.set("k0", 0, ttl_seconds=10, provider="birdeye")
+        assert [e["key"] for e in cache.entries()] == ["k0"]
+
+        monkeypatch.setattr("lib.clients.disk_cache.time.time", lambda: now + 200)
+        for i in range(1, 64):
+            cache.set(f"k{i}", i, ttl_seconds=1000, provider="birdeye")
+        assert cache.stats()["providers"]["birdeye"]["expired"] == 1
+        cache.set("k64", 64, ttl_seconds=1000, provider="birdeye")  # 65th write prunes again
+        counts = cache.stats()["providers"]["birdeye"]
+        assert (counts["entries"], counts["expired"]) == (64, 0)
+
+    @pytest.mark.asyncio
+    async def test_base_client_reads_through_disk_tier(self, tmp_path):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            return httpx.Response(200, json={"top10HolderPercent": 0.3})
+
+        disk = DiskCache(tmp_path / "cache.db")
+        ttls = {"/defi/token_security": 3600}
+        first = _mock_client(handler, rate_limit=100, disk_cache=disk, persistent_ttls=ttls)
+        await first.get("/defi/token_security", params={"address": "M1"}, cache_ttl=60)
+        await first.close()
+
+        # New client (= next heartbeat process) with a cold memory cache
+        second = _mock_client(handler, rate_limit=100, disk_cache=disk, persistent_ttls=ttls)
+        data = await second.get("/defi/token_security", params={"address": "M1"}, cache_ttl=60)
+        await second.close()
+
+        assert data == {"top10HolderPercent": 0.3}
+        assert len(calls) == 1
+        assert second.stats.disk_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_api_key_in_path_never_persisted(self, tmp_path):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=[{"name": "BOAR"}])
+
+        disk = DiskCache(tmp_path / "cache.db")
+        client = _mock_client(
+            handler, rate_limit=100, disk_cache=disk, persistent_ttls={"/token-metadata": 3600}
+        )
+        await client.post("/token-metadata?api-key=SECRET", json_data={"mintAccounts": ["M1"]})
+        await client.close()
+
+        assert all("SECRET" not in e["key"] for e in disk.entries())
+        assert disk.entries()[0]["endpoint"] == "/token-metadata"
+
+
+class TestTokenBucket:
+    """Async FIFO token bucket shared per provider."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_are_spaced(self):
+        """Concurrent callers get distinct slots instead of waking together."""
+        bucket = TokenBucket(rate=20, burst=1)
+        woke: list[float] = []
+
+        async def call():
+            await bucket.acquire()
+            woke.append(time.monotonic())
+
+        await asyncio.gather(*[call() for _ in range(5)])
+
+        gaps = [b - a for a, b in zip(woke, woke[1:])]
+        assert min(gaps) >= 0.04
+        assert bucket.acquired == 5
+
+    def test_burst_then_debt(self):
+        clock = [0.0]
+        bucket = TokenBucket(rate=5, burst=3, clock=lambda: clock[0])
+        delays = [bucket.reserve() for _ in range(5)]
+        assert delays[:3] == [0.0, 0.0, 0.0]
+        assert delays[3] == pytest.approx(0.2) and delays[4] == pytest.approx(0.4)
+
+    def test_pause_holds_all_slots(self):
+        """A Retry-After pause delays every reservation until it lifts, then spaces them."""
+        clock = [0.0]
+        bucket = TokenBucket(rate=10, burst=5, clock=lambda: clock[0])
+        bucket.pause(2.0)
+        assert bucket.reserve() == pytest.approx(2.0)
+        assert bucket.reserve() == pytest.approx(2.1)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_refunds_slot(self):
+        clock = [0.0]
+        bucket = TokenBucket(rate=1, burst=1, clock=lambda: clock[0])
+        bucket.reserve()  # Drain
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert bucket.reserve() == pytest.approx(1.0)  # Not 2.0
+
+    def test_clients_of_one_provider_share_bucket(self):
+        a = BaseClient(base_url="https://example.test", provider_name="shared-demo", rate_limit=5)
+        b = BaseClient(base_url="https://example.test", provider_name="shared-demo", rate_limit=5)
+        assert a._rate_limiter is b._rate_limiter
+
+    @pytest.mark.asyncio
+    async def test_429_pauses_provider(self):
+        attempts = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                return httpx.Response(429, headers={"retry-after": "0.2"})
+            return httpx.Response(200, json={"ok": True})
+
+        client = _mock_client(handler, rate_limit=100, backoff_base=0.01)
+        client._rate_limiter = TokenBucket(rate=100)
+        assert await client.get("/limited") == {"ok": True}
+        assert attempts[1] - attempts[0] >= 0.19
+        await client.close()
+
+
+class TestSharedTokenBucket:
+    """File-backed bucket: one budget per provider across processes."""
+
+    def test_instances_share_one_budget(self, tmp_path):
+        """Two buckets on the same store (= two processes) draw from the same tokens."""
+        clock = [1000.0]
+        path = tmp_path / "rate_limits.json"
+        a = SharedTokenBucket("birdeye", rate=5, path=path, burst=2, clock=lambda: clock[0])
+        b = SharedTokenBucket("birdeye", rate=5, path=path, burst=2, clock=lambda: clock[0])
+
+        assert a.reserve() == 0.0
+        assert b.reserve() == 0.0
+        assert a.reserve() == pytest.approx(0.2)
+        assert b.reserve() == pytest.approx(0.4)
+
+        # Other providers are independent
+        other = SharedTokenBucket("nansen", rate=2, path=path, clock=lambda: clock[0])
+        assert other.reserve() == 0.0
+
+    def test_pause_visible_to_other_process(self, tmp_path):
+        clock = [1000.0]
+        path = tmp_path / "rate_limits.json"
+        a = SharedTokenBucket("birdeye", rate=5, path=path, clock=lambda: clock[0])
+        b = SharedTokenBucket("birdeye", rate=5, path=path, clock=lambda: clock[0])
+
+        a.pause(3.0)
+        assert b.paused_for() == pytest.approx(3.0)
+        assert b.reserve() == pytest.approx(3.0)
+
+    def test_corrupt_store_resets(self, tmp_path):
+        path = tmp_path / "rate_limits.json"
+        path.write_text("{not json")
+        bucket = SharedTokenBucket("birdeye", rate=5, path=path)
+        assert bucket.reserve() == 0.0
+
+
+class TestConnectionSettings:
+    """Per-provider transport tuning and reuse accounting."""
+
+    def test_provider_settings_from_firehose(self, monkeypatch):
+        monkeypatch.setattr(
+            "lib.clients.base.load_firehose_config",
+            lambda: {"birdeye": {"connections": {"http2": True, "max_connections": 4,
+                                                 "keepalive_expiry_seconds": 90}}},
+        )
+        settings = ConnectionSettings.for_provider("birdeye")
+        assert settings.http2 and settings.max_connections == 4
+        assert settings.keepalive_expiry == 90.0
+        assert settings.max_keepalive_connections == ConnectionSettings.max_keepalive_connections
+        assert ConnectionSettings.for_provider("unknown") == ConnectionSettings()
+
+    @pytest.mark.asyncio
+    async def test_reuse_counted_from_trace_events(self):
+        stats = ConnectionStats()
+        for i in range(4):
+            if i == 0:
+                await stats.trace("connection.connect_tcp.complete", {})
+                await stats.trace("connection.start_tls.complete", {})
+            stats.record_response(httpx.Response(200))
+
+        assert stats.to_dict()["reused"] == 3
+        assert stats.to_dict()["reuse_ratio"] == 0.75
+
+
+class TestMultiPrice:
+    """Birdeye multi-price batching with per-mint fallback."""
+
+    @pytest.mark.asyncio
+    async def test_mints_chunked_to_max_batch(self, monkeypatch):
+        birdeye = BirdeyeClient()
+        batches = []
+
+        async def fake_get(path, params=None, **kwargs):
+            mints = params["list_address"].split(",")
+            batches.append(len(mints))
+            return {"data": {m: {"value": 1.0, "liquidity": 10.0} for m in mints}}
+
+        monkeypatch.setattr(birdeye._client, "get", fake_get)
+        mints = [f"M{i}" for i in range(250)] + ["M0"]  # Duplicate is fetched once
+        prices = await birdeye.get_multi_price(mints)
+
+        assert sorted(batches) == [50, 100, 100]
+        assert len(prices) == 250
+
+    @pytest.mark.asyncio
+    async def test_batch_price_fetch_falls_back_per_mint(self, monkeypatch):
+        birdeye = BirdeyeClient()
+        overview_calls = []
+
+        async def fake_multi(mints, include_liquidity=True):
+            # B lacks liquidity
+            return {"A": {"value": 2.0, "liquidity": 900.0}, "B": {"value": 3.0}}
+
+        async def fake_overview(mint):
+            overview_calls.append(mint)
+            return {"data": {"price": 5.0, "liquidity": 100.0}}
+
+        monkeypatch.setattr(birdeye, "get_multi_price", fake_multi)
+        monkeypatch.setattr(birdeye, "get_token_overview", fake_overview)
+        prices = await batch_price_fetch(birdeye, ["A", "B", "C"])
+
+        assert prices["A"]["data"]["price"] == 2.0
+        assert sorted(overview_calls) == ["B", "C"]
+        assert prices["C"]["data"]["liquidity"] == 100.0
+
+
+def _rpc_client(*handlers, **kwargs) -> RPCFallbackClient:
+    """RPCFallbackClient whose endpoints are in-process handlers, in order (fresh health stats)."""
+    rpc = RPCFallbackClient([
+        {"provider": f"rpc-test-{i}", "url": f"https://rpc{i}.test", "rate_limit": 1000}
+        for i in range(len(handlers))
+    ], health={}, **kwargs)
+    for client, handler in zip(rpc._clients, handlers):
+        client._client = httpx.AsyncClient(
+            base_url=client.base_url, transport=httpx.MockTransport(handler)
+        )
+    return rpc
+
+
+def _echo_batch(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json=[
+        {"jsonrpc": "2.0", "id": item["id"], "result": {"echo": item["params"][0]}}
+        for item in json.loads(request.content)
+    ])
+
+
+class TestJsonRpcBatching:
+    """JSON-RPC array batching with per-item routing and fallback."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_batch(self):
+        posts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            posts.append(json.loads(request.content))
+            return _echo_batch(request)
+
+        rpc = _rpc_client(handler)
+        results = await asyncio.gather(
+            *[rpc.call("getAccountInfo", [f"ADDR{i}"]) for i in range(5)]
+        )
+
+        assert len(posts) == 1 and len(posts[0]) == 5
+        assert [r["result"]["echo"] for r in results] == [f"ADDR{i}" for i in range(5)]
+        await rpc.close()
+
+    @pytest.mark.asyncio
+    async def test_retryable_items_resent_to_next_endpoint(self):
+        def primary(request: httpx.Request) -> httpx.Response:
+            items = json.loads(request.content)
+            return httpx.Response(200, json=[
+                {"jsonrpc": "2.0", "id": items[0]["id"], "result": {"echo": "primary"}},
+                {"jsonrpc": "2.0", "id": items[1]["id"],
+                 "error": {"code": -32005, "message": "node behind"}},
+                {"jsonrpc": "2.0", "id": items[2]["id"],
+                 "error": {"code": -32602, "message": "bad params"}},
+                # items[3] missing from the response
+            ])
+
+        fallback_batches = []
+
+        def fallback(request: httpx.Request) -> httpx.Response:
+            fallback_batches.append([item["params"][0] for item in json.loads(request.content)])
+            return _echo_batch(request)
+
+        rpc = _rpc_client(primary, fallback)
+        calls = [{"method": "getAccountInfo", "params": [a]} for a in "ABCD"]
+        results = await rpc.request_batch(calls)
+
+        assert fallback_batches == [["B", "D"]]
+        assert results[0]["result"]["echo"] == "primary"
+        assert results[1]["result"]["echo"] == "B"
+        assert results[2]["error"]["code"] == -32602  # Not retryable: returned as-is
+        assert results[3]["result"]["echo"] == "D"
+        await rpc.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_moves_to_next_endpoint(self):
+        rpc = _rpc_client(lambda request: httpx.Response(400, text="batch disabled"), _echo_batch)
+        results = await rpc.request_batch([{"method": "getSlot", "params": ["x"]}])
+        assert results[0]["result"]["echo"] == "x"
+
+        dead = _rpc_client(lambda request: httpx.Response(400, text="down"))
+        with pytest.raises(APIError):
+            await dead.call("getSlot", ["x"])
+        await rpc.close()
+        await dead.close()
+
+
+class TestEndpointHealth:
+    """Health-scored endpoint ordering, circuit breaker and hedging."""
+
+    @pytest.mark.asyncio
+    async def test_degraded_primary_demoted(self):
+        hits = []
+
+        def primary(request: httpx.Request) -> httpx.Response:
+            hits.append("primary")
+            return httpx.Response(400, text="degraded")
+
+        def secondary(request: httpx.Request) -> httpx.Response:
+            hits.append("secondary")
+            return httpx.Response(200, json={"result": 1})
+
+        rpc = _rpc_client(primary, secondary)
+        for _ in range(4):
+            await rpc.request("POST", json_data={"method": "getSlot"})
+
+        # One failure inflates the primary's score; later calls go straight to the secondary
+        assert hits == ["primary", "secondary", "secondary", "secondary", "secondary"]
+        assert rpc._ordered()[0] == 1
+        assert rpc.endpoint_health()["rpc-test-0"]["error_rate"] == 1.0
+        await rpc.close()
+
+    @pytest.mark.asyncio
+    async def test_health_keyed_by_endpoint_url(self):
+        registry: dict[str, EndpointHealth] = {}
+        endpoints = [
+            {"provider": "rpc-test-a", "url": "https://a.test"},
+            {"provider": "rpc-test-a", "url": "https://b.test"},
+            {"provider": "rpc-test-b", "url": "https://b.test"},  # Same server, another tier
+        ]
+        rpc = RPCFallbackClient(endpoints, health=registry)
+        assert list(registry) == ["https://a.test", "https://b.test"]
+        assert rpc._health[0] is not rpc._health[1]
+        assert rpc._health[1] is rpc._health[2]
+
+        # A later client (one per HeliusClient) sees the failures recorded so far
+        rpc._health[1].record_failure()
+        later = RPCFallbackClient(endpoints[1:2], health=registry)
+        assert later.endpoint_health()["rpc-test-a"]["consecutive_failures"] == 1
+        await rpc.close()
+        await later.close()
+
+    def test_circuit_half_opens_after_cooldown(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr("lib.clients.base.time.monotonic", lambda: clock[0])
+        health = EndpointHealth(failure_threshold=2, cooldown=5, multiplier=2)
+        health.record_failure()
+        health.record_failure()
+        assert not health.available()
+
+        clock[0] += 5
+        assert health.available()  # Half-open trial
+        health.record_failure()
+        clock[0] += 5
+        assert not health.available()  # Cool-down doubled to 10s
+
+        clock[0] += 5
+        health.record_success(0.05)
+        assert health.available() and health.consecutive_failures == 0
+
+        # Old samples age out, so a demoted endpoint returns to its prior score
+        clock[0] += health.window_seconds + 1
+        assert health.error_rate() == 0.0 and health.score() == health.prior_latency
+
+    @pytest.mark.asyncio
+    async def test_slow_request_hedged_to_next_endpoint(self):
+        async def slow(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(1.0)
+            return httpx.Response(200, json={"from": "slow"})
+
+        async def fast(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"from": "fast"})
+
+        rpc = _rpc_client(slow, fast, hedge=True, min_hedge_samples=3)
+        for _ in range(3):
+            rpc._health[0].record_success(0.01)  # p90 of 10ms
+
+        start = time.monotonic()
+        result = await rpc.request("POST", json_data={"method": "getSlot"})
+
+        assert result == {"from": "fast"}
+        assert time.monotonic() - start < 0.5
+        assert rpc.hedges_sent == 1
+        await rpc.close()
+
+    @pytest.mark.asyncio
+    async def test_writes_are_never_hedged(self):
+        """sendTransaction (alone or in a batch) waits on one endpoint, however slow."""
+        seen = []
+
+        async def slow(request: httpx.Request) -> httpx.Response:
+            seen.append("slow")
+            await asyncio.sleep(0.2)
+            payload = json.loads(request.content)
+            if isinstance(payload, list):
+                return httpx.Response(200, json=[{"id": c["id"], "result": "sig"} for c in payload])
+            return httpx.Response(200, json={"result": "sig"})
+
+        async def fast(request: httpx.Request) -> httpx.Response:
+            seen.append("fast")
+            return httpx.Response(200, json={"result": "sig"})
+
+        rpc = _rpc_client(slow, fast, hedge=True, min_hedge_samples=3)
+        for _ in range(3):
+            rpc._health[0].record_success(0.01)
+
+        send = {"method": "sendTransaction"}
+        assert await rpc.request("POST", json_data=send) == {"result": "sig"}
+        await rpc.request_batch([{"method": "getSlot"}, {**send, "params": ["tx"]}])
+        assert seen == ["slow", "slow"]
+        assert rpc.hedges_sent == 0
+        assert rpc_hedgeable([{"method": "getSlot"}])
+        assert not rpc_hedgeable({"method": "sendBundle"})
+        await rpc.close()
+
+    def test_chain_read_from_firehose_rpc_section(self):
+        config = {
+            "primary": {"provider": "helius", "url": "https://rpc.helius/?api-key=${HELIUS_API_KEY}"},
+            "fallback_1": {"provider": "quicknode", "url": "https://qn/${QN_KEY}"},
+            "fallback_2": {"provider": "public", "url": "https://public"},
+            "backoff": {"initial_seconds": 1},
+        }
+        endpoints = rpc_endpoints_from_config(config, env={"HELIUS_API_KEY": "abc"})
+        assert [ep["url"] for ep in endpoints] == ["https://rpc.helius/?api-key=abc", "https://public"]
+        assert [ep["tier"] for ep in endpoints] == ["primary", "fallback_2"]
+
+
+class TestRetryEngine:
+    """Single deadline-aware retry layer."""
+
+    @pytest.mark.asyncio
+    async def test_retries_until_success_and_reports(self):
+        stats = RetryStats()
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise APIError("500", status_code=500, retryable=True)
+            return "ok"
+
+        policy = RetryPolicy(max_attempts=4, base_delay=0.01)
+        result = await retry_call(flaky, policy, label="GET /x", stats=stats)
+
+        assert result == "ok"
+        report = stats.to_dict()
+        assert (report["calls"], report["attempts"], report["retries"]) == (1, 3, 2)
+        assert report["recent"][0]["label"] == "GET /x"
+
+    @pytest.mark.asyncio
+    async def test_no_retry_past_deadline(self):
+        """A retry whose backoff cannot finish inside the context deadline is not scheduled."""
+        stats = RetryStats()
+
+        async def failing():
+            raise APIError("503", status_code=503, retryable=True)
+
+        start = time.monotonic()
+        with deadline_scope(0.5):
+            with pytest.raises(DeadlineExceededError) as excinfo:
+                await retry_call(failing, RetryPolicy(max_attempts=5, base_delay=2.0), stats=stats)
+
+        assert isinstance(excinfo.value.__cause__, APIError)
+
+        assert time.monotonic() - start < 0.1
+        assert stats.deadline_giveups == 1 and stats.attempts == 1
+
+    @pytest.mark.asyncio
+    async def test_client_errors_not_retried(self):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(1)
+            return httpx.Response(400, text="bad")
+
+        client = _mock_client(handler, rate_limit=100)
+        with pytest.raises(APIError):
+            await client.get("/bad")
+        assert len(calls) == 1
+        assert client.retry_stats.failures == 1
+        await client.close()
+
+
+class TestDeadlinePropagation:
+    """Context deadline respected by BaseClient and batch_gather."""
+
+    @pytest.mark.asyncio
+    async def test_spent_deadline_fails_fast_without_request(self):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(1)
+            return httpx.Response(200, json={})
+
+        client = _mock_client(handler, rate_limit=100)
+        with deadline_scope(0):
+            with pytest.raises(DeadlineExceededError):
+                await client.get("/defi/price")
+        assert calls == []
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_request_timeout_shrinks_to_budget(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            assert request.extensions["timeout"]["read"] <= 0.3
+            return httpx.Response(200, json={"ok": True})
+
+        client = _mock_client(handler, rate_limit=100, timeout=10.0)
+        with deadline_scope(0.3):
+            assert await client.get("/defi/price") == {"ok": True}
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_wait_beyond_deadline_fails_fast(self):
+        bucket = TokenBucket(rate=1, burst=1)
+        bucket.reserve()
+        with pytest.raises(DeadlineExceededError):
+            await bucket.acquire(max_wait=0.1)
+        assert bucket.reserve() == pytest.approx(1.0, abs=0.05)  # Slot was refunded
+
+    @pytest.mark.asyncio
+    async def test_batch_gather_capped_by_context_deadline(self):
+        async def evaluate(delay: float) -> float:
+            await asyncio.sleep(delay)
+            return delay
+
+        start = time.monotonic()
+        with deadline_scope(0.2):
+            results = await batch_gather([0.01, 5.0], evaluate, max_concurrent=2)
+        assert results == [0.01, None]
+        assert time.monotonic() - start < 1.0
@@ -0,0 +1,90 @@
+"""Tests for the config service.
+
+Validates parse-once caching, mtime hot reload, rejection of invalid
+edits, frozen typed sections and per-cycle snapshot pinning.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+import lib.config
+from lib.config import ConfigError, ConfigService, config_scope, current_config, load_risk_config
+
+RISK_YAML = """\
+portfolio:
+  drawdown_halt_hours: 24
+conviction:
+  thresholds:
+    auto_execute: {auto}
+    watchlist: 60
+"""
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    (tmp_path / "risk.yaml").write_text(RISK_YAML.format(auto=85))
+    (tmp_path / "firehose.yaml").write_text("birdeye:\n  max_concurrent: 3\n")
+    return tmp_path
+
+
+@pytest.fixture
+def service(config_dir, monkeypatch):
+    svc = ConfigService(config_dir, min_check_interval=0)
+    monkeypatch.setattr(lib.config, "_config_service", svc)
+    return svc
+
+
+class TestConfigService:
+    """Parse once, reload on change, keep the last good snapshot."""
+
+    def test_parsed_once_until_file_changes(self, service, config_dir):
+        first = service.snapshot()
+        assert service.snapshot() is first
+        assert first.risk.conviction.thresholds.auto_execute == 85
+        assert first.risk.portfolio.drawdown_halt_hours == 24  # ints stay ints
+        assert first.risk.trade.stop_loss_pct == 20  # default for a missing key
+
+        (config_dir / "risk.yaml").write_text(RISK_YAML.format(auto=90))
+        second = service.snapshot()
+        assert second.version == first.version + 1
+        assert second.risk.conviction.thresholds.auto_execute == 90
+        assert first.risk.conviction.thresholds.auto_execute == 85  # old snapshot untouched
+
+    def test_invalid_edit_keeps_previous_snapshot(self, service, config_dir):
+        good = service.snapshot()
+        (config_dir / "risk.yaml").write_text(RISK_YAML.format(auto="soon"))
+        assert service.snapshot() is good
+        assert "auto_execute" in service.last_error
+
+        (config_dir / "risk.yaml").write_text("portfolio: [unterminated")
+        assert service.snapshot() is good
+
+    def test_invalid_initial_config_raises(self, config_dir):
+        (config_dir / "risk.yaml").write_text(RISK_YAML.format(auto="soon"))
+        with pytest.raises(ConfigError):
+            ConfigService(config_dir).snapshot()
+
+    def test_sections_are_frozen_and_dict_loaders_copy(self, service):
+        with pytest.raises(ValidationError):
+            service.snapshot().risk.portfolio.drawdown_halt_hours = 1
+        load_risk_config()["portfolio"]["drawdown_halt_hours"] = 1
+        assert load_risk_config()["portfolio"]["drawdown_halt_hours"] == 24
+
+    @pytest.mark.asyncio
+    async def test_scope_pins_snapshot_for_the_cycle(self, service, config_dir):
+        seen = []
+
+        async def guard():
+            seen.append(current_config().risk.conviction.thresholds.auto_execute)
+
+        with config_scope() as pinned:
+            await guard()
+            (config_dir / "risk.yaml").write_text(RISK_YAML.format(auto=95))
+            await asyncio.create_task(guard())  # tasks inherit the pinned snapshot
+            assert current_config() is pinned
+        await guard()
+        assert seen == [85, 85, 95]
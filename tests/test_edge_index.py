@@ -0,0 +1,224 @@
+"""Tests for the Edge Bank IVF index — recall vs brute force, filters, persistence."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+
+import numpy as np
+import pytest
+
+from lib.edge.bank import Bead, EdgeBank
+from lib.edge.index import IVFIndex
+from lib.edge.matrix import EmbeddingMatrix, normalize
+
+
+class HashEmbedder:
+    """Deterministic bag-of-words stand-in for SentenceTransformer.encode."""
+
+    dim = 64
+
+    def encode(self, text, convert_to_numpy=True):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().replace(",", " ").replace("|", " ").split():
+            vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+        return vec
+
+
+def clustered(n: int, dim: int = 32, clusters: int = 40, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    noise = 0.3 * rng.normal(size=(n, dim))
+    return (centers[rng.integers(clusters, size=n)] + noise).astype(np.float32)
+
+
+def exact_top(
+    vectors: np.ndarray, query: np.ndarray, k: int, mask: np.ndarray | None = None
+) -> list[int]:
+    scores = normalize(vectors) @ normalize(query)
+    if mask is not None:
+        scores = np.where(mask, scores, -np.inf)
+    return [int(i) for i in np.argsort(-scores)[:k] if np.isfinite(scores[i])]
+
+
+class TestIVFIndex:
+    """Index search against exact cosine ranking."""
+
+    def test_small_index_is_exact(self):
+        """Below the training threshold every vector is scanned."""
+        vectors = clustered(500)
+        index = IVFIndex(dim=32)
+        index.add_many([f"b{i}" for i in range(500)], vectors, ["pending"] * 500)
+        assert index.nlist == 0
+        for q in clustered(10, seed=1):
+            hits = index.search(q, k=5)
+            assert [bead_id for _, bead_id in hits] == [f"b{i}" for i in exact_top(vectors, q, 5)]
+
+    def test_trained_index_recall(self):
+        """Partitioned search finds nearly all of the exact top-k."""
+        vectors = clustered(8000)
+        index = IVFIndex(dim=32, train_threshold=2000)
+        index.add_many([f"b{i}" for i in range(8000)], vectors, ["pending"] * 8000)
+        assert index.nlist > 0
+
+        found = total = 0
+        for q in clustered(50, seed=2):
+            expected = {f"b{i}" for i in exact_top(vectors, q, 10)}
+            found += len(expected & {bead_id for _, bead_id in index.search(q, k=10)})
+            total += len(expected)
+        assert found / total >= 0.9
+
+    def test_outcome_filter(self):
+        """Filtered search only returns matching beads and still fills k."""
+        vectors = clustered(6000)
+        outcomes = ["win" if i % 20 == 0 else "loss" for i in range(6000)]
+        index = IVFIndex(dim=32, train_threshold=2000)
+        index.add_many([f"b{i}" for i in range(6000)], vectors, outcomes)
+        mask = np.array([o == "win" for o in outcomes])
+
+        for q in clustered(5, seed=3):
+            hits = index.search(q, k=5, outcome="win")
+            assert len(hits) == 5
+            assert all(int(bead_id[1:]) % 20 == 0 for _, bead_id in hits)
+            assert hits[0][1] == f"b{exact_top(vectors, q, 1, mask)[0]}"
+
+    def test_replace_keeps_one_row(self):
+        """Re-adding an id replaces its vector and outcome."""
+        index = IVFIndex(dim=4)
+        index.add("a", np.array([1, 0, 0, 0]), "pending")
+        index.add("a", np.array([0, 1, 0, 0]), "win")
+        assert len(index) == 1
+        assert index.search(np.array([0, 1, 0, 0]), k=1, outcome="win")[0][1] == "a"
+
+    def test_save_load_round_trip(self, tmp_path):
+        """A saved index answers queries identically after loading."""
+        vectors = clustered(3000)
+        index = IVFIndex(dim=32, train_threshold=1000)
+        index.add_many([f"b{i}" for i in range(3000)], vectors, ["pending"] * 3000)
+        meta, sidecar = tmp_path / "edge.db.ivf.npz", tmp_path / "edge.db.vectors.npy"
+        index.save(meta, sidecar, (123, 456))
+
+        loaded, fingerprint = IVFIndex.load(meta, sidecar)
+        assert fingerprint == (123, 456)
+        assert isinstance(loaded.vectors, np.memmap)
+        q = clustered(1, seed=4)[0]
+        assert loaded.search(q, k=5) == index.search(q, k=5)
+        assert IVFIndex.load(tmp_path / "missing.npz", sidecar) is None
+
+    def test_training_rewrites_bound_sidecar(self, tmp_path):
+        """Retraining reorders rows; the sidecar follows."""
+        index = IVFIndex(dim=32, train_threshold=500)
+        sidecar = tmp_path / "v.npy"
+        index.add_many([f"a{i}" for i in range(400)], clustered(400), ["pending"] * 400)
+        index.save(tmp_path / "m.npz", sidecar)
+        index.add_many([f"b{i}" for i in range(400)], clustered(400, seed=5), ["pending"] * 400)
+        assert index.nlist > 0
+        assert np.array_equal(np.load(sidecar), index.vectors)
+
+
+class TestEmbeddingMatrix:
+    """Exact matrix search and the write-through sidecar."""
+
+    def test_search_matches_naive_ranking(self):
+        vectors = clustered(300)
+        matrix = EmbeddingMatrix(dim=32)
+        outcomes = ["win" if i % 3 else "loss" for i in range(300)]
+        matrix.add_many([f"b{i}" for i in range(300)], vectors, outcomes)
+        q = clustered(1, seed=6)[0]
+        assert [b for _, b in matrix.search(q, k=4)] == [f"b{i}" for i in exact_top(vectors, q, 4)]
+        mask = np.array([i % 3 == 0 for i in range(300)])
+        assert [b for _, b in matrix.search(q, k=4, outcome="loss")] == [
+            f"b{i}" for i in exact_top(vectors, q, 4, mask)
+        ]
+        assert matrix.search(q, k=4, outcome="unknown") == []
+
+    def test_bound_matrix_appends_and_patches_in_place(self, tmp_path):
+        """Writes after bind() append to / patch the .npy instead of rewriting it."""
+        sidecar = tmp_path / "edge.db.vectors.npy"
+        matrix = EmbeddingMatrix(dim=4)
+        matrix.add_many(["a", "b"], np.eye(4)[:2], ["pending", "pending"])
+        matrix.bind(sidecar)
+        inode = sidecar.stat().st_ino
+
+        matrix.add("c", np.array([0, 0, 1, 0]), "win")
+        matrix.add("a", np.array([0, 0, 0, 2]), "loss")
+        assert sidecar.stat().st_ino == inode
+        on_disk = np.load(sidecar)
+        assert on_disk.shape == (3, 4)
+        expected = np.array([[0, 0, 0, 1], [0, 1, 0, 0], [0, 0, 1, 0]], dtype=np.float32)
+        assert np.array_equal(on_disk, expected)
+        assert matrix.search(np.array([0, 0, 0, 1]), k=1, outcome="loss")[0][1] == "a"
+
+    def test_attach_rejects_mismatched_sidecar(self, tmp_path):
+        sidecar = tmp_path / "v.npy"
+        np.save(sidecar, np.zeros((2, 4), dtype=np.float32))
+        matrix = EmbeddingMatrix(dim=4)
+        assert not matrix.attach(sidecar)
+        assert not matrix.attach(tmp_path / "missing.npy")
+
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = EdgeBank(db_path=tmp_path / "edge.db", beads_dir=tmp_path / "beads")
+    bank._embedder = HashEmbedder()
+    return bank
+
+
+def write_sample_beads(bank: EdgeBank) -> None:
+    theses = [
+        ("WHALE", "whale accumulation smart money wallets", "win"),
+        ("RUG", "new pool high volume mutable mint", "loss"),
+        ("KOL", "kol narrative spike volume", "win"),
+        ("DUMP", "whale dump concentrated holders", "loss"),
+    ]
+    for i, (symbol, thesis, outcome) in enumerate(theses):
+        bank.write_bead(
+            Bead(bead_type="exit", token_symbol=f"{symbol}{i}", thesis=thesis, outcome=outcome)
+        )
+
+
+class TestEdgeBankIndex:
+    """EdgeBank keeps the index in sync and matches the brute-force path."""
+
+    def test_index_matches_brute_force(self, bank):
+        write_sample_beads(bank)
+        assert bank.index_path.exists() and bank.vectors_path.exists()
+        for context in ("whale accumulation", "volume spike narrative", "mutable mint"):
+            exact = bank.query_similar(context, top_k=3, exact=True)
+            assert bank.query_similar(context, top_k=3) == exact
+
+    def test_matrix_matches_db_scan(self, bank):
+        """Exact recall over the sidecar matrix agrees with scanning edge.db."""
+        write_sample_beads(bank)
+        query = np.frombuffer(bank._embed("whale holders dump"), dtype=np.float32)
+        exact = bank.query_similar("whale holders dump", top_k=2, exact=True)
+        assert exact == bank._query_brute_force(query, 2)
+
+    def test_outcome_filtered_query(self, bank):
+        write_sample_beads(bank)
+        matches = bank.query_similar("whale", top_k=3, outcome="win")
+        assert matches and all(m["outcome"] == "win" for m in matches)
+        assert matches == bank.query_similar("whale", top_k=3, outcome="win", exact=True)
+
+    def test_new_bank_loads_persisted_index(self, bank, tmp_path, monkeypatch):
+        """A fresh EdgeBank reuses the saved index instead of rebuilding it."""
+        write_sample_beads(bank)
+        fresh = EdgeBank(db_path=bank.db_path, beads_dir=bank.beads_dir)
+        fresh._embedder = HashEmbedder()
+        monkeypatch.setattr(fresh, "_rebuild_index", lambda: pytest.fail("index was rebuilt"))
+        assert fresh.query_similar("whale accumulation")[0]["token_symbol"] == "WHALE0"
+
+    def test_external_db_change_triggers_rebuild(self, bank):
+        """A bead written without the index (another tool) is still found."""
+        write_sample_beads(bank)
+        vector = HashEmbedder().encode("solitary unique moonshot")
+        conn = sqlite3.connect(bank.db_path)
+        conn.execute(
+            "INSERT INTO beads "
+            "(bead_id, timestamp, bead_type, token_symbol, outcome, signals, embedding) "
+            "VALUES ('ext', '2026-01-01T00:00:00', 'exit', 'EXT', 'win', '[]', ?)",
+            (vector.tobytes(),),
+        )
+        conn.commit()
+        conn.close()
+        assert bank.query_similar("solitary unique moonshot", top_k=1)[0]["bead_id"] == "ext"
@@ -0,0 +1,90 @@
+"""Tests for the Edge Bank embedding cache — keys, tiers, eviction, EdgeBank reuse."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from lib.edge.bank import Bead, EdgeBank
+from lib.edge.embed_cache import EmbeddingCache, cache_key
+
+
+class CountingEmbedder:
+    """SentenceTransformer stand-in that counts encode calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, convert_to_numpy=True):
+        self.calls += 1
+        return np.array([len(text), text.count("e"), 1.0], dtype=np.float32)
+
+
+def vec(*values: float) -> bytes:
+    return np.array(values, dtype=np.float32).tobytes()
+
+
+class TestEmbeddingCache:
+    """Two-tier lookups and statistics."""
+
+    def test_key_normalises_text_and_includes_model(self):
+        assert cache_key("whale  accumulation\n", "m") == cache_key(" whale accumulation", "m")
+        assert cache_key("ｗhale", "m") == cache_key("whale", "m")  # NFKC folds full-width forms
+        assert cache_key("whale", "m") != cache_key("whale", "other-model")
+
+    def test_memory_lru_eviction_falls_back_to_disk(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "c.db", "m", memory_entries=2)
+        for i, text in enumerate(("a", "b", "c")):
+            cache.put(text, vec(i))
+        assert cache.get("a") == vec(0)  # Evicted from memory, served from disk
+        assert cache.get("c") == vec(2)
+        assert (cache.memory_hits, cache.disk_hits) == (1, 1)
+
+    def test_persistent_tier_and_lifetime_hit_rate(self, tmp_path):
+        first = EmbeddingCache(tmp_path / "c.db", "m")
+        assert first.get("context") is None
+        first.put("context", vec(1, 2))
+        first.get("context")
+        first.close()
+
+        second = EmbeddingCache(tmp_path / "c.db", "m")
+        assert second.get("context") == vec(1, 2)
+        assert EmbeddingCache(tmp_path / "c.db", "other").get("context") is None
+        stats = second.stats()
+        assert stats["session"]["disk_hits"] == 1
+        assert stats["lifetime"] == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+
+    def test_prune_keeps_most_recently_used(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "c.db", "m", memory_entries=0, disk_entries=2)
+        for text in ("old", "mid", "new"):
+            cache.put(text, vec(1))
+        cache.get("old")  # Touch: now most recently used
+        assert cache.prune() == 1
+        assert cache.get("mid") is None
+        assert cache.get("old") is not None
+
+
+class TestEdgeBankCache:
+    """EdgeBank only encodes text it has not seen before."""
+
+    def test_repeated_queries_encode_once(self, tmp_path):
+        embedder = CountingEmbedder()
+        bank = EdgeBank(db_path=tmp_path / "edge.db", beads_dir=tmp_path / "beads")
+        bank._embedder = embedder
+        bank.write_bead(Bead(bead_type="entry", token_symbol="BOAR", thesis="whale accumulation"))
+        for _ in range(3):
+            bank.query_similar("oracle:4_wallets  narrative:5x")
+
+        fresh = EdgeBank(db_path=tmp_path / "edge.db", beads_dir=tmp_path / "beads")
+        fresh._embedder = embedder
+        fresh.query_similar("oracle:4_wallets narrative:5x")
+        assert embedder.calls == 2  # One bead, one distinct context
+
+    def test_rewriting_same_bead_text_reuses_vector(self, tmp_path):
+        embedder = CountingEmbedder()
+        bank = EdgeBank(db_path=tmp_path / "edge.db", beads_dir=tmp_path / "beads")
+        bank._embedder = embedder
+        bead = Bead(bead_type="exit", token_symbol="BOAR", thesis="take profit", outcome="win")
+        bank.write_bead(bead)
+        bank.write_bead(bead.model_copy())
+        assert embedder.calls == 1
+        assert bank.get_stats()["total_beads"] >= 1
@@ -0,0 +1,86 @@
+"""Tests for the Edge Bank embedding server — batching, fallback, EdgeBank integration."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+
+import numpy as np
+import pytest
+
+from lib.edge import bank as bank_module
+from lib.edge.bank import Bead, EdgeBank
+from lib.edge.embed_server import MODEL_NAME, EmbedClient, EmbedServer
+
+
+class CountingModel:
+    """Deterministic encoder that records the batch sizes it was called with."""
+
+    def __init__(self):
+        self.calls: list[int] = []
+
+    def encode(self, texts, convert_to_numpy=True, batch_size=32):
+        self.calls.append(len(texts))
+        return np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return tmp_path / "embed.sock"
+
+
+class TestEmbedServer:
+    """Server round-trips, batching and refusal paths."""
+
+    async def test_round_trip(self, socket_path):
+        model = CountingModel()
+        async with EmbedServer(socket_path, model=model) as server:
+            vectors = await asyncio.to_thread(EmbedClient(socket_path).embed, ["banana", "kiwi"])
+        assert vectors.dtype == np.float32
+        assert vectors.tolist() == [[6.0, 3.0, 1.0], [4.0, 0.0, 1.0]]
+        assert server.stats()["texts"] == 2
+        assert not socket_path.exists()
+
+    async def test_concurrent_requests_share_a_batch(self, socket_path):
+        model = CountingModel()
+        async with EmbedServer(socket_path, model=model, batch_window_ms=100):
+            client = EmbedClient(socket_path)
+            results = await asyncio.gather(
+                *(asyncio.to_thread(client.embed, [f"text {i}"]) for i in range(8))
+            )
+        assert all(r is not None and r.shape == (1, 3) for r in results)
+        assert sum(model.calls) == 8
+        assert len(model.calls) < 8
+
+    async def test_model_mismatch_and_missing_server(self, socket_path):
+        assert EmbedClient(socket_path).embed(["x"]) is None
+        async with EmbedServer(socket_path, model=CountingModel()):
+            other = EmbedClient(socket_path, model_name="another-model")
+            assert await asyncio.to_thread(other.embed, ["x"]) is None
+
+    async def test_stale_socket_replaced_live_one_refused(self, socket_path):
+        socket_path.write_text("")  # Left over from a crashed server
+        async with EmbedServer(socket_path, model=CountingModel()):
+            with pytest.raises(RuntimeError):
+                await EmbedServer(socket_path, model=CountingModel()).start()
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(str(socket_path))
+
+
+class TestEdgeBankUsesServer:
+    """EdgeBank embeds through the server without loading the model."""
+
+    async def test_bank_embeds_via_server(self, socket_path, tmp_path, monkeypatch):
+        def load_model(name=MODEL_NAME):
+            pytest.fail("model loaded in-process")
+
+        monkeypatch.setattr(bank_module, "load_model", load_model)
+        bank = EdgeBank(
+            db_path=tmp_path / "edge.db", beads_dir=tmp_path / "beads", embed_socket=socket_path
+        )
+        bead = Bead(bead_type="entry", token_symbol="BOAR", thesis="aaaa")
+        async with EmbedServer(socket_path, model=CountingModel()):
+            await asyncio.to_thread(bank.write_bead, bead)
+            matches = await asyncio.to_thread(bank.query_similar, "aaaa thesis", 1)
+        assert matches[0]["token_symbol"] == "BOAR"
+        assert matches[0]["similarity"] > 0
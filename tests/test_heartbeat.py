@@ -0,0 +1,192 @@
+"""Tests for the heartbeat runner's step graph and candidate fan-out.
+
+Validates concurrency of independent steps, dependency ordering,
+per-step budgets and deadlines, cycle detection and deferral of late
+candidates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from lib.heartbeat_runner import (
+    HeartbeatStep,
+    evaluate_candidate,
+    load_deferred_candidates,
+    run_step_graph,
+)
+from lib.utils.async_batch import batch_gather
+from lib.utils.deadline import check_deadline, deadline_scope, time_left
+
+
+def _budget(seconds: float = 60.0):
+    start = time.monotonic()
+    return lambda: seconds - (time.monotonic() - start)
+
+
+def _sleeper(delay: float, value: object = None):
+    async def run(inputs):
+        await asyncio.sleep(delay)
+        return value
+    return run
+
+
+class TestStepGraph:
+    """Dependency-graph scheduling of heartbeat steps."""
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_overlap(self):
+        """Two independent 0.2s steps finish in ~0.2s, not 0.4s."""
+        steps = [
+            HeartbeatStep("a", _sleeper(0.2, "A")),
+            HeartbeatStep("b", _sleeper(0.2, "B")),
+        ]
+        start = time.monotonic()
+        results = await run_step_graph(steps, _budget(), min_start_seconds=0)
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.35
+        assert results["a"].value == "A" and results["b"].value == "B"
+        assert all(r.status == "ok" for r in results.values())
+        assert results["a"].elapsed_seconds >= 0.19
+
+    @pytest.mark.asyncio
+    async def test_dependent_step_sees_inputs(self):
+        """A step starts after its deps and receives their results, failures included."""
+        async def boom(inputs):
+            raise RuntimeError("api down")
+
+        async def merge(inputs):
+            return (inputs["a"].value, inputs["b"].status, inputs["b"].error)
+
+        steps = [
+            HeartbeatStep("merge", merge, deps=("a", "b")),
+            HeartbeatStep("a", _sleeper(0.05, 1)),
+            HeartbeatStep("b", boom),
+        ]
+        results = await run_step_graph(steps, _budget(), min_start_seconds=0)
+
+        assert results["merge"].value == (1, "error", "api down")
+        assert results["merge"].started_at >= results["a"].elapsed_seconds
+
+    @pytest.mark.asyncio
+    async def test_step_budget_enforced(self):
+        """A step exceeding its own budget is marked timeout, others unaffected."""
+        steps = [
+            HeartbeatStep("slow", _sleeper(5), budget_seconds=0.1),
+            HeartbeatStep("fast", _sleeper(0, "ok")),
+        ]
+        results = await run_step_graph(steps, _budget(), min_start_seconds=0)
+
+        assert results["slow"].status == "timeout"
+        assert results["fast"].status == "ok"
+
+    @pytest.mark.asyncio
+    async def test_step_skipped_when_cycle_budget_low(self):
+        """Steps are not started with less than min_start_seconds of budget left."""
+        steps = [HeartbeatStep("late", _sleeper(0, "never"))]
+        results = await run_step_graph(steps, _budget(5.0), min_start_seconds=10)
+
+        assert results["late"].status == "skipped"
+        assert results["late"].value is None
+
+    @pytest.mark.asyncio
+    async def test_step_budget_is_context_deadline(self):
+        """Calls inside a step see its budget; DeadlineExceededError counts as a timeout."""
+        async def probe(inputs):
+            return time_left()
+
+        async def late(inputs):
+            check_deadline("late call", min_seconds=60)
+
+        steps = [
+            HeartbeatStep("probe", probe, budget_seconds=2.0),
+            HeartbeatStep("late", late, budget_seconds=5.0),
+        ]
+        results = await run_step_graph(steps, _budget(), min_start_seconds=0)
+
+        assert 0 < results["probe"].value <= 2.0
+        assert results["late"].status == "timeout"
+        assert "deadline exceeded" in results["late"].error
+
+    @pytest.mark.asyncio
+    async def test_cycle_rejected(self):
+        """Cyclic or dangling dependencies are configuration errors."""
+        cyclic = [
+            HeartbeatStep("a", _sleeper(0), deps=("b",)),
+            HeartbeatStep("b", _sleeper(0), deps=("a",)),
+        ]
+        with pytest.raises(ValueError):
+            await run_step_graph(cyclic, _budget())
+
+        dangling = [HeartbeatStep("a", _sleeper(0), deps=("missing",))]
+        with pytest.raises(ValueError):
+            await run_step_graph(dangling, _budget())
+
+
+class TestCandidateFanOut:
+    """Deadline-bounded candidate evaluation."""
+
+    @pytest.mark.asyncio
+    async def test_late_items_return_none(self):
+        """Items that miss the batch deadline come back as None, the rest are kept."""
+        async def evaluate(delay: float) -> float:
+            await asyncio.sleep(delay)
+            return delay
+
+        start = time.monotonic()
+        results = await batch_gather([0.01, 5.0, 0.02], evaluate, max_concurrent=3, timeout=0.2)
+
+        assert results == [0.01, None, 0.02]
+        assert time.monotonic() - start < 1.0
+
+    @pytest.mark.asyncio
+    async def test_deadline_includes_queue_time(self):
+        """Items stuck behind the concurrency limit are also cut off at the deadline."""
+        async def evaluate(delay: float) -> float:
+            await asyncio.sleep(delay)
+            return delay
+
+        results = await batch_gather([0.15, 0.15], evaluate, max_concurrent=1, timeout=0.2)
+        assert results == [0.15, None]
+
+    @pytest.mark.asyncio
+    async def test_rug_check_out_of_time_is_deferred_not_failed(self):
+        """A Rug Warden lookup refused by the deadline defers the mint; other errors FAIL it."""
+        class Birdeye:
+            def __init__(self, error: Exception | None = None):
+                self.error = error
+
+            async def get_token_overview(self, mint):
+                # Fails fast like BaseClient once too little of the deadline is left
+                check_deadline("GET /defi/token_overview", min_seconds=1.0)
+                raise self.error
+
+            async def get_trades(self, mint, limit=100):
+                return {"data": {"items": []}}
+
+        with deadline_scope(0.5):
+            results = await batch_gather(
+                ["LATE"], lambda mint: evaluate_candidate(mint, Birdeye()), timeout=5.0
+            )
+        assert results == [None]
+
+        broken = Birdeye(RuntimeError("HTTP 500"))
+        evaluation = await evaluate_candidate("BROKEN", broken)
+        assert evaluation["rug_status"] == "FAIL"
+
+    def test_stale_deferred_candidates_dropped(self):
+        """Only recently deferred candidates are carried into the next cycle."""
+        now = datetime.utcnow()
+        state = {
+            "deferred_candidates": [
+                {"token_mint": "FRESH", "deferred_at": now.isoformat()},
+                {"token_mint": "STALE", "deferred_at": (now - timedelta(hours=2)).isoformat()},
+                {"token_mint": "BROKEN"},
+            ]
+        }
+        assert list(load_deferred_candidates(state)) == ["FRESH"]
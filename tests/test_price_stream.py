@@ -0,0 +1,245 @@
+"""Tests for the streaming price service against a local WebSocket stand-in.
+
+Validates that exit rules fire on the tick that crosses them, that exits are
+not repeated (by the stream or, once it fired, by the heartbeat watchdog),
+and that the service reconnects after a dropped connection or a rejected
+handshake.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from websockets.asyncio.client import connect
+from websockets.datastructures import Headers
+from websockets.exceptions import InvalidStatus
+from websockets.http11 import Response
+
+from lib.heartbeat_runner import (
+    evaluate_position_exit,
+    merge_exit_tracking,
+    run_position_watchdog,
+    stream_exit_id,
+)
+from lib.price_stream import PriceStreamService
+from tests.mocks.mock_price_stream import PriceStreamStandIn
+
+MINT = "BOAR11111111111111111111111111111111111111"
+
+
+def _position(entry_price: float = 1.0, minutes_ago: int = 5) -> dict:
+    return {
+        "token_mint": MINT,
+        "token_symbol": "BOAR",
+        "entry_price": entry_price,
+        "entry_time": (datetime.utcnow() - timedelta(minutes=minutes_ago)).isoformat(),
+    }
+
+
+def _tick(price: float) -> str:
+    return json.dumps({"type": "PRICE_DATA", "data": {"address": MINT, "c": price}})
+
+
+@pytest.fixture
+def service_paths(tmp_path):
+    state_path = tmp_path / "state.json"
+    state_path.write_text(json.dumps({"positions": [_position()]}))
+    return state_path, tmp_path / "price_stream.json"
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class TestExitRules:
+    """evaluate_position_exit as shared by the watchdog and the stream."""
+
+    def test_stop_loss_and_peak_tracking(self):
+        pos = _position()
+        assert evaluate_position_exit(pos, 1.5) is None
+        assert pos["peak_price"] == 1.5
+        decision = evaluate_position_exit(pos, 0.79)
+        assert decision["exit_pct"] == 100 and "Stop-loss" in decision["reason"]
+
+    def test_unknown_liquidity_skips_liquidity_rule(self):
+        pos = {**_position(), "entry_liquidity": 100_000}
+        assert evaluate_position_exit(pos, 1.0, liquidity=None) is None
+        assert evaluate_position_exit(pos, 1.0, liquidity=10_000)["reason"].startswith("Liquidity")
+
+
+class TestPriceStream:
+    """PriceStreamService over a real WebSocket connection."""
+
+    @pytest.mark.asyncio
+    async def test_stop_loss_decided_within_a_second_of_tick(self, service_paths):
+        state_path, output_path = service_paths
+        async with PriceStreamStandIn() as feed:
+            service = PriceStreamService(feed.url, state_path=state_path, output_path=output_path)
+            task = asyncio.create_task(service.run(max_seconds=5))
+            await feed.wait_subscribed(MINT)
+
+            await feed.push(MINT, 0.95)
+            pushed = time.monotonic()
+            await feed.push(MINT, 0.75)
+            await _wait_for(lambda: service.exits)
+            assert time.monotonic() - pushed < 1.0
+
+            # Further ticks below the stop do not repeat the full exit
+            await feed.push(MINT, 0.70)
+            await _wait_for(lambda: service.ticks == 3)
+            service.stop()
+            await task
+
+        assert len(service.exits) == 1
+        assert service.exits[0]["exit_pct"] == 100
+        saved = json.loads(output_path.read_text())
+        assert saved["exits"][0]["source"] == "price_stream"
+        assert saved["prices"][MINT]["price"] == 0.70
+        assert saved["tracking"][MINT]["stream_exited"] is True
+
+    @pytest.mark.asyncio
+    async def test_resubscribes_after_disconnect(self, service_paths):
+        state_path, output_path = service_paths
+        async with PriceStreamStandIn() as feed:
+            service = PriceStreamService(
+                feed.url, state_path=state_path, output_path=output_path,
+                reconnect_initial_seconds=0.05,
+            )
+            task = asyncio.create_task(service.run(max_seconds=5))
+            await feed.wait_subscribed(MINT)
+            await feed.drop_clients()
+
+            await _wait_for(lambda: service.connects == 2)
+            await feed.wait_subscribed(MINT)
+            await feed.push(MINT, 0.5)
+            await _wait_for(lambda: service.exits)
+            service.stop()
+            await task
+
+        assert service.connects == 2
+        assert [m["type"] for m in feed.messages].count("SUBSCRIBE_PRICE") == 2
+
+    @pytest.mark.asyncio
+    async def test_rejected_handshake_is_retried(self, service_paths):
+        """A 429 on connect backs off and retries instead of ending the stream."""
+        state_path, output_path = service_paths
+        attempts = []
+
+        def flaky_connect(url, **kwargs):
+            attempts.append(url)
+            if len(attempts) <= 2:
+                raise InvalidStatus(Response(429, "Too Many Requests", Headers()))
+            return connect(url, **kwargs)
+
+        async with PriceStreamStandIn() as feed:
+            service = PriceStreamService(
+                feed.url, state_path=state_path, output_path=output_path,
+                reconnect_initial_seconds=0.01, connector=flaky_connect,
+            )
+            task = asyncio.create_task(service.run(max_seconds=5))
+            await feed.wait_subscribed(MINT)
+            service.stop()
+            await task
+
+        assert (len(attempts), service.failures, service.connects) == (3, 2, 1)
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_tier_is_not_repeated_by_stream(self, service_paths):
+        """A take-profit tier the heartbeat already took does not fire again on a tick."""
+        state_path, output_path = service_paths
+        service = PriceStreamService("ws://unused", state_path=state_path, output_path=output_path)
+        service.load_positions()
+        state_path.write_text(json.dumps({"positions": [{**_position(), "tier1_exited": True}]}))
+        service.load_positions()
+
+        tick = {"type": "PRICE_DATA", "data": {"address": MINT, "c": 2.2}}
+        assert service.handle_message(json.dumps(tick)) is None
+        assert service.exits == []
+
+
+    @pytest.mark.asyncio
+    async def test_reopened_position_starts_fresh(self, service_paths):
+        state_path, output_path = service_paths
+        service = PriceStreamService("ws://unused", state_path, output_path)
+        service.load_positions()
+        for price in (1.8, 0.7):  # Peak, then stop-loss
+            service.handle_message(_tick(price))
+        assert service.positions[MINT]["stream_exited"]
+
+        # The position is closed, then the mint is bought again
+        state_path.write_text(json.dumps({"positions": []}))
+        assert service.load_positions() == set()
+        assert service._tracking == {}
+        reopened = _position(entry_price=0.7, minutes_ago=1)
+        state_path.write_text(json.dumps({"positions": [reopened]}))
+        assert service.load_positions() == {MINT}
+        assert "peak_price" not in service.positions[MINT]
+
+        # Bought again between two refreshes, and across a restart
+        service.handle_message(_tick(0.5))
+        state_path.write_text(json.dumps({"positions": [_position(entry_price=0.5)]}))
+        assert service.load_positions() == {MINT}
+        restarted = PriceStreamService("ws://unused", state_path, output_path)
+        assert restarted.load_positions() == {MINT}
+        assert not restarted.positions[MINT].get("stream_exited")
+
+
+class TestWatchdogMergesStream:
+    """The heartbeat watchdog honours exits the stream already decided."""
+
+    class Birdeye:
+        def __init__(self, price: float):
+            self.price = price
+
+        async def get_multi_price(self, mints, **kwargs):
+            return {m: {"value": self.price, "liquidity": 100000} for m in mints}
+
+        async def get_token_overview(self, mint, **kwargs):
+            return {"data": {"price": self.price, "liquidity": 100000}}
+
+    def test_merge_is_sticky(self):
+        pos = {**_position(), "peak_price": 3.0}
+        merge_exit_tracking(pos, {"tier1_exited": True, "tier2_exited": False, "peak_price": 2.0})
+        assert pos["tier1_exited"] and not pos.get("tier2_exited")
+        assert pos["peak_price"] == 3.0
+
+    @pytest.mark.asyncio
+    async def test_stream_exits_are_not_repeated(self, tmp_path):
+        stream_path = tmp_path / "price_stream.json"
+        tracking = {MINT: {"tier1_exited": True, "peak_price": 2.1}}
+        stream_path.write_text(json.dumps({"tracking": tracking}))
+        state = {"positions": [_position()]}
+        assert await run_position_watchdog(state, self.Birdeye(2.05), stream_path) == []
+        assert state["positions"][0]["tier1_exited"] is True
+
+        stream_path.write_text(json.dumps({"tracking": {MINT: {"stream_exited": True}}}))
+        state = {"positions": [_position()]}
+        assert await run_position_watchdog(state, self.Birdeye(0.5), stream_path) == []
+
+    @pytest.mark.asyncio
+    async def test_stream_stop_loss_reaches_heartbeat_once(self, service_paths):
+        state_path, output_path = service_paths
+        service = PriceStreamService("ws://unused", state_path, output_path)
+        service.load_positions()
+        tick = {"type": "PRICE_DATA", "data": {"address": MINT, "c": 0.7}}
+        assert service.handle_message(json.dumps(tick))["exit_pct"] == 100
+
+        # Birdeye has bounced back above the stop: only the stream saw the drop
+        state = json.loads(state_path.read_text())
+        exits = await run_position_watchdog(state, self.Birdeye(0.95), output_path)
+        assert len(exits) == 1
+        assert exits[0]["source"] == "price_stream" and "Stop-loss" in exits[0]["reason"]
+        assert await run_position_watchdog(state, self.Birdeye(0.95), output_path) == []
+
+        # A stream exit for an earlier position in the same mint is not applied to a new one
+        state = {"positions": [_position(minutes_ago=1)]}
+        exits = await run_position_watchdog(state, self.Birdeye(0.95), output_path)
+        assert all(e.get("source") != "price_stream" for e in exits)
+        assert state["stream_exits_consumed"] == [stream_exit_id(service.exits[0])]
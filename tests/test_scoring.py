@@ -0,0 +1,100 @@
+"""Tests for conviction scoring.
+
+Property-checks the vectorized score_batch against the scalar score()
+path over randomized and boundary inputs.
+"""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from lib.scoring import ConvictionScorer, SignalBatch, SignalInput
+
+WARDEN = ["PASS", "WARN", "FAIL", "UNKNOWN"]
+
+
+def _random_rows(rng: random.Random, n: int) -> list[tuple]:
+    rows = []
+    for _ in range(n):
+        signals = SignalInput(
+            smart_money_whales=rng.choice([0, 1, 2, 3, 4, 7]),
+            # Boundary values of every threshold are over-sampled
+            narrative_volume_spike=rng.choice(
+                [0.0, 4.99, 5.0, 7.3, 9.99, 10.0, 25.0, rng.uniform(0, 30)]
+            ),
+            narrative_kol_detected=rng.random() < 0.5,
+            narrative_age_minutes=rng.choice(
+                [0, 1, 2, 29, 30, 31, 45, 59, 60, 90, rng.randrange(120)]
+            ),
+            rug_warden_status=rng.choice(WARDEN),
+            edge_bank_match_pct=rng.choice([0.0, 69.9, 70.0, 85.0, 100.0, rng.uniform(0, 100)]),
+        )
+        rows.append((
+            signals,
+            rng.random() < 0.3,                 # concentrated_volume
+            rng.choice([0, 0, 0, 1, 2, 3, 5]),  # dumper_wallet_count
+            rng.random() < 0.2,                 # time_mismatch
+            rng.choice([1.0, 1.0, 0.8, 0.5, 0.33]),  # data_completeness
+            rng.choice([1.0, 1.5, 2.0]),        # volatility_factor
+        ))
+    return rows
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return ConvictionScorer()
+
+
+class TestScoreBatch:
+    """score_batch gives the scalar path's results for every row."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_scalar_path(self, scorer, seed):
+        rows = _random_rows(random.Random(seed), 2000)
+        pot = 14.0
+        batch = SignalBatch.from_inputs(
+            [r[0] for r in rows],
+            concentrated_volume=[r[1] for r in rows],
+            dumper_wallet_count=[r[2] for r in rows],
+            time_mismatch=[r[3] for r in rows],
+        )
+        result = scorer.score_batch(
+            batch, pot,
+            volatility_factor=np.array([r[5] for r in rows]),
+            data_completeness=np.array([r[4] for r in rows]),
+        )
+
+        for i, row in enumerate(rows):
+            signals, concentrated, dumpers, mismatch, completeness, volatility = row
+            expected = scorer.score(
+                signals, pot, volatility,
+                data_completeness=completeness,
+                concentrated_volume=concentrated,
+                dumper_wallet_count=dumpers,
+                time_mismatch=mismatch,
+            )
+            got = (
+                int(result.ordering_score[i]), int(result.permission_score[i]),
+                result.recommendation[i], float(result.position_size_sol[i]),
+                int(result.primary_source_count[i]),
+            )
+            assert got == (
+                expected.ordering_score, expected.permission_score,
+                expected.recommendation, expected.position_size_sol,
+                len(expected.primary_sources),
+            ), f"row {i}: {signals}"
+
+    def test_scalar_broadcast_and_defaults(self, scorer):
+        batch = SignalBatch.from_inputs([
+            SignalInput(
+                smart_money_whales=3, narrative_volume_spike=6.0, narrative_kol_detected=True,
+                narrative_age_minutes=10, rug_warden_status="PASS", edge_bank_match_pct=90.0,
+            ),
+            SignalInput(rug_warden_status="FAIL"),
+        ])
+        result = scorer.score_batch(batch, pot_balance_sol=10.0)
+        assert list(result.recommendation) == ["AUTO_EXECUTE", "VETO"]
+        assert result.position_size_sol[1] == 0.0
@@ -0,0 +1,339 @@
+"""Tests for incremental smart money ingestion.
+
+Validates high-water-mark paging, that no trades are lost or re-processed
+between runs, the rolling distinct-wallet signals, the sliding-window
+aggregator behind them and its optional HyperLogLog distinct counting.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from lib.heartbeat_runner import parse_oracle_signals
+from lib.smart_money import SOL_MINT, SmartMoneyIngester, SmartMoneyStore
+from lib.utils.distinct_counter import DistinctCounter
+from lib.utils.window_aggregator import WindowAggregator
+
+
+def _trade(
+    n: int,
+    mint: str = "BOAR111",
+    wallet: str | None = None,
+    age_seconds: float = 0,
+    buy: bool = True,
+) -> dict:
+    ts = datetime.fromtimestamp(time.time() - age_seconds, tz=UTC).replace(tzinfo=None)
+    return {
+        "transaction_hash": f"tx{n}",
+        "block_timestamp": ts.isoformat(),
+        "trader_address": wallet or f"wallet{n}",
+        "token_sold_address": SOL_MINT if buy else mint,
+        "token_bought_address": mint if buy else SOL_MINT,
+        "token_bought_symbol": mint[:4] if buy else "SOL",
+        "trade_value_usd": 1000,
+    }
+
+
+class FakeNansen:
+    """Serves a newest-first trade feed with page-number pagination."""
+
+    def __init__(self):
+        self.trades: list[dict] = []
+        self.calls: list[tuple[int, int]] = []
+
+    def add(self, *trades: dict) -> None:
+        self.trades = sorted(
+            self.trades + list(trades), key=lambda t: t["block_timestamp"], reverse=True
+        )
+
+    async def get_smart_money_transactions(self, limit: int = 50, page: int = 1) -> dict:
+        self.calls.append((page, limit))
+        return {"data": self.trades[(page - 1) * limit: page * limit]}
+
+
+def _ingester(store_path, **kwargs) -> SmartMoneyIngester:
+    return SmartMoneyIngester(SmartMoneyStore(store_path), **kwargs)
+
+
+@pytest.fixture
+def ingester(tmp_path):
+    return _ingester(tmp_path / "smart_money.db", per_page=10, max_pages=10)
+
+
+class TestSmartMoneyIngester:
+    """Cursor-based Nansen polling into the append-only store."""
+
+    @pytest.mark.asyncio
+    async def test_warm_sync_fetches_only_new_trades(self, ingester):
+        nansen = FakeNansen()
+        nansen.add(*[_trade(i, age_seconds=600 - i) for i in range(25)])
+        cold = await ingester.sync(nansen)
+        assert (cold.pages, cold.inserted) == (3, 25)
+
+        nansen.calls.clear()
+        nansen.add(*[_trade(100 + i, age_seconds=5 - i) for i in range(3)])
+        warm = await ingester.sync(nansen)
+        assert warm.inserted == 3 and warm.caught_up
+        assert nansen.calls == [(1, 10)]
+        assert ingester.store.stats()["trades"] == 28
+
+    @pytest.mark.asyncio
+    async def test_backlog_larger_than_one_page_is_not_lost(self, ingester):
+        nansen = FakeNansen()
+        nansen.add(_trade(0, age_seconds=900))
+        await ingester.sync(nansen)
+
+        nansen.add(*[_trade(i, age_seconds=300 - i) for i in range(1, 36)])
+        report = await ingester.sync(nansen)
+        assert report.inserted == 35
+        assert report.pages == 4
+
+    @pytest.mark.asyncio
+    async def test_outage_longer_than_page_cap_is_backfilled(self, tmp_path):
+        """The cursor holds until the gap is closed; later cycles resume where paging stopped."""
+        ingester = _ingester(tmp_path / "smart_money.db", per_page=5, max_pages=2)
+        nansen = FakeNansen()
+        nansen.add(_trade(0, age_seconds=900))
+        await ingester.sync(nansen)
+        cursor = ingester.store.cursor()
+
+        nansen.add(*[_trade(i, age_seconds=600 - i) for i in range(1, 36)])
+        first = await ingester.sync(nansen)
+        assert (first.inserted, first.caught_up) == (10, False)
+        assert first.cursor == cursor
+        assert first.backfill.next_page == 3
+
+        # Trades keep arriving during the backfill: they are read first, and they
+        # shift the pages but nothing is skipped
+        nansen.add(*[_trade(100 + i, age_seconds=10 - i) for i in range(4)])
+        second = await ingester.sync(nansen)
+        assert second.inserted == 5 and not second.caught_up
+        assert ingester.store.stats()["trades"] == 16  # Head trades do not wait for the gap
+        reports = [await ingester.sync(nansen) for _ in range(6)]
+        assert [r.caught_up for r in reports] == [False] * 4 + [True, True]
+        assert ingester.store.stats()["trades"] == 40
+        assert ingester.store.backfill() is None
+        assert ingester.store.cursor().trade_id.startswith("tx103:")
+
+    @pytest.mark.asyncio
+    async def test_cold_start_on_endless_feed_stops_at_retention(self, tmp_path):
+        """A feed that never runs out of pages is read back to the retention horizon only."""
+        class EndlessNansen(FakeNansen):
+            def __init__(self):
+                super().__init__()
+                self.history: dict[int, dict] = {}  # One trade a minute, forever
+
+            def _old(self, k: int) -> dict:
+                if k not in self.history:
+                    self.history[k] = _trade(1000 + k, age_seconds=60 * k + 90)
+                return self.history[k]
+
+            async def get_smart_money_transactions(self, limit: int = 50, page: int = 1) -> dict:
+                offset = (page - 1) * limit
+                rows = self.trades[offset:offset + limit]
+                k = max(0, offset - len(self.trades))
+                return {"data": rows + [self._old(k + i) for i in range(limit - len(rows))]}
+
+        ingester = _ingester(
+            tmp_path / "smart_money.db", per_page=10, max_pages=4, retention_hours=1
+        )
+        nansen = EndlessNansen()
+        first = await ingester.sync(nansen)
+        assert (first.inserted, first.caught_up) == (40, False)
+
+        second = await ingester.sync(nansen)
+        assert second.caught_up and second.pages == 3  # Head page, then pages 5-6
+        assert ingester.store.cursor().trade_id.startswith("tx1000:")
+
+        nansen.add(_trade(1, age_seconds=1))
+        third = await ingester.sync(nansen)
+        assert (third.inserted, third.caught_up, third.pages) == (1, True, 1)
+
+    @pytest.mark.asyncio
+    async def test_full_page_of_repeats_is_not_caught_up(self, ingester):
+        class RepeatingNansen(FakeNansen):
+            async def get_smart_money_transactions(self, limit: int = 50, page: int = 1) -> dict:
+                return await super().get_smart_money_transactions(limit, 1)
+
+        nansen = RepeatingNansen()
+        nansen.add(*[_trade(i, age_seconds=60 - i) for i in range(10)])
+        report = await ingester.sync(nansen)
+        assert not report.caught_up
+        assert report.cursor.block_ts == 0.0
+
+    @pytest.mark.asyncio
+    async def test_window_saved_by_a_racing_sync_is_rebuilt(self, tmp_path):
+        """A window file out of step with the store (another process synced) is not trusted."""
+        store_path, window_path = tmp_path / "smart_money.db", tmp_path / "window.json"
+        nansen = FakeNansen()
+        nansen.add(*[_trade(i, age_seconds=60 - i) for i in range(3)])
+        first = _ingester(store_path, per_page=10, window_path=window_path)
+        await first.sync(nansen)
+        stale = window_path.read_text()
+
+        nansen.add(_trade(3, age_seconds=1))
+        second = _ingester(store_path, per_page=10, window_path=window_path)
+        await second.sync(nansen)
+        window_path.write_text(stale)  # The first process's save landed last
+
+        third = _ingester(store_path, per_page=10, window_path=window_path)
+        assert third.signals()[0]["wallet_count"] == 4
+        assert first.signals()[0]["wallet_count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_signals_use_distinct_wallets_in_window(self, ingester):
+        nansen = FakeNansen()
+        nansen.add(
+            # BOAR: 3 distinct wallets, one buying twice
+            _trade(1, wallet="w1"), _trade(2, wallet="w1"),
+            _trade(3, wallet="w2"), _trade(4, wallet="w3"),
+            # OLD: 3 wallets but outside a 60-minute window
+            *[_trade(10 + i, mint="OLD222", age_seconds=7200) for i in range(3)],
+            # DUMP: sells are not accumulation
+            *[_trade(20 + i, mint="DUMP333", buy=False) for i in range(4)],
+        )
+        await ingester.sync(nansen)
+
+        signals = ingester.signals(window_minutes=60)
+        assert [s["token_mint"] for s in signals] == ["BOAR111"]
+        assert signals[0]["wallet_count"] == 3
+        assert signals[0]["total_buy_usd"] == 4000
+        wide = ingester.signals(window_minutes=180)
+        assert {s["token_mint"] for s in wide} == {"BOAR111", "OLD222"}
+
+    @pytest.mark.asyncio
+    async def test_repeated_page_without_timestamps_stops(self, ingester):
+        """A feed that ignores pagination (or lacks timestamps) is read once and deduplicated."""
+        page = [{k: v for k, v in _trade(i).items() if k != "block_timestamp"} for i in range(10)]
+
+        class StuckNansen:
+            calls = 0
+
+            async def get_smart_money_transactions(
+                self, limit: int = 50, page_no: int = 1, **kwargs
+            ):
+                StuckNansen.calls += 1
+                return {"data": page}
+
+        first = await ingester.sync(StuckNansen())
+        second = await ingester.sync(StuckNansen())
+        assert (first.inserted, second.inserted) == (10, 0)
+        assert StuckNansen.calls == 4
+
+
+class TestWindowAggregator:
+    """Incremental per-mint aggregates against a brute-force recount."""
+
+    def test_matches_recount_while_sliding(self):
+        rng = random.Random(7)
+        agg = WindowAggregator(window_seconds=100)
+        events = []
+        for ts in range(1000):
+            mint, wallet = f"mint{rng.randrange(5)}", f"w{rng.randrange(30)}"
+            event = (float(ts), mint, wallet, float(rng.randrange(1, 100)))
+            events.append(event)
+            agg.insert(*event)
+            agg.expire(ts)
+            if ts % 97 == 0:
+                live = [e for e in events if e[0] >= ts - 100]
+                for mint in {e[1] for e in live}:
+                    rows = [e for e in live if e[1] == mint]
+                    got = agg.get(mint)
+                    assert got.distinct == len({e[2] for e in rows})
+                    assert got.total_value == pytest.approx(sum(e[3] for e in rows))
+                    assert (got.first_seen, got.last_seen) == (rows[0][0], rows[-1][0])
+        assert len(agg) == 101
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        agg = WindowAggregator(window_seconds=60)
+        agg.insert(0.0, "OTHER", "z", 1.0)
+        for ts, wallet in enumerate(["a", "b", "a", "c"]):
+            agg.insert(ts + 0.5, "BOAR111", wallet, 10.0, "BOAR")
+        agg.expire(61.0)  # drops ts 0 and 0.5: wallet z is no longer stored
+
+        path = tmp_path / "window.json"
+        agg.save(path)
+        loaded = WindowAggregator.load(path)
+        assert loaded.snapshot() == agg.snapshot()
+        assert "z" not in path.read_text()
+        assert WindowAggregator.load(tmp_path / "missing.json") is None
+
+    def test_parse_oracle_signals_counts_distinct_buyers(self):
+        buys = [_trade(i, wallet=f"w{i % 3}") for i in range(6)]
+        sells = [_trade(10 + i, mint="DUMP333", buy=False) for i in range(4)]
+        signals = parse_oracle_signals({"data": buys + sells})
+        assert signals == [{
+            "token_mint": "BOAR111",
+            "token_symbol": "BOAR",
+            "wallet_count": 3,
+            "total_buy_usd": 6000.0,
+        }]
+
+    @pytest.mark.asyncio
+    async def test_ingester_window_persists_between_runs(self, tmp_path):
+        store_path, window_path = tmp_path / "smart_money.db", tmp_path / "window.json"
+        nansen = FakeNansen()
+        nansen.add(*[_trade(i, age_seconds=60 - i) for i in range(3)])
+        first = _ingester(store_path, per_page=10, window_path=window_path)
+        await first.sync(nansen)
+
+        nansen.add(_trade(3, age_seconds=1))
+        second = _ingester(store_path, per_page=10, window_path=window_path)
+        await second.sync(nansen)
+        assert second.signals()[0]["wallet_count"] == 4
+        assert second.signals(window_minutes=60) == second.signals()
+
+
+class TestDistinctCounter:
+    """Exact-then-HyperLogLog distinct counting."""
+
+    def test_exact_below_threshold_then_sketch(self):
+        counter = DistinctCounter(exact_threshold=64, precision=12)
+        for i in range(64):
+            counter.add(f"wallet{i % 50}")
+        assert counter.is_exact and counter.count() == 50
+
+        for i in range(20_000):
+            counter.add(f"wallet{i}")
+        assert not counter.is_exact
+        assert counter.count() == pytest.approx(20_000, rel=0.05)
+
+    def test_union_across_buckets(self):
+        a, b = DistinctCounter(exact_threshold=8), DistinctCounter(exact_threshold=8)
+        for wallet in ("w1", "w2"):
+            a.add(wallet)
+        for wallet in ("w2", "w3"):
+            b.add(wallet)
+        merged = DistinctCounter.union([a, b])
+        assert merged.is_exact and merged.count() == 3
+
+        big_a, big_b = DistinctCounter(), DistinctCounter()
+        for i in range(5000):
+            big_a.add(f"w{i}")
+            big_b.add(f"w{i + 2500}")
+        assert DistinctCounter.union([big_a, big_b, a]).count() == pytest.approx(7500, rel=0.05)
+
+    def test_sketch_window_keeps_small_counts_exact(self, tmp_path):
+        agg = WindowAggregator(
+            window_seconds=600, sketch_precision=10, exact_threshold=16, bucket_seconds=60
+        )
+        for ts, wallet in enumerate(["w1", "w2", "w1"]):
+            agg.insert(float(ts * 100), "BOAR111", wallet, 10.0, "BOAR")
+        for i in range(3000):
+            agg.insert(300.0, "HOT444", f"w{i}", 1.0)
+        assert agg.get("BOAR111").distinct == 2
+        assert agg.get("HOT444").distinct == pytest.approx(3000, rel=0.08)
+
+        agg.expire(700.0)  # BOAR's ts=0 bucket leaves the window
+        assert agg.get("BOAR111").distinct == 2  # w2 (t=100) and w1 (t=200) remain
+        assert agg.get("BOAR111").total_value == 20.0
+
+        path = tmp_path / "window.json"
+        agg.save(path)
+        loaded = WindowAggregator.load(path)
+        assert loaded.snapshot() == agg.snapshot()
+        assert "w1" not in path.read_text()